@@ -174,8 +174,8 @@ export function ComposeView() {
 
             if (data.success) {
                 toast({
-                    title: "Messages Sent",
-                    description: (() => { const failedPart = data.summary.failed > 0 ? ` ${data.summary.failed} failed.` : ''; return `${data.summary.sent} messages sent successfully.${failedPart}`; })(),
+                    title: "Messages Queued",
+                    description: `${data.summary.queued} messages are being sent. You will be notified when they are done.`,
                     variant: "default",
                 });
                 clearSelections();
@@ -148,6 +148,15 @@ registerToastHandler('task_assigned', (data) => {
     });
 });
 
+registerToastHandler('tasks_assigned', (data) => {
+    toast({
+        title: '📌 New Task Assignments',
+        description: `${data.count} tasks assigned to you by ${data.assigner_name}`,
+        variant: 'info',
+        toastType: 'tasks_assigned',
+    });
+});
+
 registerToastHandler('payment_method_created', (data) => {
     toast({
         title: '💳 Payment Method Created',
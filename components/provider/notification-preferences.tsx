@@ -15,7 +15,7 @@ export const NOTIFICATION_CATEGORIES = {
     task: {
         label: 'Task Notifications',
         description: 'New tasks, task updates, assignments, and terminations',
-        toastTypes: ['task_created', 'task_updated', 'task_assigned', 'task_terminated'],
+        toastTypes: ['task_created', 'task_updated', 'task_assigned', 'tasks_assigned', 'task_terminated'],
     },
     approval: {
         label: 'Approval Notifications',
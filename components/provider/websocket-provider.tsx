@@ -15,11 +15,14 @@ import {
     SchedulerNotificationMessage,
     ToastNotificationMessage,
     TaskStatusUpdateMessage,
+    TasksBulkUpdateMessage,
     DataUpdateMessage,
     TransactionRequestMessage,
     DebtRequestMessage,
+    SmsCampaignProgressMessage,
     ConnectionQuality,
 } from '@/lib/websocket';
+import { toast } from '@/hooks/use-toast';
 import { showSchedulerNotificationToast } from '@/components/notifications/toast';
 import { dispatchWebSocketToast } from '@/components/notifications/toast/websocket-toasts';
 import { showTransactionRequestToast, dismissTransactionRequestToast } from '@/components/notifications/toast/request-toast';
@@ -40,6 +43,16 @@ function processSchedulerNotification(msg: SchedulerNotificationMessage): void {
     }
 }
 
+function processSmsCampaignProgress(msg: SmsCampaignProgressMessage): void {
+    if (!msg.done) return;
+    const failedPart = msg.failed > 0 ? ` ${msg.failed} failed.` : '';
+    toast({
+        title: "Bulk SMS Finished",
+        description: `${msg.sent} messages sent successfully.${failedPart}`,
+        variant: msg.sent === 0 && msg.failed > 0 ? "destructive" : "default",
+    });
+}
+
 function processToastNotification(msg: ToastNotificationMessage, qc: QueryClient): void {
     dispatchWebSocketToast(msg);
     if (msg.toast_type === 'debt_request_approved' || msg.toast_type === 'debt_request_rejected') {
@@ -57,6 +70,15 @@ function processTaskStatusUpdate(msg: TaskStatusUpdateMessage, qc: QueryClient):
     qc.invalidateQueries({ queryKey: ['technicianHistoryTasks'] });
 }
 
+function processTasksBulkUpdate(msg: TasksBulkUpdateMessage, qc: QueryClient): void {
+    qc.invalidateQueries({ queryKey: ['tasks'] });
+    for (const taskId of msg.task_ids) {
+        qc.invalidateQueries({ queryKey: ['task', taskId] });
+    }
+    qc.invalidateQueries({ queryKey: ['technicianTasks'] });
+    qc.invalidateQueries({ queryKey: ['technicianHistoryTasks'] });
+}
+
 function processDataUpdate(msg: DataUpdateMessage, qc: QueryClient): void {
     if (msg.type === 'payment_update') {
         qc.invalidateQueries({ queryKey: ['payments'] });
@@ -143,6 +165,8 @@ export function WebSocketProvider({ children }: Readonly<{ children: React.React
             processToastNotification(message, currentQueryClient);
         } else if (message.type === 'task_status_update') {
             processTaskStatusUpdate(message, currentQueryClient);
+        } else if (message.type === 'tasks_bulk_update') {
+            processTasksBulkUpdate(message, currentQueryClient);
         } else if (message.type === 'payment_update' || message.type === 'customer_update' || message.type === 'account_update' || message.type === 'transaction_update' || message.type === 'payment_method_update') {
             processDataUpdate(message, currentQueryClient);
         } else if (message.type === 'transaction_request') {
@@ -153,6 +177,8 @@ export function WebSocketProvider({ children }: Readonly<{ children: React.React
             dismissDebtRequestToast(message.request_id);
         } else if (message.type === 'transaction_request_resolved') {
             dismissTransactionRequestToast(message.request_id);
+        } else if (message.type === 'sms_campaign_progress') {
+            processSmsCampaignProgress(message);
         }
     }, []); // Empty deps - uses refs for stable reference
 
@@ -164,6 +164,7 @@ MIDDLEWARE = [
     *(['debug_toolbar.middleware.DebugToolbarMiddleware'] if DEBUG else []),
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "common.middleware.MetricsMiddleware",  # Per-route latency/query metrics (see common.metrics)
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Serve static files in production
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -210,6 +211,19 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Cache: local memory per process by default, Redis (shared by all
+# processes) when REDIS_URL is set
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL'),
+        'KEY_PREFIX': 'a_express',
+    } if os.environ.get('REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'a_express',
+    }
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -282,6 +296,11 @@ if ACTIVE_DB_URL:
     }
     print(f"[DB CONFIG] Parsed ENGINE: {DATABASES['default'].get('ENGINE', 'MISSING')}")
     print(f"[DB CONFIG] Parsed HOST: {DATABASES['default'].get('HOST', 'MISSING')}")
+    if PGBOUNCER_URL and DATABASE_URL:
+        # The scheduler's advisory lock belongs to a server session, which PgBouncer's
+        # transaction pooling does not pin, so it takes the lock over a direct,
+        # persistent connection (see messaging.scheduler.LeaderLock)
+        DATABASES["scheduler_lock"] = dj_database_url.parse(DATABASE_URL, conn_max_age=None)
 else:
     # Local development: Try MySQL, fallback to SQLite
     try:
@@ -302,6 +321,9 @@ else:
             "default": {
                 "ENGINE": "django.db.backends.sqlite3",
                 "NAME": BASE_DIR / "db.sqlite3",
+                # Several historical migrations run PostgreSQL-only SQL, so the
+                # test database is created straight from the current models
+                "TEST": {"MIGRATE": False},
             }
         }
 
@@ -442,18 +464,81 @@ AXES_RESET_ON_SUCCESS = True  # Reset counter on successful login
 AXES_LOCKOUT_CALLABLE = None  # Use default lockout response
 AXES_VERBOSE = False  # Don't log to console in production
 
+# =============================================================================
+# Field Encryption
+# =============================================================================
+# In-memory LRU of decrypted values (never persisted). Set enabled to False
+# to always decrypt; entries expire after the TTL and on key rotation.
+FIELD_DECRYPTION_CACHE_ENABLED = os.environ.get("FIELD_DECRYPTION_CACHE_ENABLED", "True").lower() in ("true", "1", "yes")
+FIELD_DECRYPTION_CACHE_SIZE = int(os.environ.get("FIELD_DECRYPTION_CACHE_SIZE", "4096"))
+FIELD_DECRYPTION_CACHE_TTL = int(os.environ.get("FIELD_DECRYPTION_CACHE_TTL", "600"))  # Seconds
+
+# =============================================================================
+# Dashboard Stats Cache
+# =============================================================================
+# Dashboard numbers are cached under versioned keys that are bumped by the
+# task, payment and message hooks (see common.stats). The timeout only bounds
+# how long an entry can outlive a change no hook sees.
+DASHBOARD_STATS_CACHE_ENABLED = os.environ.get("DASHBOARD_STATS_CACHE_ENABLED", "True").lower() in ("true", "1", "yes")
+DASHBOARD_STATS_CACHE_TIMEOUT = int(os.environ.get("DASHBOARD_STATS_CACHE_TIMEOUT", "300"))  # Seconds
+
+# =============================================================================
+# Request Metrics
+# =============================================================================
+# Per-route request metrics, served to staff in Prometheus text format at
+# /api/metrics/. With several worker processes set METRICS_DIR to a directory
+# they all can write; each process flushes its snapshot there every
+# METRICS_FLUSH_INTERVAL seconds and the endpoint sums them.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "True").lower() in ("true", "1", "yes")
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+METRICS_FLUSH_INTERVAL = int(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))  # Seconds
+
 # =============================================================================
 # Briq SMS API Configuration
 # =============================================================================
 # Get your API key from: https://briq.tz/login
 BRIQ_API_KEY = os.environ.get('BRIQ_API_KEY', '')
 BRIQ_SENDER_ID = os.environ.get('BRIQ_SENDER_ID', 'A-EXPRESS')
+BRIQ_BASE_URL = os.environ.get('BRIQ_BASE_URL', 'https://karibu.briq.tz')
+# Sends share a keep-alive connection pool; size it to the outbox worker threads
+BRIQ_POOL_SIZE = int(os.environ.get('BRIQ_POOL_SIZE', os.environ.get('SMS_OUTBOX_WORKERS', '4')))
+BRIQ_CONNECT_TIMEOUT = float(os.environ.get('BRIQ_CONNECT_TIMEOUT', '3.05'))  # Seconds
+BRIQ_READ_TIMEOUT = float(os.environ.get('BRIQ_READ_TIMEOUT', '15'))  # Seconds
+# Retries for requests the gateway never acted on (connect failures, 429/503)
+BRIQ_MAX_RETRIES = int(os.environ.get('BRIQ_MAX_RETRIES', '2'))
+BRIQ_RETRY_BACKOFF = float(os.environ.get('BRIQ_RETRY_BACKOFF', '0.5'))  # Seconds, doubled per retry
+# Bulk sends put recipients of identical messages into one request, up to this many
+BRIQ_MAX_RECIPIENTS = int(os.environ.get('BRIQ_MAX_RECIPIENTS', '100'))
+
+# =============================================================================
+# SMS Outbox
+# =============================================================================
+# Requests queue SMS as pending MessageLog rows; the process_sms_outbox worker
+# sends them (see messaging.outbox); start.sh runs it under a restart loop, and
+# any deployment that enables the outbox must keep that worker running. With
+# SMS_OUTBOX_ENABLED off, messages are sent synchronously in the request, e.g.
+# for local development without a worker.
+SMS_OUTBOX_ENABLED = os.environ.get('SMS_OUTBOX_ENABLED', 'True').lower() in ('true', '1', 'yes')
+SMS_OUTBOX_WORKERS = int(os.environ.get('SMS_OUTBOX_WORKERS', '4'))
+SMS_OUTBOX_POLL_INTERVAL = float(os.environ.get('SMS_OUTBOX_POLL_INTERVAL', '2'))  # Seconds
+SMS_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('SMS_OUTBOX_MAX_ATTEMPTS', '5'))
+SMS_OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get('SMS_OUTBOX_RETRY_BASE_SECONDS', '30'))
+SMS_OUTBOX_RETRY_MAX_SECONDS = int(os.environ.get('SMS_OUTBOX_RETRY_MAX_SECONDS', '3600'))
+SMS_OUTBOX_LEASE_SECONDS = int(os.environ.get('SMS_OUTBOX_LEASE_SECONDS', '120'))  # Claimed rows are retried after this
+SMS_CAMPAIGN_MAX_ATTEMPTS = int(os.environ.get('SMS_CAMPAIGN_MAX_ATTEMPTS', '3'))  # Runs before a bulk send is marked failed
 
 # =============================================================================
 # APScheduler Configuration
 # =============================================================================
 APSCHEDULER_DATETIME_FORMAT = "N j, Y, f:s a"
 APSCHEDULER_RUN_NOW_TIMEOUT = 25  # Seconds
+# Jobs run in the run_scheduler worker (see messaging.scheduler). Every
+# instance competes for this PostgreSQL advisory lock; the holder runs the
+# jobs and the others retry every SCHEDULER_STANDBY_INTERVAL seconds.
+SCHEDULER_LOCK_ID = int(os.environ.get('SCHEDULER_LOCK_ID', '7242001'))
+SCHEDULER_STANDBY_INTERVAL = float(os.environ.get('SCHEDULER_STANDBY_INTERVAL', '15'))  # Seconds
+# Database alias the lock is taken on; it must not go through a transaction pooler
+SCHEDULER_LOCK_DATABASE = 'scheduler_lock' if 'scheduler_lock' in DATABASES else 'default'
 
 # =============================================================================
 # Django Debug Toolbar Configuration
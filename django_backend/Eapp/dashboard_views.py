@@ -1,57 +1,46 @@
-from django.db.models import Sum
-from django.utils import timezone
+from django.db.models import Count, Q, Sum
 from rest_framework import permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from common.stats import StatsContext, StatsDashboard
 from financials.models import Payment
 from messaging.models import MessageLog
 from .models import Task
 
+CLOSED_STATUSES = ["Ready for Pickup", "Picked Up", "Terminated", "Completed"]
+
+dashboard_stats = StatsDashboard('dashboard', sources={
+    'tasks': lambda ctx: Task.objects.with_outstanding_balance(),
+    'messages': lambda ctx: MessageLog.objects.filter(sent_at__gte=ctx.day_start, sent_at__lt=ctx.day_end),
+    'payments': lambda ctx: Payment.objects.filter(date__gte=ctx.month_start, date__lt=ctx.next_month_start),
+})
+
+# 1. New Tasks Created Today
+dashboard_stats.add_tile(
+    'new_tasks_count', 'tasks',
+    lambda ctx: Count('id', filter=Q(created_at__gte=ctx.day_start, created_at__lt=ctx.day_end))
+)
+# 2. Messages Sent Today
+dashboard_stats.add_tile('messages_sent_count', 'messages', Count('id', filter=Q(status='sent')))
+# 3. Tasks Ready for Pickup
+dashboard_stats.add_tile(
+    'tasks_ready_for_pickup_count', 'tasks', Count('id', filter=Q(status=Task.Status.READY_FOR_PICKUP))
+)
+# 4. Total Active Tasks (excluding closed states)
+dashboard_stats.add_tile('active_tasks_count', 'tasks', Count('id', filter=~Q(status__in=CLOSED_STATUSES)))
+# 5. Revenue This Month
+dashboard_stats.add_tile('revenue_this_month', 'payments', Sum('amount'), transform=float)
+# 6. Total Outstanding Debt Balance
+dashboard_stats.add_tile(
+    'total_debt_balance', 'tasks',
+    Sum('outstanding_balance', filter=Q(is_debt=True) & ~Q(status='Terminated')),
+    transform=float
+)
+
+
 class DashboardStats(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        today = timezone.now().date()
-        now = timezone.now()
-        
-        # 1. New Tasks Created Today
-        new_tasks_count = Task.objects.filter(created_at__date=today).count()
-        
-        # 2. Messages Sent Today
-        messages_sent_count = MessageLog.objects.filter(sent_at__date=today, status='sent').count()
-        
-        # 3. Tasks Ready for Pickup
-        tasks_ready_for_pickup_count = Task.objects.filter(status=Task.Status.READY_FOR_PICKUP).count()
-
-        # 4. Total Active Tasks (excluding closed states)
-        total_active_tasks_count = Task.objects.exclude(
-            status__in=["Ready for Pickup", "Picked Up", "Terminated", "Completed"]
-        ).count()
-
-        # 5. Revenue This Month
-        revenue_this_month = (
-            Payment.objects.filter(
-                date__month=now.month, date__year=now.year
-            ).aggregate(total=Sum("amount"))["total"]
-            or 0
-        )
-        
-        # 6. Total Outstanding Debt Balance
-        total_debt_balance = (
-            Task.objects.filter(is_debt=True)
-            .exclude(status='Terminated')
-            .with_outstanding_balance()
-            .aggregate(total=Sum('outstanding_balance'))['total']
-            or 0
-        )
-        
-        data = {
-            "new_tasks_count": new_tasks_count,
-            "messages_sent_count": messages_sent_count,
-            "tasks_ready_for_pickup_count": tasks_ready_for_pickup_count,
-            "active_tasks_count": total_active_tasks_count,
-            "revenue_this_month": float(revenue_this_month),
-            "total_debt_balance": float(total_debt_balance),
-        }
-        return Response(data)
+        return Response(dashboard_stats.compute_cached(StatsContext(user=request.user)))
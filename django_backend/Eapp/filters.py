@@ -79,12 +79,10 @@ class TaskFilter(django_filters.FilterSet):
     def search_filter(self, queryset, name, value):
         """
         Search by customer name, phone number, or task title.
+        Uses trigram-indexed, ranked search on PostgreSQL when available.
         """
-        return queryset.filter(
-            Q(customer__name__icontains=value) |
-            Q(customer__phone_numbers__phone_number__icontains=value) |
-            Q(title__icontains=value)
-        ).distinct()
+        from .services.task_search import TaskSearch
+        return TaskSearch.search(queryset, value)
     
     def filter_unpaid_tasks(self, queryset, name, value):
         """
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Case, Count, OuterRef, Q, Subquery, When
+from Eapp.models import Task, TaskActivity
+
+
+def _activity_value(activity_type, field, newest=True):
+    """Subquery returning `field` from the newest (or oldest) activity of a type."""
+    ordering = '-timestamp' if newest else 'timestamp'
+    return Subquery(
+        TaskActivity.objects.filter(task=OuterRef('pk'), type=activity_type)
+        .order_by(ordering)
+        .values(field)[:1]
+    )
+
+
+class Command(BaseCommand):
+    help = 'Backfills approval, QC rejection, pickup and workshop snapshot columns on tasks from their activity history'
+
+    def handle(self, *args, **options):
+        ready = TaskActivity.ActivityType.READY
+        rejected = TaskActivity.ActivityType.REJECTED
+        picked_up = TaskActivity.ActivityType.PICKED_UP
+        workshop = TaskActivity.ActivityType.WORKSHOP
+
+        self.stdout.write("Backfilling approval and QC rejection snapshots...")
+        updated = Task.objects.update(
+            approved_at=_activity_value(ready, 'timestamp'),
+            approved_by=_activity_value(ready, 'user'),
+            qc_rejected_at=_activity_value(rejected, 'timestamp'),
+            qc_rejected_by=_activity_value(rejected, 'user'),
+        )
+        self.stdout.write(f"  {updated} tasks updated.")
+
+        self.stdout.write("Backfilling pickup snapshots...")
+        pickup_tasks = Task.objects.filter(
+            latest_pickup_at__isnull=True,
+            activities__type=picked_up,
+        ).values('pk')
+        updated = Task.objects.filter(pk__in=pickup_tasks).update(
+            latest_pickup_at=_activity_value(picked_up, 'timestamp'),
+            latest_pickup_by=_activity_value(picked_up, 'user'),
+        )
+        self.stdout.write(f"  {updated} tasks updated.")
+
+        self.stdout.write("Backfilling workshop snapshots...")
+        workshop_count = Subquery(
+            TaskActivity.objects.filter(task=OuterRef('pk'), type=workshop)
+            .values('task')
+            .annotate(n=Count('id'))
+            .values('n')[:1]
+        )
+        updated = Task.objects.annotate(workshop_count=workshop_count).update(
+            workshop_sent_at=_activity_value(workshop, 'timestamp', newest=False),
+            workshop_returned_at=Case(
+                When(Q(workshop_count__gt=1), then=_activity_value(workshop, 'timestamp')),
+                default=None,
+            ),
+        )
+        self.stdout.write(f"  {updated} tasks updated.")
+
+        self.stdout.write(self.style.SUCCESS("Successfully backfilled activity snapshots."))
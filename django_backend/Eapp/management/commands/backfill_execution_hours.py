@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from Eapp.models import Task
+from Eapp.utils.execution_hours import EXECUTION_HOURS_FIELDS, refresh_execution_hours
+
+
+class Command(BaseCommand):
+    help = 'Stores net execution, workshop and return hours for completed tasks from their tracking fields'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Tasks updated per query (default: 500)'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute tasks that already have stored hours'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        tasks = Task.objects.filter(first_assigned_at__isnull=False, completed_at__isnull=False)
+        if not options['all']:
+            tasks = tasks.filter(net_execution_hours__isnull=True)
+        tasks = tasks.only(
+            'pk', 'estimated_cost', 'first_assigned_at', 'completed_at', 'return_periods', 'workshop_periods', *EXECUTION_HOURS_FIELDS
+        ).order_by('pk')
+
+        total = tasks.count()
+        self.stdout.write(f"Computing execution hours for {total} tasks...")
+
+        batch = []
+        updated = 0
+        for task in tasks.iterator(chunk_size=batch_size):
+            refresh_execution_hours(task)
+            batch.append(task)
+            if len(batch) >= batch_size:
+                updated += Task.objects.bulk_update(batch, EXECUTION_HOURS_FIELDS)
+                batch = []
+                self.stdout.write(f"Processed {updated}/{total} tasks...")
+        if batch:
+            updated += Task.objects.bulk_update(batch, EXECUTION_HOURS_FIELDS)
+
+        self.stdout.write(self.style.SUCCESS(f"Backfill complete! Updated {updated} tasks."))
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.db.models import Q
 from Eapp.models import Task, TaskActivity
+from Eapp.utils.execution_hours import EXECUTION_HOURS_FIELDS, refresh_execution_hours
 from django.db import transaction
 
 class Command(BaseCommand):
@@ -169,13 +170,15 @@ class Command(BaseCommand):
             has_changes = True
         
         if has_changes:
+            refresh_execution_hours(task)
             task.save(update_fields=[
                 'first_assigned_at', 
                 'completed_at', 
                 'return_count', 
                 'return_periods',
                 'workshop_periods',
-                'execution_technicians'
+                'execution_technicians',
+                *EXECUTION_HOURS_FIELDS,
             ])
             return True
         return False
@@ -0,0 +1,95 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from Eapp.models import Task, TaskActivity, TaskAssignment
+from Eapp.signals import assignment_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the TaskAssignment table from assignment activities and execution_technicians '
+        '(migration 0022 fills it on deploy)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Tasks processed per transaction (default: 500)'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Delete existing TaskAssignment rows and rebuild all of them'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if options['reset']:
+            deleted, _ = TaskAssignment.objects.all().delete()
+            self.stdout.write(f"Deleted {deleted} existing assignment rows.")
+
+        # Tasks that already have rows were written by the assignment path and are left alone
+        task_ids = list(
+            Task.objects.filter(assignments__isnull=True)
+            .exclude(first_assigned_at__isnull=True, execution_technicians=[])
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        total = len(task_ids)
+        self.stdout.write(f"Backfilling assignments for {total} tasks...")
+
+        created = 0
+        for start in range(0, total, batch_size):
+            chunk = task_ids[start:start + batch_size]
+            with transaction.atomic():
+                rows = self._rows_for_tasks(chunk)
+                TaskAssignment.objects.bulk_create(rows)
+            created += len(rows)
+            self.stdout.write(f"Processed {min(start + batch_size, total)}/{total} tasks...")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfill complete! Created {created} assignment rows."))
+
+    def _rows_for_tasks(self, task_ids):
+        activities = (
+            TaskActivity.objects.filter(task_id__in=task_ids, type=TaskActivity.ActivityType.ASSIGNMENT)
+            .order_by('task_id', 'timestamp', 'pk')
+            .values_list('task_id', 'timestamp', 'details')
+        )
+        _, rows = assignment_rows(activities)
+
+        # Tasks assigned before activities carried technician IDs only have execution_technicians
+        covered = {row.task_id for row in rows}
+        legacy = Task.objects.filter(pk__in=task_ids).exclude(pk__in=covered).only(
+            'pk', 'estimated_cost', 'created_at', 'first_assigned_at', 'assigned_to', 'execution_technicians'
+        )
+        for task in legacy:
+            rows.extend(self._rows_from_execution_technicians(task))
+        return rows
+
+    def _rows_from_execution_technicians(self, task):
+        """One row per listed technician, each closed when the next one was assigned."""
+        fallback = task.first_assigned_at or task.created_at
+        entries = []
+        for tech in task.execution_technicians or []:
+            if not tech.get('user_id'):
+                continue
+            assigned_at = tech.get('assigned_at')
+            entries.append((
+                task.pk,
+                datetime.fromisoformat(assigned_at) if assigned_at else fallback,
+                {'new_technician_id': tech['user_id']},
+            ))
+        if not entries and task.assigned_to_id:
+            entries.append((task.pk, fallback, {'new_technician_id': task.assigned_to_id}))
+
+        entries.sort(key=lambda entry: entry[1])
+        _, rows = assignment_rows(entries)
+
+        # Only the current assignee can still be on the task; when earlier stints ended is unknown
+        if rows and rows[-1].user_id != task.assigned_to_id:
+            rows[-1].unassigned_at = rows[-1].assigned_at
+        return rows
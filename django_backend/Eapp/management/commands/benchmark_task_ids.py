@@ -0,0 +1,95 @@
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from Eapp.models import TaskIDCounter
+from Eapp.utils import TaskIDGenerator
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks concurrent task ID allocation and checks for duplicate IDs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            default='1,10,25,50',
+            help='Comma-separated numbers of parallel allocations per round (default: 1,10,25,50)',
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=5,
+            help='Rounds to run at each concurrency level (default: 5)',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='ZBENCH',
+            help='Scratch counter prefix used for the run; removed afterwards',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+        rounds = options['rounds']
+
+        TaskIDCounter.objects.filter(prefix=prefix).delete()
+        failed = False
+
+        try:
+            for level in levels:
+                latencies = []
+                allocated = []
+                for _ in range(rounds):
+                    round_latencies, round_values = self._run_round(prefix, level)
+                    latencies.extend(round_latencies)
+                    allocated.extend(round_values)
+
+                duplicates = len(allocated) - len(set(allocated))
+                latencies_ms = sorted(latency * 1000 for latency in latencies)
+                p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1] if len(latencies_ms) > 1 else latencies_ms[0]
+
+                line = (
+                    f"concurrency={level:>3}  allocations={len(allocated):>5}  "
+                    f"p50={statistics.median(latencies_ms):.2f}ms  p95={p95:.2f}ms  "
+                    f"max={latencies_ms[-1]:.2f}ms  duplicates={duplicates}"
+                )
+                if duplicates:
+                    failed = True
+                    self.stdout.write(self.style.ERROR(line))
+                else:
+                    self.stdout.write(line)
+        finally:
+            TaskIDCounter.objects.filter(prefix=prefix).delete()
+
+        if failed:
+            self.stdout.write(self.style.ERROR("Duplicate task IDs were allocated."))
+        else:
+            self.stdout.write(self.style.SUCCESS("No duplicate task IDs allocated."))
+
+    def _run_round(self, prefix, level):
+        """Start `level` threads behind a barrier so they allocate at the same instant."""
+        barrier = threading.Barrier(level)
+        latencies = [None] * level
+        values = [None] * level
+
+        def worker(index):
+            try:
+                # Open the connection up front so only allocation is timed
+                connection.ensure_connection()
+                barrier.wait()
+                started = time.perf_counter()
+                values[index] = TaskIDGenerator._get_next_sequence(prefix)
+                latencies[index] = time.perf_counter() - started
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(level)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return latencies, values
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from common.stats import invalidate as invalidate_stats
 from Eapp.models import Task
 
 
@@ -14,5 +15,6 @@ class Command(BaseCommand):
             return
 
         self.stdout.write(f"Found {count} fully paid task(s) still flagged as debt. Clearing...")
-        updated = tasks.update(is_debt=False)
+        updated = tasks.update(is_debt=False, next_debt_reminder_at=None)
+        invalidate_stats('tasks')
         self.stdout.write(self.style.SUCCESS(f"Successfully cleared is_debt on {updated} task(s)."))
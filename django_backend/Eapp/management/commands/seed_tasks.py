@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand
 from Eapp.seeders import seed_tasks, clear_tasks
 
 class Command(BaseCommand):
-    help = 'Seed the database with sample tasks and activities across different months and years'
+    help = 'Seed the database with synthetic tasks, customers, payments, messages and audit logs for load testing'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -10,13 +10,31 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear all existing tasks and activities before seeding',
         )
+        parser.add_argument('--tasks', type=int, default=1000, help='Number of tasks to create (default: 1000)')
+        parser.add_argument('--days', type=int, default=365, help='Spread intake dates over this many days up to today (default: 365)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same data (default: 42)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Tasks written per transaction (default: 5000)')
+        parser.add_argument('--no-copy', action='store_true', help='Use bulk_create instead of COPY on PostgreSQL')
 
     def handle(self, *args, **options):
         if options['clear']:
             clear_tasks()
             
-        seed_tasks()
+        counts = seed_tasks(
+            tasks=options['tasks'],
+            days=options['days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            use_copy=False if options['no_copy'] else None,
+            log=self.stdout.write,
+        )
+        seconds = counts.pop('seconds')
+        for label, rows in counts.items():
+            self.stdout.write(f'  {label}: {rows}')
         
         self.stdout.write(
-            self.style.SUCCESS('Successfully seeded tasks and activities!')
-        )
\ No newline at end of file
+            self.style.SUCCESS(
+                f"Successfully seeded {options['tasks']} tasks in {seconds}s "
+                f"({options['tasks'] / max(seconds, 0.001) * 60:,.0f} tasks per minute)"
+            )
+        )
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:19
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def dedupe_task_titles(apps, schema_editor):
+    """
+    Concurrent intakes could previously be handed the same task ID. Keep the
+    oldest task on each duplicated title and suffix the others so the unique
+    constraint below can be created.
+    """
+    Task = apps.get_model('Eapp', 'Task')
+
+    duplicates = (
+        Task.objects.values('title')
+        .annotate(n=Count('id'))
+        .filter(n__gt=1)
+        .values_list('title', flat=True)
+    )
+    for title in list(duplicates):
+        tasks = Task.objects.filter(title=title).order_by('created_at', 'id')
+        for n, task in enumerate(tasks[1:], start=2):
+            new_title = f"{title}-{n}"
+            while Task.objects.filter(title=new_title).exists():
+                n += 1
+                new_title = f"{title}-{n}"
+            Task.objects.filter(pk=task.pk).update(title=new_title)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0015_add_to_be_checked_field'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskIDCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=10, unique=True)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Task ID Counter',
+            },
+        ),
+        migrations.RunPython(dedupe_task_titles, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='task',
+            name='title',
+            field=models.CharField(max_length=200, unique=True),
+        ),
+    ]
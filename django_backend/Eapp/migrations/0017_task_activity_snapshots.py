@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0016_task_id_counter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='approved_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Timestamp of the latest Ready (approval) activity', null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='approved_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='approved_tasks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='qc_rejected_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Timestamp of the latest QC rejection activity', null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='qc_rejected_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='qc_rejected_tasks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='workshop_returned_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Timestamp of the latest workshop activity after the first', null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='workshop_sent_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Timestamp of the first workshop activity', null=True),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='latest_pickup_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,64 @@
+"""
+Fill the activity snapshot columns added in 0017 for existing tasks.
+
+Same set-based UPDATEs as `backfill_activity_snapshots`: approval, QC
+rejection, pickup and workshop timestamps are taken from each task's activity
+history, so tasks serialize the values the derived properties used to return.
+"""
+from django.db import migrations
+from django.db.models import Case, Count, OuterRef, Q, Subquery, When
+
+READY = 'ready'
+REJECTED = 'rejected'
+PICKED_UP = 'picked_up'
+WORKSHOP = 'workshop'
+
+
+def backfill_activity_snapshots(apps, schema_editor):
+    Task = apps.get_model('Eapp', 'Task')
+    TaskActivity = apps.get_model('Eapp', 'TaskActivity')
+
+    def activity_value(activity_type, field, newest=True):
+        return Subquery(
+            TaskActivity.objects.filter(task=OuterRef('pk'), type=activity_type)
+            .order_by('-timestamp' if newest else 'timestamp')
+            .values(field)[:1]
+        )
+
+    Task.objects.update(
+        approved_at=activity_value(READY, 'timestamp'),
+        approved_by=activity_value(READY, 'user'),
+        qc_rejected_at=activity_value(REJECTED, 'timestamp'),
+        qc_rejected_by=activity_value(REJECTED, 'user'),
+    )
+
+    pickup_tasks = Task.objects.filter(latest_pickup_at__isnull=True, activities__type=PICKED_UP).values('pk')
+    Task.objects.filter(pk__in=pickup_tasks).update(
+        latest_pickup_at=activity_value(PICKED_UP, 'timestamp'),
+        latest_pickup_by=activity_value(PICKED_UP, 'user'),
+    )
+
+    workshop_count = Subquery(
+        TaskActivity.objects.filter(task=OuterRef('pk'), type=WORKSHOP)
+        .values('task')
+        .annotate(n=Count('id'))
+        .values('n')[:1]
+    )
+    Task.objects.annotate(workshop_count=workshop_count).update(
+        workshop_sent_at=activity_value(WORKSHOP, 'timestamp', newest=False),
+        workshop_returned_at=Case(
+            When(Q(workshop_count__gt=1), then=activity_value(WORKSHOP, 'timestamp')),
+            default=None,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0017_task_activity_snapshots'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_activity_snapshots, migrations.RunPython.noop),
+    ]
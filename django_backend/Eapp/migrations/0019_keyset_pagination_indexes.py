@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0018_backfill_activity_snapshots'),
+        ('common', '0004_add_location_is_active'),
+        ('customers', '0002_expand_phone_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['created_at', 'id'], name='idx_task_created_keyset'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0020_task_title_trigram_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assigned_at', models.DateTimeField()),
+                ('unassigned_at', models.DateTimeField(blank=True, null=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='Eapp.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_assignments', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['assigned_at'],
+                'indexes': [models.Index(fields=['user', 'task'], name='idx_assignment_user_task'), models.Index(fields=['task', 'unassigned_at'], name='idx_assignment_task_open')],
+            },
+        ),
+    ]
@@ -0,0 +1,92 @@
+"""
+Fill TaskAssignment for tasks assigned before the table existed.
+
+Same rows as `backfill_task_assignments`: one per stint from each task's
+ASSIGNMENT activities, or from execution_technicians for tasks assigned before
+activities carried technician IDs. The logic is a frozen copy as of this
+migration, so later changes to Eapp.signals do not change what it does.
+"""
+from datetime import datetime
+
+from django.db import migrations
+from django.utils import timezone
+
+BATCH_SIZE = 500
+ASSIGNMENT = 'assignment'
+
+
+def _parse(value):
+    parsed = datetime.fromisoformat(value)
+    if timezone.is_naive(parsed):
+        return timezone.make_aware(parsed)
+    return parsed
+
+
+def _rows(TaskAssignment, entries):
+    """Rows for (task_id, timestamp, details) entries in activity order; each ASSIGNMENT ends the open stint."""
+    rows = []
+    open_rows = {}
+    for task_id, timestamp, details in entries:
+        pending = open_rows.pop(task_id, None)
+        if pending:
+            pending.unassigned_at = timestamp
+        user_id = (details or {}).get('new_technician_id')
+        if user_id:
+            row = TaskAssignment(task_id=task_id, user_id=user_id, assigned_at=timestamp)
+            rows.append(row)
+            open_rows[task_id] = row
+    return rows
+
+
+def _rows_from_execution_technicians(TaskAssignment, task):
+    fallback = task.first_assigned_at or task.created_at
+    entries = [
+        (task.pk, _parse(tech['assigned_at']) if tech.get('assigned_at') else fallback, {'new_technician_id': tech['user_id']})
+        for tech in task.execution_technicians or []
+        if tech.get('user_id')
+    ]
+    if not entries and task.assigned_to_id:
+        entries.append((task.pk, fallback, {'new_technician_id': task.assigned_to_id}))
+    entries.sort(key=lambda entry: entry[1])
+    rows = _rows(TaskAssignment, entries)
+
+    # Only the current assignee can still be on the task; when earlier stints ended is unknown
+    if rows and rows[-1].user_id != task.assigned_to_id:
+        rows[-1].unassigned_at = rows[-1].assigned_at
+    return rows
+
+
+def backfill_task_assignments(apps, schema_editor):
+    Task = apps.get_model('Eapp', 'Task')
+    TaskActivity = apps.get_model('Eapp', 'TaskActivity')
+    TaskAssignment = apps.get_model('Eapp', 'TaskAssignment')
+
+    task_ids = list(
+        Task.objects.filter(assignments__isnull=True)
+        .exclude(first_assigned_at__isnull=True, execution_technicians=[])
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+    for start in range(0, len(task_ids), BATCH_SIZE):
+        chunk = task_ids[start:start + BATCH_SIZE]
+        rows = _rows(TaskAssignment, TaskActivity.objects.filter(task_id__in=chunk, type=ASSIGNMENT)
+                     .order_by('task_id', 'timestamp', 'pk')
+                     .values_list('task_id', 'timestamp', 'details'))
+        covered = {row.task_id for row in rows}
+        legacy = Task.objects.filter(pk__in=chunk).exclude(pk__in=covered).only(
+            'pk', 'created_at', 'first_assigned_at', 'assigned_to', 'execution_technicians'
+        )
+        for task in legacy:
+            rows.extend(_rows_from_execution_technicians(TaskAssignment, task))
+        TaskAssignment.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0021_task_assignment'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_task_assignments, migrations.RunPython.noop),
+    ]
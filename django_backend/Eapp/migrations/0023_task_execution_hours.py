@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0022_backfill_task_assignments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='net_execution_hours',
+            field=models.FloatField(blank=True, db_index=True, help_text='Hours from first assignment to completion, excluding return and workshop time', null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='return_hours',
+            field=models.FloatField(blank=True, db_index=True, help_text='Hours spent returned to the customer before completion', null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='workshop_hours',
+            field=models.FloatField(blank=True, db_index=True, help_text='Hours spent in an external workshop before completion', null=True),
+        ),
+    ]
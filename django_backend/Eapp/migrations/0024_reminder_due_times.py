@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0023_task_execution_hours'),
+        ('common', '0005_enable_pg_trgm'),
+        ('customers', '0004_phonenumber_phone_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='next_debt_reminder_at',
+            field=models.DateTimeField(blank=True, help_text='When the next automated debt reminder is due', null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='next_pickup_reminder_at',
+            field=models.DateTimeField(blank=True, help_text='When the next automated pickup reminder is due', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('next_pickup_reminder_at__isnull', False)), fields=['next_pickup_reminder_at'], name='idx_task_pickup_reminder_due'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('next_debt_reminder_at__isnull', False)), fields=['next_debt_reminder_at'], name='idx_task_debt_reminder_due'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django - Data migration to backfill the reminder due times
+
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Max
+from django.utils import timezone
+
+
+def _last_reminders(MessageLog, task_ids, keyword):
+    """Latest sent reminder per task, found the way the jobs used to (by message keyword)."""
+    return dict(
+        MessageLog.objects.filter(task_id__in=task_ids, status='sent', message_content__icontains=keyword)
+        .values('task_id').annotate(last=Max('sent_at')).values_list('task_id', 'last')
+    )
+
+
+def backfill_reminder_due_times(apps, schema_editor):
+    """
+    Schedule the next pickup and debt reminder for tasks that are waiting for one,
+    counting from the last reminder sent or, failing that, approval / the debt.
+    """
+    Task = apps.get_model('Eapp', 'Task')
+    MessageLog = apps.get_model('messaging', 'MessageLog')
+    SystemSettings = apps.get_model('settings', 'SystemSettings')
+
+    system_settings = SystemSettings.objects.filter(pk=1).first()
+    pickup_hours = system_settings.pickup_reminder_hours if system_settings else 24
+    debt_hours = system_settings.debt_reminder_hours if system_settings else 72
+    max_days = system_settings.debt_reminder_max_days if system_settings else 30
+    now = timezone.now()
+
+    ready = list(Task.objects.filter(status='Ready for Pickup', approved_at__isnull=False).only('id', 'approved_at'))
+    last_sent = _last_reminders(MessageLog, [task.id for task in ready], 'tunakukumbusha')
+    for task in ready:
+        task.next_pickup_reminder_at = last_sent.get(task.id, task.approved_at) + timedelta(hours=pickup_hours)
+    Task.objects.bulk_update(ready, ['next_pickup_reminder_at'], batch_size=1000)
+
+    cutoff = now - timedelta(days=max_days)
+    debts = [
+        task for task in Task.objects.filter(is_debt=True, status='Picked Up').only('id', 'updated_at', 'latest_pickup_at')
+        if (task.latest_pickup_at or task.updated_at) >= cutoff
+    ]
+    last_sent = _last_reminders(MessageLog, [task.id for task in debts], 'deni')
+    for task in debts:
+        task.next_debt_reminder_at = last_sent.get(task.id, task.updated_at) + timedelta(hours=debt_hours)
+    Task.objects.bulk_update(debts, ['next_debt_reminder_at'], batch_size=1000)
+
+    if ready or debts:
+        print(f"\nScheduled reminders for {len(ready)} tasks ready for pickup and {len(debts)} debt tasks.")
+
+
+def reverse_backfill(apps, schema_editor):
+    Task = apps.get_model('Eapp', 'Task')
+    Task.objects.update(next_pickup_reminder_at=None, next_debt_reminder_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0024_reminder_due_times'),
+        # Pickup reminders count from approved_at, which 0018 fills from the READY activities
+        ('Eapp', '0018_backfill_activity_snapshots'),
+        ('messaging', '0016_sms_campaign'),
+        ('settings', '0005_add_messaging_settings'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_reminder_due_times, reverse_backfill),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:54
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0025_backfill_reminder_due_times'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskactivity',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,71 @@
+"""
+Store execution hours for tasks completed before the columns existed.
+
+Tasks that have been assigned and completed and have no stored hours get them
+computed from their tracking fields. The calculation is a frozen copy of
+Eapp.utils.execution_hours as of this migration, so later changes to that
+helper do not change what this migration does.
+"""
+from datetime import datetime
+
+from django.db import migrations
+from django.utils import timezone
+
+BATCH_SIZE = 500
+FIELDS = ['net_execution_hours', 'workshop_hours', 'return_hours']
+
+
+def _parse(value):
+    parsed = datetime.fromisoformat(value)
+    if timezone.is_naive(parsed):
+        return timezone.make_aware(parsed)
+    return parsed
+
+
+def _period_hours(periods, completed_at, start_field, end_field):
+    """Hours of {start_field, end_field} periods up to completed_at."""
+    total_hours = 0
+    for period in periods or []:
+        if not period.get(start_field):
+            continue
+        start_time = _parse(period[start_field])
+        end_time = _parse(period[end_field]) if period.get(end_field) else completed_at
+        end_time = min(end_time, completed_at)
+        total_hours += max(0, (end_time - start_time).total_seconds() / 3600)
+    return total_hours
+
+
+def _execution_hours(task):
+    """(net_execution_hours, workshop_hours, return_hours) of an assigned, completed task."""
+    gross_hours = (task.completed_at - task.first_assigned_at).total_seconds() / 3600
+    return_hours = _period_hours(task.return_periods, task.completed_at, 'returned_at', 'reassigned_at')
+    workshop_hours = _period_hours(task.workshop_periods, task.completed_at, 'sent_at', 'returned_at')
+    return max(0, gross_hours - return_hours - workshop_hours), workshop_hours, return_hours
+
+
+def backfill_execution_hours(apps, schema_editor):
+    Task = apps.get_model('Eapp', 'Task')
+    tasks = Task.objects.filter(
+        first_assigned_at__isnull=False, completed_at__isnull=False, net_execution_hours__isnull=True
+    ).only('pk', 'first_assigned_at', 'completed_at', 'return_periods', 'workshop_periods', *FIELDS).order_by('pk')
+
+    batch = []
+    for task in tasks.iterator(chunk_size=BATCH_SIZE):
+        task.net_execution_hours, task.workshop_hours, task.return_hours = _execution_hours(task)
+        batch.append(task)
+        if len(batch) >= BATCH_SIZE:
+            Task.objects.bulk_update(batch, FIELDS)
+            batch = []
+    if batch:
+        Task.objects.bulk_update(batch, FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0026_activity_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_execution_hours, migrations.RunPython.noop),
+    ]
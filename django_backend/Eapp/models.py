@@ -52,7 +52,7 @@ class Task(models.Model):
         SOLVED = 'Solved', _('Solved')
         NOT_SOLVED = 'Not Solved', _('Not Solved')
 
-    title = models.CharField(max_length=200)
+    title = models.CharField(max_length=200, unique=True)
     description = models.TextField(blank=True, null=True)
     status = models.CharField(
         max_length=20,
@@ -124,10 +124,42 @@ class Task(models.Model):
         related_name='original_tasks',
         help_text='Snapshot of original location before workshop'
     )
-    latest_pickup_at = models.DateTimeField(null=True, blank=True)
+    latest_pickup_at = models.DateTimeField(null=True, blank=True, db_index=True)
     latest_pickup_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True, related_name='latest_pickup_tasks'
     )
+
+    # Activity snapshot fields, maintained by ActivityLogger.apply_snapshots
+    approved_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text='Timestamp of the latest Ready (approval) activity'
+    )
+    approved_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_tasks'
+    )
+    qc_rejected_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text='Timestamp of the latest QC rejection activity'
+    )
+    qc_rejected_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='qc_rejected_tasks'
+    )
+    workshop_sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text='Timestamp of the first workshop activity'
+    )
+    workshop_returned_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text='Timestamp of the latest workshop activity after the first'
+    )
     
     # Status Timestamps
     ready_for_pickup_at = models.DateTimeField(
@@ -136,6 +168,18 @@ class Task(models.Model):
         db_index=True,
         help_text='Timestamp when task was marked as Ready for Pickup'
     )
+
+    # Reminder due times, maintained by messaging.reminders.ReminderSchedule
+    next_pickup_reminder_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='When the next automated pickup reminder is due'
+    )
+    next_debt_reminder_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='When the next automated debt reminder is due'
+    )
     
     # Execution Tracking Fields (assignment → completion metrics)
     first_assigned_at = models.DateTimeField(
@@ -169,6 +213,25 @@ class Task(models.Model):
         blank=True,
         help_text='List of {user_id, name, role, assigned_at} for all technicians involved'
     )
+    # Stored execution time metrics, maintained by Eapp.utils.execution_hours
+    net_execution_hours = models.FloatField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text='Hours from first assignment to completion, excluding return and workshop time'
+    )
+    workshop_hours = models.FloatField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text='Hours spent in an external workshop before completion'
+    )
+    return_hours = models.FloatField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text='Hours spent returned to the customer before completion'
+    )
     
     # Backward compatibility properties
     @property
@@ -199,6 +262,22 @@ class Task(models.Model):
                 fields=['completed_at', 'status'],
                 name='idx_task_completed'
             ),
+            # Keyset pagination on (created_at, id)
+            models.Index(
+                fields=['created_at', 'id'],
+                name='idx_task_created_keyset'
+            ),
+            # Due-now lookups of the reminder jobs; only scheduled tasks are indexed
+            models.Index(
+                fields=['next_pickup_reminder_at'],
+                name='idx_task_pickup_reminder_due',
+                condition=models.Q(next_pickup_reminder_at__isnull=False)
+            ),
+            models.Index(
+                fields=['next_debt_reminder_at'],
+                name='idx_task_debt_reminder_due',
+                condition=models.Q(next_debt_reminder_at__isnull=False)
+            ),
         ]
 
     def __init__(self, *args, **kwargs):
@@ -206,53 +285,43 @@ class Task(models.Model):
         self._original_estimated_cost = self.estimated_cost
 
     def save(self, *args, **kwargs):
+        from messaging.reminders import ReminderSchedule
+
         if not self.pk:
             if self.estimated_cost is not None:
                 self.total_cost = self.estimated_cost
         elif self.estimated_cost != self._original_estimated_cost:
             self.total_cost = self._calculate_total_cost()
+        update_fields = kwargs.get('update_fields')
+        reminder_fields = ReminderSchedule.sync(self, update_fields)
+        if reminder_fields and update_fields is not None:
+            kwargs['update_fields'] = [*update_fields, *reminder_fields]
         super().save(*args, **kwargs)
         self._original_estimated_cost = self.estimated_cost
 
-    # --- Activity-derived helpers and properties ---
-    def _last_activity(self, activity_type):
-        return self.activities.filter(type=activity_type).order_by('-timestamp').first()
-
-    @property
-    def latest_pickup(self):
-        return self._last_activity(TaskActivity.ActivityType.PICKED_UP)
-
+    # --- Activity-derived properties ---
     @property
     def date_out(self):
-        act = self.latest_pickup
-        return act.timestamp if act else None
+        # Backed by the pickup snapshot kept in sync with PICKED_UP activities
+        return self.latest_pickup_at
 
     @property
     def sent_out_by(self):
-        act = self.latest_pickup
-        return act.user if act else None
+        return self.latest_pickup_by
 
     @property
     def latest_workshop_activities(self):
         return self.activities.filter(type=TaskActivity.ActivityType.WORKSHOP).order_by('timestamp')
 
-    @property
-    def workshop_sent_at(self):
-        acts = self.latest_workshop_activities
-        return acts.first().timestamp if acts.exists() else None
-
-    @property
-    def workshop_returned_at(self):
-        acts = self.latest_workshop_activities
-        return acts.last().timestamp if acts.exists() and acts.count() > 1 else None
-
     @property
     def original_technician(self):
         # Prefer snapshot for performance/data-safety; fall back to activity log
         if getattr(self, 'original_technician_snapshot', None):
             return self.original_technician_snapshot
-        acts = self.latest_workshop_activities
-        return acts.first().user if acts.exists() else None
+        if not self.workshop_sent_at:
+            return None
+        act = self.latest_workshop_activities.first()
+        return act.user if act else None
 
     @property
     def original_location(self):
@@ -260,26 +329,6 @@ class Task(models.Model):
         # Return the snapshot FK directly
         return self.original_location_snapshot
 
-    @property
-    def qc_rejected_at(self):
-        act = self._last_activity(TaskActivity.ActivityType.REJECTED)
-        return act.timestamp if act else None
-
-    @property
-    def qc_rejected_by(self):
-        act = self._last_activity(TaskActivity.ActivityType.REJECTED)
-        return act.user if act else None
-
-    @property
-    def approved_at(self):
-        act = self._last_activity(TaskActivity.ActivityType.READY)
-        return act.timestamp if act else None
-
-    @property
-    def approved_by(self):
-        act = self._last_activity(TaskActivity.ActivityType.READY)
-        return act.user if act else None
-
     negotiated_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True, related_name='negotiated_tasks'
     )
@@ -339,7 +388,8 @@ class TaskActivity(models.Model):
 
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='activities')
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add, so bulk_create keeps the time an activity was logged
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     type = models.CharField(max_length=20, choices=ActivityType.choices)
     message = models.TextField()
     details = models.JSONField(null=True, blank=True)
@@ -350,3 +400,53 @@ class TaskActivity(models.Model):
     class Meta:
         ordering = ['-timestamp']
         verbose_name_plural = 'Task Activities'
+
+
+class TaskAssignment(models.Model):
+    """
+    One technician's stint on a task, from assignment until reassignment or unassignment.
+
+    Written from ASSIGNMENT activities by Eapp.signals.record_assignments, so
+    technician involvement can be queried and aggregated in SQL instead of
+    scanning Task.execution_technicians.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='assignments')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_assignments')
+    assigned_at = models.DateTimeField()
+    unassigned_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.task.title} -> {self.user} ({self.assigned_at})'
+
+    class Meta:
+        ordering = ['assigned_at']
+        indexes = [
+            # Per-technician involvement for reports
+            models.Index(
+                fields=['user', 'task'],
+                name='idx_assignment_user_task'
+            ),
+            # Closing the open assignment of a task
+            models.Index(
+                fields=['task', 'unassigned_at'],
+                name='idx_assignment_task_open'
+            ),
+        ]
+
+
+class TaskIDCounter(models.Model):
+    """
+    Per-month sequence counter backing TaskIDGenerator.
+
+    One row per month prefix (e.g. 'A1', 'B12'). The row is incremented with a
+    single atomic UPDATE so concurrent intakes never read the same value.
+    """
+    prefix = models.CharField(max_length=10, unique=True)
+    last_value = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.prefix}: {self.last_value}'
+
+    class Meta:
+        verbose_name = 'Task ID Counter'
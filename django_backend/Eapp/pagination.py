@@ -1,6 +1,198 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
 
-class StandardResultsSetPagination(PageNumberPagination):
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on a unique ordering such as (created_at, id).
+
+    Each page is fetched with a WHERE clause on the last row seen instead of an
+    OFFSET, and no COUNT(*) is run, so every page costs the same regardless of
+    depth. Cursors are opaque base64 tokens carrying the boundary row's key.
+
+    Views may set `keyset_ordering` (e.g. ('-date', '-id')) to override the
+    default ('-created_at', '-id'). The last field must be unique.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None, page_size=None, max_page_size=None):
+        if ordering:
+            self.ordering = tuple(ordering)
+        if page_size:
+            self.page_size = page_size
+        if max_page_size:
+            self.max_page_size = max_page_size
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_ordering(self, view):
+        return tuple(getattr(view, 'keyset_ordering', None) or self.ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering_fields = self.get_ordering(view)
+        page_size = self.get_page_size(request)
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+        ordering = self._invert(self.ordering_fields) if reverse else self.ordering_fields
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    # --- Cursor encoding ---
+
+    def encode_cursor(self, instance, reverse=False):
+        values = []
+        for field in self.ordering_fields:
+            value = getattr(instance, field.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+        payload = json.dumps({'p': values, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, model):
+        """Return (position, reverse); position is None for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            raw_values = payload['p']
+            if len(raw_values) != len(self.ordering_fields):
+                raise ValueError
+            position = [
+                model._meta.get_field(field.lstrip('-')).to_python(raw)
+                for field, raw in zip(self.ordering_fields, raw_values)
+            ]
+            return position, bool(payload.get('r'))
+        except Exception:
+            raise ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+
+    # --- Helpers ---
+
+    def _link(self, instance, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'page')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(instance, reverse))
+
+    @staticmethod
+    def _invert(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    @staticmethod
+    def _after(ordering, position):
+        """
+        Build the row-after-position predicate for the given ordering.
+
+        For ('-created_at', '-id') this is
+            created_at <= v0 AND (created_at < v0 OR (created_at = v0 AND id < v1))
+        The leading bound lets the planner range-scan the composite index.
+        """
+        names = [field.lstrip('-') for field in ordering]
+        ops = ['lt' if field.startswith('-') else 'gt' for field in ordering]
+
+        after = Q()
+        for i, name in enumerate(names):
+            clause = Q(**{f'{name}__{ops[i]}': position[i]})
+            for prev in range(i):
+                clause &= Q(**{names[prev]: position[prev]})
+            after |= clause
+
+        first_bound = 'lte' if ops[0] == 'lt' else 'gte'
+        return Q(**{f'{names[0]}__{first_bound}': position[0]}) & after
+
+
+class KeysetOptInMixin:
+    """
+    Lets a page-number paginator switch to KeysetPagination on request.
+
+    Passing `?cursor=` (empty for the first page) opts in; responses then carry
+    `next`/`previous` cursor links and no `count`. Querysets ordered by an
+    annotation, such as a search rank, cannot be walked by key and keep
+    page-number pagination.
+    """
+    keyset_class = KeysetPagination
+
+    @staticmethod
+    def _ranked(queryset):
+        annotations = queryset.query.annotations
+        return any(str(field).lstrip('-') in annotations for field in queryset.query.order_by)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params and not self._ranked(queryset):
+            self.keyset = self.keyset_class(page_size=self.page_size, max_page_size=self.max_page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if getattr(self, 'keyset', None) is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class StandardResultsSetPagination(KeysetOptInMixin, PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
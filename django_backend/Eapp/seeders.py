@@ -0,0 +1,562 @@
+"""
+Synthetic data for load and scale testing.
+
+seed_tasks() generates customers with encrypted phone numbers and tasks that
+go through a realistic lifecycle (intake, assignment, an optional workshop
+trip, completion, approval, pickup and the occasional return), together with
+their activities, assignment rows, cost breakdowns, payments, SMS logs and
+staff audit logs. Task snapshot and execution-metric columns are derived
+from the generated activities with the same code ActivityLogger uses, so
+reports over seeded data agree with reports over real data.
+
+Rows are written in batches with bulk_create, or with COPY on PostgreSQL,
+using primary keys allocated up front; model signals do not run. What the
+signals would have maintained (the daily task rollup, task ID counters,
+dashboard stats versions and the primary key sequences) is brought up to
+date once at the end. Run it on an idle database: the same seed and options
+always generate the same data.
+"""
+import csv
+import io
+import json
+import os
+import random
+import time as _time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import count
+
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from common.encryption import ENGINE_AESGCM, encrypt_value, get_encryption_key_silent, phone_blind_index
+from common.models import Brand, Location, Model
+from customers.models import Customer, PhoneNumber, Referrer
+from financials.models import CostBreakdown, DebtRequest, Payment, PaymentCategory, PaymentMethod, TransactionRequest
+from messaging.models import MessageLog
+from messaging.reminders import ReminderSchedule
+from settings.models import SystemSettings
+from users.models import AuditLog, User
+from .models import Task, TaskActivity, TaskAssignment, TaskIDCounter
+from .services import ActivityLogger
+from .signals import apply_execution_metrics, assignment_rows
+from .utils import TaskIDGenerator
+
+FIRST_NAMES = [
+    'Amina', 'Baraka', 'Neema', 'Juma', 'Rehema', 'Hassan', 'Zawadi', 'Emmanuel', 'Halima', 'Godfrey',
+    'Mwanaisha', 'Daudi', 'Upendo', 'Salim', 'Grace', 'Omari', 'Faraja', 'Joseph', 'Asha', 'Peter',
+]
+LAST_NAMES = [
+    'Mushi', 'Mollel', 'Kimaro', 'Mwakyusa', 'Swai', 'Lyimo', 'Massawe', 'Mbwambo', 'Shirima', 'Ngowi',
+    'Mrema', 'Temba', 'Makundi', 'Kessy', 'Urio', 'Minja', 'Mfinanga', 'Kisanga', 'Njau', 'Lema',
+]
+BRANDS = {
+    'HP': ['EliteBook 840', 'ProBook 450', 'Pavilion 15'],
+    'Dell': ['Latitude 5490', 'Inspiron 15', 'XPS 13'],
+    'Lenovo': ['ThinkPad T480', 'IdeaPad 3', 'Yoga 7'],
+    'Apple': ['MacBook Air', 'MacBook Pro'],
+    'Acer': ['Aspire 5'],
+    'Asus': ['VivoBook 15'],
+}
+FAULTS = [
+    'No power', 'Broken screen', 'Keyboard not working', 'Overheating', 'Slow performance',
+    'Battery not charging', 'Water damage', 'OS reinstallation', 'Broken hinge', 'No display',
+]
+# (description, amount) of parts added to the estimate on completion
+PARTS = [
+    ('Screen replacement', 120000), ('Keyboard', 45000), ('Battery', 80000),
+    ('Charging port', 30000), ('Hinge', 25000), ('RAM upgrade', 60000),
+]
+LOCATIONS = ['Front Office', 'Repair Room', 'Storage']
+WORKSHOPS = ['External Workshop']
+PAYMENT_METHODS = ['Cash', 'M-Pesa', 'Bank Transfer']
+PAYMENT_CATEGORY = 'TECH SUPPORT'  # Category the add-payment endpoint files task payments under
+
+# Staff created for seeded activity: role -> how many
+STAFF = {'Front Desk': 4, 'Technician': 12, 'Manager': 2, 'Accountant': 1}
+
+# Target status weights by task age in days: (min age, weights)
+STATUS_WEIGHTS = [
+    (30, {'Picked Up': 90, 'Ready for Pickup': 4, 'Completed': 2, 'In Progress': 2, 'Awaiting Parts': 1, 'Pending': 1}),
+    (7, {'Picked Up': 60, 'Ready for Pickup': 15, 'Completed': 8, 'In Progress': 10, 'Awaiting Parts': 4, 'Pending': 3}),
+    (0, {'Picked Up': 20, 'Ready for Pickup': 15, 'Completed': 10, 'In Progress': 30, 'Awaiting Parts': 10, 'Pending': 15}),
+]
+# Lifecycle order of the statuses a seeded task passes through
+LIFECYCLE = ['Pending', 'In Progress', 'Awaiting Parts', 'Completed', 'Ready for Pickup', 'Picked Up']
+
+URGENCY_WEIGHTS = {'Yupo': 50, 'Katoka kidogo': 20, 'Kaacha': 15, 'Expedited': 10, 'Ina Haraka': 5}
+
+
+@contextmanager
+def _explicit_timestamps(*model_classes):
+    """Let bulk_create keep the timestamps set on instances instead of applying auto_now(_add)."""
+    changed = []
+    for model in model_classes:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                changed.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in changed:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class _RowWriter:
+    """Writes batches of unsaved instances with COPY (PostgreSQL) or bulk_create."""
+
+    def __init__(self, use_copy, batch_size):
+        self.use_copy = use_copy
+        self.batch_size = batch_size
+        self.counts = Counter()
+
+    def write(self, model, objs):
+        if not objs:
+            return
+        if self.use_copy:
+            self._copy(model, objs)
+        else:
+            model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.counts[model._meta.label] += len(objs)
+
+    @staticmethod
+    def _copy_value(field, value):
+        if value is None:
+            return r'\N'
+        if isinstance(field, models.JSONField):
+            return json.dumps(value, cls=field.encoder)
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
+
+    def _copy(self, model, objs):
+        fields = model._meta.concrete_fields
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for obj in objs:
+            writer.writerow([self._copy_value(field, getattr(obj, field.attname)) for field in fields])
+        buffer.seek(0)
+
+        quote = connection.ops.quote_name
+        sql = (
+            f"COPY {quote(model._meta.db_table)} ({', '.join(quote(field.column) for field in fields)}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        )
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, 'copy_expert'):  # psycopg2
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+
+class TaskSeeder:
+    """
+    Generates one seeding run. Use seed_tasks() rather than this class directly.
+    """
+
+    # Models written with pre-allocated primary keys
+    MODELS = [Customer, PhoneNumber, Task, TaskActivity, TaskAssignment, CostBreakdown, Payment, MessageLog, AuditLog]
+
+    def __init__(self, tasks, days, seed, batch_size, use_copy, log):
+        self.total = tasks
+        self.days = days
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.writer = _RowWriter(use_copy, batch_size)
+        self.log = log
+        self.tz = timezone.get_current_timezone()
+        self.now = timezone.now()
+        self.end_date = timezone.localdate()
+        self.start_date = self.end_date - timedelta(days=days - 1)
+        self.encryption_key = get_encryption_key_silent()
+        self.customers = []
+        self.sequences = {}
+        self._reset_batch()
+
+    # --- Setup ---
+
+    def _reference_data(self):
+        """Staff, locations, devices, referrers and payment lookups, created if missing."""
+        self.staff = {}
+        for role, number in STAFF.items():
+            users = []
+            for i in range(number):
+                slug = role.lower().replace(' ', '_')
+                user = User.objects.filter(username=f'seed_{slug}_{i + 1}').first()
+                if user is None:
+                    user = User.objects.create_user(
+                        username=f'seed_{slug}_{i + 1}', email=f'seed_{slug}_{i + 1}@example.com', password=None,
+                        first_name=FIRST_NAMES[(i * 7 + len(role)) % len(FIRST_NAMES)],
+                        last_name=LAST_NAMES[(i * 3 + len(role)) % len(LAST_NAMES)], role=role,
+                    )
+                users.append(user)
+            self.staff[role] = users
+
+        self.locations = [Location.objects.get_or_create(name=name)[0] for name in LOCATIONS]
+        self.workshops = [Location.objects.get_or_create(name=name, defaults={'is_workshop': True})[0] for name in WORKSHOPS]
+        self.devices = []
+        for brand_name, model_names in BRANDS.items():
+            brand = Brand.objects.get_or_create(name=brand_name)[0]
+            for model_name in model_names:
+                self.devices.append((brand, Model.objects.get_or_create(name=model_name, brand=brand)[0]))
+        self.referrers = [Referrer.objects.get_or_create(name=f'Seed Referrer {i + 1}')[0] for i in range(10)]
+        self.category = PaymentCategory.objects.get_or_create(name=PAYMENT_CATEGORY)[0]
+        # Methods linked to an account would need their balance recomputed; seeded payments avoid them
+        self.methods = [
+            method for method in (PaymentMethod.objects.get_or_create(name=name)[0] for name in PAYMENT_METHODS)
+            if method.account_id is None
+        ] or [PaymentMethod.objects.create(name=f'Seed {PAYMENT_METHODS[0]}')]
+        # Reminder intervals for the due-time columns Task.save() would set
+        self.system_settings = SystemSettings.get_settings()
+
+        self.ids = {
+            model: count((model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1)
+            for model in self.MODELS
+        }
+        first_created = Task.objects.aggregate(first=Min('created_at'))['first']
+        start_year = self.start_date.year
+        self.first_year = min(first_created.year, start_year) if first_created else start_year
+        # Numbers continue after those of earlier runs so phone numbers stay unique
+        self.phone_numbers = count(self.rng.randrange(10_000_000, 90_000_000) + PhoneNumber.objects.count())
+
+    def _title(self, day):
+        """Next task ID for the intake day, in TaskIDGenerator's format."""
+        offset = int(os.environ.get('TASK_ID_YEAR_OFFSET', 0))
+        prefix = f"{chr(ord('A') + offset + day.year - self.first_year)}{day.month}"
+        if prefix not in self.sequences:
+            counter = TaskIDCounter.objects.filter(prefix=prefix).values_list('last_value', flat=True).first()
+            self.sequences[prefix] = max(counter or 0, TaskIDGenerator._last_used_sequence(prefix))
+        self.sequences[prefix] += 1
+        return f'{prefix}-{self.sequences[prefix]:03d}'
+
+    def _daily_counts(self):
+        """Spread the tasks over the days: quieter weekends, growing towards today."""
+        days = [self.start_date + timedelta(days=i) for i in range(self.days)]
+        weights = [
+            (0.15 if day.weekday() == 6 else 0.6 if day.weekday() == 5 else 1.0) * (0.7 + 0.6 * i / max(1, self.days - 1))
+            for i, day in enumerate(days)
+        ]
+        return sorted(Counter(self.rng.choices(days, weights=weights, k=self.total)).items())
+
+    # --- Generation ---
+
+    def _reset_batch(self):
+        self.batch = {model: [] for model in self.MODELS}
+        self.assignment_entries = []
+
+    def _at(self, day, start_hour=8, end_hour=18):
+        minutes = self.rng.randrange(start_hour * 60, end_hour * 60)
+        return datetime.combine(day, time(minutes // 60, minutes % 60), tzinfo=self.tz)
+
+    def _customer(self, at):
+        """A returning customer (three times in ten) or a new one with an encrypted phone."""
+        if self.customers and self.rng.random() < 0.3:
+            return self.customers[self.rng.randrange(len(self.customers))]
+
+        name = f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+        customer = Customer(
+            id=next(self.ids[Customer]), name=name, created_at=at,
+            customer_type='Repairman' if self.rng.random() < 0.1 else 'Normal',
+        )
+        phone = f'+2557{next(self.phone_numbers) % 100_000_000:08d}'
+        stored = encrypt_value(phone, engine=ENGINE_AESGCM) if self.encryption_key else phone
+        self.batch[Customer].append(customer)
+        self.batch[PhoneNumber].append(PhoneNumber(
+            id=next(self.ids[PhoneNumber]), customer=customer, phone_number=stored, phone_hash=phone_blind_index(phone),
+        ))
+        self.customers.append((customer, phone))
+        return customer, phone
+
+    def _log(self, task, activity, at):
+        """Record an activity and apply it to the task the way ActivityLogger's batch flush does."""
+        activity.id = next(self.ids[TaskActivity])
+        activity.timestamp = at
+        ActivityLogger.apply_snapshots(task, activity, save=False)
+        apply_execution_metrics(task, activity)
+        self.batch[TaskActivity].append(activity)
+        if activity.type == TaskActivity.ActivityType.ASSIGNMENT:
+            self.assignment_entries.append((task.pk, at, activity.details))
+        task.updated_at = at
+
+    def _pay(self, task, amount, at, customer):
+        method = self.rng.choice(self.methods)
+        self.batch[Payment].append(Payment(
+            id=next(self.ids[Payment]), task=task, amount=amount, date=timezone.localdate(at),
+            method=method, payment_method_name=method.name, category=self.category,
+            description=f'{customer.name} - {task.title}',
+        ))
+        task.paid_amount += amount
+
+    def _target_status(self, day):
+        age = (self.end_date - day).days
+        weights = next(weights for min_age, weights in STATUS_WEIGHTS if age >= min_age)
+        return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _task(self, day):
+        rng = self.rng
+        intake_at = self._at(day)
+        front_desk = rng.choice(self.staff['Front Desk'])
+        manager = rng.choice(self.staff['Manager'])
+        technician = rng.choice(self.staff['Technician'])
+        customer, phone = self._customer(intake_at)
+        brand, laptop_model = rng.choice(self.devices)
+        referrer = rng.choice(self.referrers) if rng.random() < 0.08 else None
+        estimate = Decimal(rng.randrange(20, 400) * 1000)
+
+        task = Task(
+            id=next(self.ids[Task]), title=self._title(day), description=rng.choice(FAULTS),
+            status='Pending', created_by=front_desk, customer=customer, brand=brand, laptop_model=laptop_model,
+            device_type=rng.choices(list(Task.DeviceType.values), weights=[85, 10, 5])[0],
+            estimated_cost=estimate, total_cost=estimate, paid_amount=Decimal('0'),
+            current_location=rng.choice(self.locations),
+            urgency=rng.choices(list(URGENCY_WEIGHTS), weights=list(URGENCY_WEIGHTS.values()))[0],
+            date_in=day, is_referred=referrer is not None, referred_by=referrer,
+            created_at=intake_at, updated_at=intake_at,
+        )
+        self._log(task, TaskActivity(task=task, user=front_desk, type=TaskActivity.ActivityType.INTAKE,
+                                     message='Task has been taken in.'), intake_at)
+        if rng.random() < 0.15:
+            self._pay(task, (estimate * Decimal('0.3')).quantize(Decimal('1000')), intake_at, customer)
+
+        target = LIFECYCLE.index(self._target_status(day))
+        at = intake_at
+        # Each step happens some hours after the previous one; stop at the target or at the present
+        def advance(min_hours, max_hours):
+            nonlocal at
+            next_at = at + timedelta(hours=rng.uniform(min_hours, max_hours))
+            if next_at > self.now:
+                return False
+            at = next_at
+            return True
+
+        if target >= 1 and advance(0.2, 6):
+            task.status, task.assigned_to = 'In Progress', technician
+            self._log(task, ActivityLogger.assignment_activity(task, manager, None, technician), at)
+            self._work(task, target, technician, advance, lambda: at)
+
+        self._pickup_and_return(task, target, manager, front_desk, technician, customer, phone, advance, lambda: at)
+        ReminderSchedule.sync(task, system_settings=self.system_settings)
+        self.batch[Task].append(task)
+
+    def _work(self, task, target, technician, advance, now):
+        """Awaiting parts, an optional workshop trip and completion."""
+        rng = self.rng
+        if target == LIFECYCLE.index('Awaiting Parts') or (target > 2 and rng.random() < 0.1):
+            if not advance(1, 24):
+                return
+            task.status = 'Awaiting Parts'
+            if target == LIFECYCLE.index('Awaiting Parts') or not advance(24, 96):
+                return
+            task.status = 'In Progress'
+
+        if target > 2 and rng.random() < 0.1 and advance(2, 24):
+            workshop = rng.choice(self.workshops)
+            task.original_technician_snapshot = technician
+            task.original_location_snapshot = task.current_location
+            task.workshop_status, task.workshop_location, task.current_location = 'In Workshop', workshop, workshop
+            self._log(task, TaskActivity(
+                task=task, user=technician, type=TaskActivity.ActivityType.WORKSHOP,
+                message=f'Task sent to workshop at {workshop.name}.',
+                details={'workshop_location_id': workshop.id, 'workshop_location_name': workshop.name},
+            ), now())
+            if not advance(24, 120):
+                return
+            outcome = 'Solved' if rng.random() < 0.8 else 'Not Solved'
+            task.workshop_status, task.workshop_location = outcome, None
+            task.current_location = task.original_location_snapshot
+            self._log(task, TaskActivity(
+                task=task, user=technician, type=TaskActivity.ActivityType.WORKSHOP,
+                message=f'Task returned from workshop with status: {outcome}.', details={'workshop_status': outcome},
+            ), now())
+
+        if target > 2 and advance(2, 48):
+            self._complete(task, technician, now())
+
+    def _complete(self, task, technician, at):
+        rng = self.rng
+        outcome = 'Solved' if rng.random() < 0.9 else 'Not Solved'
+        task.status = 'Completed'
+        self._log(task, TaskActivity(
+            task=task, user=technician, type=TaskActivity.ActivityType.STATUS_UPDATE,
+            message=f'Task marked as Completed with outcome: {outcome}.',
+            details={'new_status': 'Completed', 'completion_outcome': outcome,
+                     'outcome_by_id': technician.id, 'outcome_by_name': technician.get_full_name()},
+        ), at)
+        if not self.batch[CostBreakdown] or self.batch[CostBreakdown][-1].task is not task:
+            if rng.random() < 0.35:
+                description, amount = rng.choice(PARTS)
+                self._cost(task, description, Decimal(amount), CostBreakdown.CostType.ADDITIVE, at)
+            if rng.random() < 0.05:
+                self._cost(task, 'Discount', Decimal(rng.randrange(5, 20) * 1000), CostBreakdown.CostType.SUBTRACTIVE, at)
+
+    def _cost(self, task, description, amount, cost_type, at):
+        self.batch[CostBreakdown].append(CostBreakdown(
+            id=next(self.ids[CostBreakdown]), task=task, description=description, amount=amount,
+            cost_type=cost_type, category=cost_type, created_at=at,
+        ))
+        task.total_cost += amount if cost_type == CostBreakdown.CostType.ADDITIVE else -amount
+
+    def _pickup_and_return(self, task, target, manager, front_desk, technician, customer, phone, advance, now):
+        """Approval, SMS, pickup with payment or debt, and a return for a few picked-up tasks."""
+        rng = self.rng
+        returned = False
+        while task.status == 'Completed' and target >= LIFECYCLE.index('Ready for Pickup') and advance(0.5, 12):
+            task.status, task.ready_for_pickup_at = 'Ready for Pickup', now()
+            self._log(task, ActivityLogger.status_change_activity(task, manager, 'Ready for Pickup'), now())
+            self.batch[MessageLog].append(MessageLog(
+                id=next(self.ids[MessageLog]), task=task, recipient_phone=phone, sent_by=manager, sent_at=now(),
+                message_content=f'Habari {customer.name}, kifaa chako {task.title} kiko tayari kuchukuliwa.',
+                status='sent' if rng.random() < 0.97 else 'failed',
+            ))
+            if target < LIFECYCLE.index('Picked Up') or not advance(2, 96):
+                break
+
+            task.status = 'Picked Up'
+            pickup = ActivityLogger.status_change_activity(task, front_desk, 'Picked Up')
+            pickup.details['pickup_at'] = now().isoformat()
+            self._log(task, pickup, now())
+            balance = task.total_cost - task.paid_amount
+            if rng.random() < 0.08:
+                task.is_debt = True
+                balance = (balance / 2).quantize(Decimal('1000'))
+            if balance > 0:
+                self._pay(task, balance, now(), customer)
+
+            # A few customers bring the device back within a week
+            if returned or rng.random() > 0.04 or not advance(24, 144):
+                break
+            returned = True
+            task.status = 'In Progress'
+            self._log(task, TaskActivity(task=task, user=front_desk, type=TaskActivity.ActivityType.RETURNED,
+                                         message=f'Customer reports: {rng.choice(FAULTS).lower()}'), now())
+            if not advance(0.5, 6):
+                break
+            self._log(task, TaskActivity(
+                task=task, user=manager, type=TaskActivity.ActivityType.ASSIGNMENT,
+                message=f'Returned task assigned to {technician.get_full_name()}.',
+                details={'new_technician_id': technician.id, 'new_technician_name': technician.get_full_name()},
+            ), now())
+            if advance(2, 48):
+                self._complete(task, technician, now())
+
+        task.update_payment_status(net_paid=task.paid_amount)
+        if task.is_debt and task.payment_status == Task.PaymentStatus.FULLY_PAID:
+            task.is_debt = False
+
+    def _audit_logs(self):
+        """One login per staff member on most working days."""
+        logs = []
+        for i in range(self.days):
+            day = self.start_date + timedelta(days=i)
+            for users in self.staff.values():
+                for user in users:
+                    if day.weekday() == 6 or self.rng.random() > 0.85:
+                        continue
+                    at = self._at(day, 7, 10)
+                    if at > self.now:
+                        continue
+                    logs.append(AuditLog(
+                        id=next(self.ids[AuditLog]), user=user, action='login', resource_type='user',
+                        resource_id=str(user.id), ip_address=f'10.0.0.{user.id % 250 + 2}',
+                        user_agent='Mozilla/5.0 (seed)', severity='info', created_at=at,
+                    ))
+        self.writer.write(AuditLog, logs)
+
+    # --- Writing ---
+
+    def _flush(self):
+        closes, rows = assignment_rows(self.assignment_entries)
+        for row in rows:
+            row.id = next(self.ids[TaskAssignment])
+        self.batch[TaskAssignment] = rows
+        with transaction.atomic():
+            for model in self.MODELS:
+                self.writer.write(model, self.batch[model])
+        self._reset_batch()
+
+    def _finish(self):
+        """Bring up to date what the skipped signals and generators would have maintained."""
+        from common.stats import invalidate
+        from reports.rollup import TaskRollup
+
+        for prefix, last_value in self.sequences.items():
+            TaskIDCounter.objects.update_or_create(prefix=prefix, defaults={'last_value': last_value})
+        TaskIDGenerator._first_year = None
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), self.MODELS):
+                    cursor.execute(sql)
+        TaskRollup.rebuild(self.start_date, self.end_date)
+        invalidate('tasks', 'payments', 'messages')
+
+    def run(self):
+        started = _time.monotonic()
+        self._reference_data()
+        with _explicit_timestamps(*self.MODELS):
+            created = 0
+            for day, tasks in self._daily_counts():
+                for _ in range(tasks):
+                    self._task(day)
+                created += tasks
+                if len(self.batch[Task]) >= self.batch_size:
+                    self._flush()
+                    self.log(f'{created}/{self.total} tasks ({created / (_time.monotonic() - started) * 60:,.0f} per minute)')
+            self._flush()
+            self._audit_logs()
+        self._finish()
+        self.writer.counts['seconds'] = round(_time.monotonic() - started, 1)
+        return dict(self.writer.counts)
+
+
+def seed_tasks(tasks=1000, days=365, seed=42, batch_size=5000, use_copy=None, log=print):
+    """
+    Generate synthetic tasks and everything that hangs off them.
+
+    Args:
+        tasks (int): Number of tasks to create
+        days (int): Intake dates are spread over this many days up to today
+        seed (int): Random seed; the same seed and options give the same data
+        batch_size (int): Tasks generated and written per transaction
+        use_copy (bool): Write with COPY; defaults to True on PostgreSQL
+        log: Callable for progress messages
+
+    Returns:
+        dict: Rows written per model label, plus elapsed 'seconds'
+    """
+    if use_copy is None:
+        use_copy = connection.vendor == 'postgresql'
+    elif use_copy and connection.vendor != 'postgresql':
+        raise ValueError('COPY is only available on PostgreSQL')
+    return TaskSeeder(tasks, days, seed, batch_size, use_copy, log).run()
+
+
+def clear_tasks():
+    """
+    Delete every task and the rows that belong to it.
+
+    Per-row signals are skipped: dependent tables are emptied with plain
+    DELETE statements and the daily rollup and task ID counters are reset.
+    Customers, staff and lookups are kept.
+    """
+    from reports.models import DailyTaskRollup
+
+    quote = connection.ops.quote_name
+    with transaction.atomic():
+        TransactionRequest.objects.filter(task__isnull=False).update(task=None)
+        DebtRequest.objects.all().delete()
+        with connection.cursor() as cursor:
+            for model in (TaskAssignment, TaskActivity, CostBreakdown, MessageLog, Payment, Task):
+                where = f" WHERE {quote('task_id')} IS NOT NULL" if model is Payment else ''
+                cursor.execute(f'DELETE FROM {quote(model._meta.db_table)}{where}')
+        DailyTaskRollup.objects.all().delete()
+        TaskIDCounter.objects.all().delete()
+    TaskIDGenerator._first_year = None
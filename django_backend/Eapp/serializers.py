@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.core.validators import MinValueValidator
 from decimal import Decimal
-from common.serializers import BrandSerializer, LocationSerializer, ModelSerializer
+from common.models import Location
+from common.serializers import BrandSerializer, LocationSerializer, ModelSerializer, SparseFieldsetMixin
 from customers.serializers import CustomerSerializer, ReferrerSerializer, CustomerListSerializer
 from .models import Task, TaskActivity
 from users.serializers import UserSerializer, UserListSerializer
@@ -15,7 +16,7 @@ class TaskActivitySerializer(serializers.ModelSerializer):
         model = TaskActivity
         fields = ("id", "user", "timestamp", "type", "message", "details")
 
-class TaskListSerializer(serializers.ModelSerializer):
+class TaskListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     customer_details = CustomerListSerializer(source='customer', read_only=True)
     assigned_to_details = UserListSerializer(source='assigned_to', read_only=True)
     outstanding_balance = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
@@ -49,7 +50,16 @@ class TaskListSerializer(serializers.ModelSerializer):
             'to_be_checked',
         )
 
-class TaskDetailSerializer(serializers.ModelSerializer):
+    related_fields = {
+        'current_location_details': (('current_location',), ()),
+        'brand_details': (('brand',), ()),
+        'laptop_model_details': (('laptop_model',), ()),
+        'customer_details': (('customer',), ('customer__phone_numbers',)),
+        'assigned_to_details': (('assigned_to',), ()),
+    }
+    expandable_fields = tuple(related_fields)
+
+class TaskDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     assigned_to_details = UserSerializer(source="assigned_to", read_only=True)
     created_by_details = UserSerializer(source="created_by", read_only=True)
     approved_by_details = UserSerializer(source="approved_by", read_only=True)
@@ -123,6 +133,41 @@ class TaskDetailSerializer(serializers.ModelSerializer):
             "estimated_cost": {"validators": [MinValueValidator(Decimal("0.00"))]},
         }
 
+    related_fields = {
+        'assigned_to_details': (('assigned_to',), ()),
+        'created_by_details': (('created_by',), ()),
+        'customer_details': (('customer',), ('customer__phone_numbers',)),
+        'brand_details': (('brand',), ()),
+        'laptop_model_details': (('laptop_model',), ()),
+        'current_location_details': (('current_location',), ()),
+        'current_location_name': (('current_location',), ()),
+        'negotiated_by_details': (('negotiated_by',), ()),
+        'activities': ((), ('activities__user',)),
+        'payments': ((), ('payments__method', 'payments__category')),
+        'referred_by': (('referred_by',), ()),
+        'referred_by_details': (('referred_by',), ()),
+        'original_location_snapshot_details': (('original_location_snapshot',), ()),
+        'original_location_name': (('original_location_snapshot',), ()),
+        'original_technician': (('original_technician_snapshot',), ()),
+        'original_technician_details': (('original_technician_snapshot',), ()),
+        'workshop_location_details': (('workshop_location',), ()),
+        'original_technician_snapshot_details': (('original_technician_snapshot',), ()),
+        'approved_by_details': (('approved_by',), ()),
+        'latest_pickup_by_details': (('latest_pickup_by',), ()),
+        'sent_out_by': (('latest_pickup_by',), ()),
+        'sent_out_by_details': (('latest_pickup_by',), ()),
+        'cost_breakdowns': ((), ('cost_breakdowns',)),
+    }
+    # Nested objects, only serialized when requested once ?fields=/?expand= is used
+    expandable_fields = (
+        'assigned_to_details', 'created_by_details', 'customer_details', 'brand_details',
+        'laptop_model_details', 'current_location_details', 'negotiated_by_details',
+        'activities', 'payments', 'referred_by_details', 'original_location_snapshot_details',
+        'original_technician_details', 'workshop_location_details',
+        'original_technician_snapshot_details', 'approved_by_details',
+        'latest_pickup_by_details', 'sent_out_by_details', 'cost_breakdowns',
+    )
+
     def validate(self, data):
         device_type = data.get("device_type")
         device_notes = data.get("device_notes")
@@ -145,6 +190,38 @@ class TaskDetailSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class BulkTaskOperationSerializer(serializers.Serializer):
+    task_ids = serializers.ListField(
+        child=serializers.CharField(), allow_empty=False, max_length=500
+    )
+    operation = serializers.ChoiceField(choices=['assign', 'transition', 'relocate'])
+    assigned_to = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(is_active=True), allow_null=True, required=False
+    )
+    status = serializers.ChoiceField(choices=Task.Status.choices, required=False)
+    location = serializers.PrimaryKeyRelatedField(
+        queryset=Location.objects.all(), required=False
+    )
+
+    def validate(self, data):
+        operation = data["operation"]
+        if operation == "assign" and "assigned_to" not in data:
+            raise serializers.ValidationError({"assigned_to": "This field is required for 'assign'."})
+        if operation == "transition":
+            if not data.get("status"):
+                raise serializers.ValidationError({"status": "This field is required for 'transition'."})
+            from .services.bulk_task_service import BulkTaskService
+            if data["status"] in BulkTaskService.NON_BULK_STATUSES:
+                raise serializers.ValidationError(
+                    {"status": f"'{data['status']}' has per-task side effects and must be set per task."}
+                )
+        if operation == "relocate" and not data.get("location"):
+            raise serializers.ValidationError({"location": "This field is required for 'relocate'."})
+        # Preserve request order, drop duplicates
+        data["task_ids"] = list(dict.fromkeys(data["task_ids"]))
+        return data
+
+
 class ReportConfigSerializer(serializers.Serializer):
     reportName = serializers.CharField(max_length=255)
     selectedType = serializers.CharField()
@@ -7,10 +7,14 @@ separated from the view layer for better testability and maintainability.
 from .activity_logger import ActivityLogger
 from .workshop_handler import WorkshopHandler
 from .task_service import TaskCreationService, TaskUpdateService
+from .task_search import TaskSearch
+from .bulk_task_service import BulkTaskService
 
 __all__ = [
     'ActivityLogger',
     'WorkshopHandler',
     'TaskCreationService',
     'TaskUpdateService',
+    'TaskSearch',
+    'BulkTaskService',
 ]
@@ -3,14 +3,180 @@ Activity Logger Service
 
 Centralized service for creating TaskActivity records with consistent
 formatting and metadata handling.
+
+Inside ``with ActivityLogger.batch():`` activities are collected instead of
+saved one by one, then written with a single bulk_create and a single Task
+UPDATE (snapshot and execution-metric columns) when the block exits.
 """
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.utils import timezone
-from Eapp.models import TaskActivity
+from Eapp.models import Task, TaskActivity
+from Eapp.signals import EXECUTION_METRIC_FIELDS, apply_execution_metrics, record_assignments
+
+# Activities collected by the innermost open ActivityLogger.batch(), if any
+_current_batch = ContextVar('activity_batch', default=None)
+
+
+# Activity type -> (timestamp field, user field) snapshotted on Task
+SNAPSHOT_FIELDS = {
+    TaskActivity.ActivityType.READY: ('approved_at', 'approved_by'),
+    TaskActivity.ActivityType.REJECTED: ('qc_rejected_at', 'qc_rejected_by'),
+    TaskActivity.ActivityType.PICKED_UP: ('latest_pickup_at', 'latest_pickup_by'),
+}
 
 
 class ActivityLogger:
     """Centralized activity logging for tasks."""
     
+    @staticmethod
+    def _create(task, user, activity_type, message, details=None):
+        """Create a TaskActivity and refresh the matching Task snapshot columns."""
+        return ActivityLogger.record(task, TaskActivity(
+            task=task,
+            user=user,
+            type=activity_type,
+            message=message,
+            details=details
+        ))
+    
+    @staticmethod
+    def record(task, activity):
+        """
+        Persist an unsaved activity, e.g. one from the *_activity() builders.
+        
+        Inside a batch() the activity is queued and saved when the batch closes.
+        """
+        if activity is None:
+            return None
+        batch = _current_batch.get()
+        if batch is not None:
+            # Stamped now, not when the batch is written, so activities keep the time they were logged
+            activity.timestamp = timezone.now()
+            batch.append((task, activity))
+            return activity
+        # The TaskActivity post_save signal writes the snapshot columns with the execution metrics
+        activity.save()
+        return activity
+    
+    @staticmethod
+    @contextmanager
+    def batch():
+        """
+        Collect activities logged inside the block and write them in bulk.
+        
+        On exit the activities are bulk-created in logging order and each
+        affected task gets one UPDATE covering the snapshot columns and the
+        execution metrics the post_save signal would have set, plus at most one
+        UPDATE and one INSERT for TaskAssignment rows, with the same end result
+        as logging them one at a time. Nested batches join the
+        outermost one. Nothing is written if the block raises.
+        
+        Example:
+            with ActivityLogger.batch():
+                ActivityLogger.log_intake(task, user)
+                ActivityLogger.log_assignment(task, user, None, technician)
+        """
+        if _current_batch.get() is not None:
+            yield
+            return
+        
+        entries = []
+        token = _current_batch.set(entries)
+        try:
+            yield
+        finally:
+            _current_batch.reset(token)
+        ActivityLogger._flush(entries)
+    
+    @staticmethod
+    def _flush(entries):
+        """Write a closed batch: one INSERT for the activities, one UPDATE for the tasks."""
+        if not entries:
+            return
+        
+        # bulk_create skips post_save, so the signal's work is applied here instead
+        TaskActivity.objects.bulk_create([activity for _, activity in entries])
+        
+        tasks = {}
+        fields = set(EXECUTION_METRIC_FIELDS)
+        for task, activity in entries:
+            fields.update(ActivityLogger.apply_snapshots(task, activity, save=False) or [])
+            apply_execution_metrics(task, activity)
+            tasks[task.pk] = task
+        
+        fields = sorted(fields)
+        if len(tasks) == 1:
+            next(iter(tasks.values())).save(update_fields=fields)
+        else:
+            ActivityLogger._bulk_save(list(tasks.values()), fields)
+        record_assignments(entries)
+    
+    @staticmethod
+    def _bulk_save(tasks, fields):
+        """
+        Save ``fields`` on many tasks with one bulk_update.
+        
+        bulk_update bypasses Task.save() and the Task post_save receivers, so
+        their work is done here: reminder due times are synced (Task.save),
+        the daily rollup is moved (reports.signals) and the task stats are
+        invalidated (Eapp.signals).
+        """
+        from common.stats import invalidate as invalidate_stats
+        from messaging.reminders import ReminderSchedule
+        from reports.rollup import TaskRollup
+        
+        fields = set(fields)
+        for task in tasks:
+            fields.update(ReminderSchedule.sync(task, fields))
+        Task.objects.bulk_update(tasks, sorted(fields))
+        
+        for task in tasks:
+            new_key = TaskRollup.key(task)
+            old_key = getattr(task, '_rollup_key', None)
+            if new_key is not None and old_key is not None:
+                TaskRollup.record_change(old_key, new_key)
+                task._rollup_key = new_key
+        invalidate_stats('tasks')
+    
+    @staticmethod
+    def apply_snapshots(task, activity, save=True):
+        """
+        Copy activity-derived values onto the task's snapshot columns.
+        
+        Keeps approved_at/by, qc_rejected_at/by, latest_pickup_at/by (date_out,
+        sent_out_by) and workshop_sent_at/returned_at in step with the activity
+        log so task serialization does not need to query TaskActivity.
+        
+        Args:
+            task: Task instance
+            activity: Newly created TaskActivity instance
+            save: Save the changed columns (False lets bulk callers batch them)
+            
+        Returns:
+            list: Names of the changed fields, or None if nothing changed
+        """
+        if activity.type in SNAPSHOT_FIELDS:
+            at_field, by_field = SNAPSHOT_FIELDS[activity.type]
+            setattr(task, at_field, activity.timestamp)
+            setattr(task, by_field, activity.user)
+            update_fields = [at_field, by_field]
+        elif activity.type == TaskActivity.ActivityType.WORKSHOP:
+            # First workshop activity is the send; any later one is the latest return
+            if task.workshop_sent_at is None:
+                task.workshop_sent_at = activity.timestamp
+                update_fields = ['workshop_sent_at']
+            else:
+                task.workshop_returned_at = activity.timestamp
+                update_fields = ['workshop_returned_at']
+        else:
+            return
+        
+        if save:
+            task.save(update_fields=update_fields)
+        return update_fields
+    
     @staticmethod
     def log_intake(task, user, notes=None):
         """
@@ -25,10 +191,10 @@ class ActivityLogger:
         if notes:
             message += f" Notes: {notes}"
         
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.INTAKE,
+            activity_type=TaskActivity.ActivityType.INTAKE,
             message=message
         )
     
@@ -42,10 +208,10 @@ class ActivityLogger:
             user: User who performed the action
             notes: Device notes
         """
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.DEVICE_NOTE,
+            activity_type=TaskActivity.ActivityType.DEVICE_NOTE,
             message=f"Device Notes: {notes}"
         )
     
@@ -60,6 +226,18 @@ class ActivityLogger:
             old_technician: Previous technician (None if initial assignment)
             new_technician: New technician (None if unassignment)
         """
+        return ActivityLogger.record(
+            task, ActivityLogger.assignment_activity(task, user, old_technician, new_technician)
+        )
+    
+    @staticmethod
+    def assignment_activity(task, user, old_technician=None, new_technician=None):
+        """
+        Build (without saving) the activity log_assignment() would create.
+        
+        Returns:
+            TaskActivity: Unsaved activity, or None if there is nothing to log
+        """
         details = {}
         if new_technician:
             details.update({
@@ -77,9 +255,9 @@ class ActivityLogger:
             if old_technician:
                 message = f"Task unassigned from {old_technician.get_full_name()} by {user.get_full_name()}."
             else:
-                return  # No change, don't log
+                return None  # No change, don't log
         
-        return TaskActivity.objects.create(
+        return TaskActivity(
             task=task,
             user=user,
             type=TaskActivity.ActivityType.ASSIGNMENT,
@@ -97,6 +275,18 @@ class ActivityLogger:
             user: User who performed the action
             new_status: New status value
         """
+        return ActivityLogger.record(
+            task, ActivityLogger.status_change_activity(task, user, new_status)
+        )
+    
+    @staticmethod
+    def status_change_activity(task, user, new_status):
+        """
+        Build (without saving) the activity log_status_change() would create.
+        
+        Returns:
+            TaskActivity: Unsaved activity, or None if the status is not logged
+        """
         activity_messages = {
             'Picked Up': "Task has been picked up by the customer.",
             'Completed': "Task marked as Completed.",
@@ -117,14 +307,10 @@ class ActivityLogger:
                 'pickup_by_name': user.get_full_name(),
                 'pickup_at': pickup_time.isoformat()
             })
-            # Update pickup snapshot fields
-            task.latest_pickup_at = pickup_time
-            task.latest_pickup_by = user
-            task.save(update_fields=['latest_pickup_at', 'latest_pickup_by'])
         elif new_status == 'Ready for Pickup':
             activity_type = TaskActivity.ActivityType.READY
         
-        return TaskActivity.objects.create(
+        return TaskActivity(
             task=task,
             user=user,
             type=activity_type,
@@ -153,10 +339,10 @@ class ActivityLogger:
             'outcome_by_name': user.get_full_name()
         }
         
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.STATUS_UPDATE,
+            activity_type=TaskActivity.ActivityType.STATUS_UPDATE,
             message=message,
             details=details
         )
@@ -179,10 +365,10 @@ class ActivityLogger:
         
         message = f"Task sent to workshop at {location.name}."
         
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.WORKSHOP,
+            activity_type=TaskActivity.ActivityType.WORKSHOP,
             message=message,
             details=details
         )
@@ -200,10 +386,10 @@ class ActivityLogger:
         details = {'workshop_status': workshop_status}
         message = f"Task returned from workshop with status: {workshop_status}."
         
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.WORKSHOP,
+            activity_type=TaskActivity.ActivityType.WORKSHOP,
             message=message,
             details=details
         )
@@ -226,10 +412,10 @@ class ActivityLogger:
             'verified_by_name': user.get_full_name()
         }
         
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.WORKSHOP,
+            activity_type=TaskActivity.ActivityType.WORKSHOP,
             message=message,
             details=details
         )
@@ -252,10 +438,10 @@ class ActivityLogger:
             'disputed_by_name': user.get_full_name()
         }
         
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.WORKSHOP,
+            activity_type=TaskActivity.ActivityType.WORKSHOP,
             message=message,
             details=details
         )
@@ -272,10 +458,10 @@ class ActivityLogger:
         """
         message = f"Task rejected by {user.get_full_name()} with notes: {reason}"
         
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.REJECTED,
+            activity_type=TaskActivity.ActivityType.REJECTED,
             message=message
         )
     
@@ -289,10 +475,10 @@ class ActivityLogger:
             user: User who performed the action
             message: Optional custom message (default: "Task marked as debt.")
         """
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.STATUS_UPDATE,
+            activity_type=TaskActivity.ActivityType.STATUS_UPDATE,
             message=message or "Task marked as debt."
         )
     
@@ -306,13 +492,27 @@ class ActivityLogger:
             user: User who performed the action
             technician: Technician assigned to returned task
         """
-        message = f"Returned task assigned to {technician.get_full_name()}."
+        return ActivityLogger.record(
+            task, ActivityLogger.returned_task_assignment_activity(task, user, technician)
+        )
+    
+    @staticmethod
+    def returned_task_assignment_activity(task, user, technician):
+        """
+        Build (without saving) the activity log_returned_task_assignment() would create.
         
-        return TaskActivity.objects.create(
+        Returns:
+            TaskActivity: Unsaved activity
+        """
+        return TaskActivity(
             task=task,
             user=user,
             type=TaskActivity.ActivityType.ASSIGNMENT,
-            message=message
+            message=f"Returned task assigned to {technician.get_full_name()}.",
+            details={
+                'new_technician_id': technician.id,
+                'new_technician_name': technician.get_full_name()
+            }
         )
     
     @staticmethod
@@ -329,10 +529,10 @@ class ActivityLogger:
         """
         message = f"Cost breakdown item added: {description} - TSh {amount} ({cost_type}) by {user.get_full_name()}."
         
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.STATUS_UPDATE,
+            activity_type=TaskActivity.ActivityType.STATUS_UPDATE,
             message=message,
             details={
                 'action': 'cost_breakdown_add',
@@ -355,10 +555,10 @@ class ActivityLogger:
         """
         message = f"Cost breakdown item removed: {description} - TSh {amount} by {user.get_full_name()}."
         
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.STATUS_UPDATE,
+            activity_type=TaskActivity.ActivityType.STATUS_UPDATE,
             message=message,
             details={
                 'action': 'cost_breakdown_delete',
@@ -378,9 +578,9 @@ class ActivityLogger:
         """
         message = "Task has been terminated. Proceed for pickup."
         
-        return TaskActivity.objects.create(
+        return ActivityLogger._create(
             task=task,
             user=user,
-            type=TaskActivity.ActivityType.STATUS_UPDATE,
+            activity_type=TaskActivity.ActivityType.STATUS_UPDATE,
             message=message
         )
@@ -0,0 +1,153 @@
+"""
+Bulk Task Service
+
+Applies one operation (assign, transition or relocate) to many tasks in a
+single transaction: permissions are checked in memory, task columns are
+changed with set-based UPDATEs, activities are written through an
+ActivityLogger batch (one INSERT, one metrics UPDATE) and a single
+WebSocket event is broadcast for the whole batch.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from Eapp.models import Task
+from Eapp.utils.status_transitions import can_transition
+from .activity_logger import ActivityLogger
+
+
+class BulkTaskService:
+    """Service for bulk task operations."""
+
+    ASSIGN = 'assign'
+    TRANSITION = 'transition'
+    RELOCATE = 'relocate'
+    OPERATIONS = (ASSIGN, TRANSITION, RELOCATE)
+
+    # Statuses with per-task side effects, set only through the single-task update:
+    # Ready for Pickup and Picked Up notify the customer by SMS, and Completed
+    # records the repair outcome and closes any workshop round trip
+    NON_BULK_STATUSES = (Task.Status.COMPLETED, Task.Status.READY_FOR_PICKUP, Task.Status.PICKED_UP)
+
+    @staticmethod
+    def apply(user, task_ids, operation, assigned_to=None, new_status=None, location=None):
+        """
+        Apply one operation to a list of tasks.
+
+        Args:
+            user: User performing the operation
+            task_ids (list): Task titles
+            operation (str): 'assign', 'transition' or 'relocate'
+            assigned_to: Technician for 'assign' (None unassigns)
+            new_status (str): Target status for 'transition'
+            location: Location for 'relocate'
+
+        Returns:
+            list: One {'task_id', 'success'[, 'error']} dict per requested ID, in request order
+        """
+        from common.stats import invalidate as invalidate_stats
+        from messaging.reminders import REMINDER_FIELDS
+        from notifications.utils import broadcast_tasks_bulk_update
+        from reports.rollup import TaskRollup
+
+        errors = {}
+        now = timezone.now()
+
+        with transaction.atomic():
+            tasks = list(
+                Task.objects.select_for_update(of=('self',))
+                .select_related('assigned_to')
+                .filter(title__in=task_ids)
+            )
+            found = {task.title for task in tasks}
+            errors.update({task_id: "Task not found." for task_id in task_ids if task_id not in found})
+
+            if operation == BulkTaskService.ASSIGN:
+                changed, updates, activities = BulkTaskService._assign(user, tasks, assigned_to, errors)
+            elif operation == BulkTaskService.TRANSITION:
+                changed, updates, activities = BulkTaskService._transition(user, tasks, new_status, errors)
+            elif operation == BulkTaskService.RELOCATE:
+                changed, updates, activities = BulkTaskService._relocate(tasks, location, errors)
+            else:
+                raise ValueError(f"Unknown bulk operation '{operation}'")
+
+            if changed:
+                # Bulk statuses are never Ready for Pickup or Picked Up, so no reminder stays scheduled
+                reminders = dict.fromkeys(REMINDER_FIELDS) if 'status' in updates else {}
+                Task.objects.filter(pk__in=[task.pk for task in changed]).update(updated_at=now, **reminders, **updates)
+                TaskRollup.record_update(changed, updates)
+                invalidate_stats('tasks')
+            with ActivityLogger.batch():
+                for activity in activities:
+                    ActivityLogger.record(activity.task, activity)
+
+        if changed:
+            broadcast_tasks_bulk_update(
+                [task.title for task in changed], operation, list(updates)
+            )
+            if operation == BulkTaskService.ASSIGN and assigned_to:
+                from .notification_handler import TaskNotificationHandler
+                TaskNotificationHandler.notify_tasks_assigned(changed, assigned_to, user)
+
+        return [
+            {'task_id': task_id, 'success': False, 'error': errors[task_id]}
+            if task_id in errors else {'task_id': task_id, 'success': True}
+            for task_id in task_ids
+        ]
+
+    @staticmethod
+    def _assign(user, tasks, technician, errors):
+        """
+        Assignment sets the status like TaskUpdateService: In Progress, or Pending when unassigned.
+
+        A returned task awaiting reassignment gets the returned-task assignment
+        activity, which closes its return period, as in the return flow.
+        """
+        new_status = Task.Status.IN_PROGRESS if technician else Task.Status.PENDING
+        changed, activities = [], []
+        for task in tasks:
+            if not can_transition(user, task, new_status):
+                errors[task.title] = (
+                    f"As a {user.role}, you cannot change status from '{task.status}' to '{new_status}'."
+                )
+                continue
+            changed.append(task)
+            if technician and BulkTaskService._awaiting_reassignment(task):
+                activities.append(ActivityLogger.returned_task_assignment_activity(task, user, technician))
+            elif task.assigned_to != technician:
+                activity = ActivityLogger.assignment_activity(task, user, task.assigned_to, technician)
+                if activity:
+                    activities.append(activity)
+        return changed, {'assigned_to': technician, 'status': new_status}, activities
+
+    @staticmethod
+    def _transition(user, tasks, new_status, errors):
+        changed, activities = [], []
+        for task in tasks:
+            if task.status == new_status:
+                errors[task.title] = f"Task is already '{new_status}'."
+                continue
+            if not can_transition(user, task, new_status):
+                errors[task.title] = (
+                    f"As a {user.role}, you cannot change status from '{task.status}' to '{new_status}'."
+                )
+                continue
+            changed.append(task)
+            activity = ActivityLogger.status_change_activity(task, user, new_status)
+            if activity:
+                activities.append(activity)
+        return changed, {'status': new_status}, activities
+
+    @staticmethod
+    def _relocate(tasks, location, errors):
+        changed = []
+        for task in tasks:
+            if task.workshop_status == Task.WorkshopStatus.IN_WORKSHOP:
+                errors[task.title] = "Task is in the workshop; return it from the workshop first."
+                continue
+            changed.append(task)
+        return changed, {'current_location': location}, []
+
+    @staticmethod
+    def _awaiting_reassignment(task):
+        """True if the task was returned and has not been reassigned since."""
+        return bool(task.return_periods) and task.return_periods[-1].get('reassigned_at') is None
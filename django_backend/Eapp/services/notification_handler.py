@@ -110,6 +110,27 @@ class TaskNotificationHandler:
             }
         )
 
+    @staticmethod
+    def notify_tasks_assigned(tasks, assignee, assigner):
+        """
+        Tell a technician about a bulk assignment: one toast for the whole batch.
+        """
+        if not assignee or not tasks:
+            return
+        if len(tasks) == 1:
+            TaskNotificationHandler.notify_task_assigned(tasks[0], assignee, assigner)
+            return
+
+        send_toast_to_user(
+            user=assignee,
+            toast_type='tasks_assigned',
+            data={
+                'task_titles': [task.title for task in tasks],
+                'count': len(tasks),
+                'assigner_name': assigner.get_full_name(),
+            }
+        )
+
     @staticmethod
     def notify_ready_for_pickup(task, user):
         """
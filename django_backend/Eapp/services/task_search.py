@@ -0,0 +1,83 @@
+"""
+Task Search Service
+
+Type-ahead search over task title, customer name and customer phone number.
+
+On PostgreSQL with pg_trgm installed, title and customer name matches are
+served by trigram GIN indexes and results are ranked by trigram similarity.
+Elsewhere the same filter runs unranked. Customer names and phone numbers are
+matched through subqueries on customer_id rather than an OR across the customer
+join, so each match can use its own index, with no join fan-out or DISTINCT.
+
+Phone numbers are stored encrypted, so full numbers are matched through the
+PhoneNumber.phone_hash blind index rather than by substring.
+"""
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Greatest
+
+
+class TaskSearch:
+    """Search backend used by TaskFilter.search_filter."""
+
+    # Cached per process: whether pg_trgm is installed on the default database
+    _trigram_enabled = None
+
+    @staticmethod
+    def trigram_enabled():
+        """
+        Check whether trigram search can be used on the current database.
+
+        Returns:
+            bool: True on PostgreSQL with the pg_trgm extension installed
+        """
+        if TaskSearch._trigram_enabled is None:
+            enabled = False
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                    enabled = cursor.fetchone() is not None
+            TaskSearch._trigram_enabled = enabled
+        return TaskSearch._trigram_enabled
+
+    @staticmethod
+    def search(queryset, value):
+        """
+        Filter a Task queryset by a free-text search term.
+
+        Args:
+            queryset: Task queryset to filter
+            value: Search term (task ID, customer name or full phone number)
+
+        Returns:
+            QuerySet: Matching tasks, best matches first when ranking is available
+        """
+        from customers.models import PhoneNumber
+
+        phone_hash = PhoneNumber.lookup_hash(value)
+
+        if not TaskSearch.trigram_enabled():
+            return TaskSearch._basic_search(queryset, value, phone_hash)
+
+        return queryset.filter(TaskSearch._match(value, phone_hash)).annotate(
+            search_rank=Greatest(
+                TrigramSimilarity('title', value),
+                TrigramSimilarity('customer__name', value),
+            )
+        ).order_by('-search_rank', '-created_at', '-id')
+
+    @staticmethod
+    def _basic_search(queryset, value, phone_hash=None):
+        """Portable icontains search used when pg_trgm is not available."""
+        return queryset.filter(TaskSearch._match(value, phone_hash))
+
+    @staticmethod
+    def _match(value, phone_hash=None):
+        """Title, customer name or (when the term is a phone number) phone match."""
+        from customers.models import Customer, PhoneNumber
+
+        query = Q(title__icontains=value) | Q(customer_id__in=Customer.objects.filter(name__icontains=value).values('id'))
+        if phone_hash:
+            query |= Exists(PhoneNumber.objects.filter(customer_id=OuterRef('customer_id'), phone_hash=phone_hash))
+        return query
@@ -94,16 +94,17 @@ class TaskCreationService:
             user: User who created the task
             device_notes: Optional device notes
         """
-        # Log intake
-        ActivityLogger.log_intake(task, user)
-        
-        # Log device notes if provided
-        if device_notes:
-            ActivityLogger.log_device_note(task, user, device_notes)
-        
-        # Log assignment if tech was assigned
-        if task.assigned_to:
-            ActivityLogger.log_assignment(task, user, None, task.assigned_to)
+        with ActivityLogger.batch():
+            # Log intake
+            ActivityLogger.log_intake(task, user)
+            
+            # Log device notes if provided
+            if device_notes:
+                ActivityLogger.log_device_note(task, user, device_notes)
+            
+            # Log assignment if tech was assigned
+            if task.assigned_to:
+                ActivityLogger.log_assignment(task, user, None, task.assigned_to)
 
 
 class TaskUpdateService:
@@ -404,18 +405,19 @@ class TaskUpdateService:
             user: User who performed the update
             original_assigned_to: Original assigned technician (for comparison)
         """
-        # Log debt marking
-        if data.get('is_debt') is True:
-            ActivityLogger.log_debt_marking(task, user)
-        
-        # Log assignment changes (if not already logged in status transition)
-        if 'assigned_to' in data:
-            new_technician_id = data.get('assigned_to')
+        with ActivityLogger.batch():
+            # Log debt marking
+            if data.get('is_debt') is True:
+                ActivityLogger.log_debt_marking(task, user)
             
-            if new_technician_id:
-                new_technician = get_object_or_404(User, id=new_technician_id)
-                if original_assigned_to != new_technician:
-                    ActivityLogger.log_assignment(task, user, original_assigned_to, new_technician)
-            else:
-                if original_assigned_to:
-                    ActivityLogger.log_assignment(task, user, original_assigned_to, None)
+            # Log assignment changes (if not already logged in status transition)
+            if 'assigned_to' in data:
+                new_technician_id = data.get('assigned_to')
+                
+                if new_technician_id:
+                    new_technician = get_object_or_404(User, id=new_technician_id)
+                    if original_assigned_to != new_technician:
+                        ActivityLogger.log_assignment(task, user, original_assigned_to, new_technician)
+                else:
+                    if original_assigned_to:
+                        ActivityLogger.log_assignment(task, user, original_assigned_to, None)
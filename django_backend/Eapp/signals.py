@@ -1,6 +1,9 @@
-from django.db.models.signals import post_save
+from django.db.models import Case, DateTimeField, Value, When
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import TaskActivity, Task
+from common.stats import invalidate as invalidate_stats
+from .models import TaskActivity, Task, TaskAssignment
+from .utils.execution_hours import EXECUTION_HOURS_FIELDS, clear_execution_hours, refresh_execution_hours
 
 def _handle_assignment_activity(task, instance):
     """Handle logical updates for ASSIGNMENT activities."""
@@ -35,6 +38,8 @@ def _handle_returned_activity(task, instance):
         'returned_at': instance.timestamp.isoformat(),
         'reassigned_at': None
     })
+    # Reopened: the stored hours are recomputed when it is completed again
+    clear_execution_hours(task)
 
 def _handle_workshop_activity(task, instance):
     """Handle logical updates for WORKSHOP activities."""
@@ -64,6 +69,7 @@ def _mark_task_completed(task, instance):
         if last_period.get('reassigned_at') is None:
             last_period['reassigned_at'] = instance.timestamp.isoformat()
             task.return_periods[-1] = last_period
+    refresh_execution_hours(task)
 
 def _handle_status_update_or_ready(task, instance):
     """Handle logical updates for STATUS_UPDATE, READY, or implicit returns from ASSIGNMENT activities."""
@@ -87,14 +93,24 @@ def _handle_status_update_or_ready(task, instance):
         if is_completed:
             _mark_task_completed(task, instance)
 
-@receiver(post_save, sender=TaskActivity)
-def update_task_execution_metrics(sender, instance, created, **kwargs):
-    """Update task execution tracking fields when activities are created."""
-    if not created:
-        return
-        
-    task = instance.task
-    
+# Task columns maintained from the activity log by apply_execution_metrics()
+EXECUTION_METRIC_FIELDS = [
+    'first_assigned_at', 
+    'completed_at', 
+    'return_count', 
+    'return_periods',
+    'workshop_periods',
+    'execution_technicians',
+    *EXECUTION_HOURS_FIELDS,
+]
+
+
+def apply_execution_metrics(task, instance):
+    """
+    Update a task's execution tracking fields in memory for a new activity.
+
+    The caller is responsible for saving EXECUTION_METRIC_FIELDS.
+    """
     if instance.type == TaskActivity.ActivityType.ASSIGNMENT:
         _handle_assignment_activity(task, instance)
     elif instance.type == TaskActivity.ActivityType.RETURNED:
@@ -106,11 +122,84 @@ def update_task_execution_metrics(sender, instance, created, **kwargs):
     if instance.type in [TaskActivity.ActivityType.STATUS_UPDATE, TaskActivity.ActivityType.READY, TaskActivity.ActivityType.ASSIGNMENT]:
         _handle_status_update_or_ready(task, instance)
 
-    task.save(update_fields=[
-        'first_assigned_at', 
-        'completed_at', 
-        'return_count', 
-        'return_periods',
-        'workshop_periods',
-        'execution_technicians'
-    ])
+
+def assignment_rows(entries):
+    """
+    Turn ASSIGNMENT activities into TaskAssignment rows without touching the database.
+
+    Every ASSIGNMENT ends the task's current stint; one naming a technician
+    (details['new_technician_id']) also starts a new one. Stints opened and
+    ended within ``entries`` are closed in memory.
+
+    Args:
+        entries: Iterable of (task_id, timestamp, details) in activity order
+
+    Returns:
+        tuple: ({task_id: timestamp} closing each task's previously open row,
+        list of unsaved TaskAssignment rows)
+    """
+    closes = {}
+    rows = []
+    open_rows = {}
+    for task_id, timestamp, details in entries:
+        pending = open_rows.pop(task_id, None)
+        if pending:
+            pending.unassigned_at = timestamp
+        else:
+            closes.setdefault(task_id, timestamp)
+
+        user_id = (details or {}).get('new_technician_id')
+        if user_id:
+            row = TaskAssignment(task_id=task_id, user_id=user_id, assigned_at=timestamp)
+            rows.append(row)
+            open_rows[task_id] = row
+    return closes, rows
+
+
+def record_assignments(entries):
+    """
+    Mirror saved ASSIGNMENT activities into the TaskAssignment table.
+
+    Uses at most one UPDATE (closing open rows) and one INSERT however many
+    activities are passed.
+
+    Args:
+        entries: Iterable of (task, activity) pairs; other activity types are ignored
+    """
+    closes, rows = assignment_rows(
+        (task.pk, activity.timestamp, activity.details)
+        for task, activity in entries
+        if activity.type == TaskActivity.ActivityType.ASSIGNMENT
+    )
+    if closes:
+        open_rows = TaskAssignment.objects.filter(task_id__in=closes, unassigned_at__isnull=True)
+        if len(set(closes.values())) == 1:
+            open_rows.update(unassigned_at=next(iter(closes.values())))
+        else:
+            open_rows.update(unassigned_at=Case(
+                *[When(task_id=task_id, then=Value(timestamp)) for task_id, timestamp in closes.items()],
+                output_field=DateTimeField(),
+            ))
+    if rows:
+        TaskAssignment.objects.bulk_create(rows)
+
+
+@receiver(post_save, sender=TaskActivity)
+def update_task_execution_metrics(sender, instance, created, **kwargs):
+    """Update task execution tracking and snapshot fields, in one UPDATE, when activities are created."""
+    from .services.activity_logger import ActivityLogger
+
+    if not created:
+        return
+        
+    task = instance.task
+    snapshot_fields = ActivityLogger.apply_snapshots(task, instance, save=False) or []
+    apply_execution_metrics(task, instance)
+    task.save(update_fields=[*EXECUTION_METRIC_FIELDS, *snapshot_fields])
+    record_assignments([(task, instance)])
+
+
+@receiver([post_save, post_delete], sender=Task)
+def invalidate_task_stats(sender, instance, **kwargs):
+    """Task counts on the dashboards read Task; set-based updates call invalidate_stats('tasks') themselves."""
+    invalidate_stats('tasks')
@@ -1,3 +1,665 @@
-from django.test import TestCase
+from io import StringIO
+import threading
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from common.encryption import encrypt_value, phone_blind_index
+from common.models import Location
+from customers.models import Customer, PhoneNumber
+from Eapp.models import Task, TaskActivity, TaskAssignment, TaskIDCounter
+from Eapp.services import ActivityLogger
+from Eapp.utils import TaskIDGenerator
+from users.models import User
+
+
+class TaskIDGeneratorTests(TestCase):
+    def setUp(self):
+        TaskIDGenerator._first_year = None
+        self.user = User.objects.create_user(username='frontdesk', password='testpassword', email='fd@gmail.com', first_name='front', last_name='desk', role='Front Desk')
+        self.customer = Customer.objects.create(name='Test Customer')
+        self.location = Location.objects.create(name='Main')
+
+    def test_sequence_continues_from_existing_titles(self):
+        """
+        A new counter row starts after the highest ID already issued for the month.
+        """
+        first_id = TaskIDGenerator.generate()
+        prefix = first_id.split('-')[0]
+        TaskIDCounter.objects.all().delete()
+        Task.objects.create(title=f"{prefix}-041", created_by=self.user, customer=self.customer, current_location=self.location)
+
+        self.assertEqual(TaskIDGenerator.generate(), f"{prefix}-042")
+        self.assertEqual(TaskIDGenerator.generate(), f"{prefix}-043")
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Requires concurrent database connections')
+class TaskIDConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        TaskIDGenerator._first_year = None
+        self.user = User.objects.create_user(username='frontdesk', password='testpassword', email='fd@gmail.com', first_name='front', last_name='desk', role='Front Desk')
+        self.customer = Customer.objects.create(name='Test Customer')
+        self.location = Location.objects.create(name='Main')
+
+    def test_parallel_creates_get_unique_ids(self):
+        """
+        Ensure 50 simultaneous task intakes are each handed a distinct ID.
+        """
+        workers = 50
+        barrier = threading.Barrier(workers)
+        errors = []
+
+        def create_task():
+            try:
+                barrier.wait()
+                Task.objects.create(
+                    title=TaskIDGenerator.generate(),
+                    created_by=self.user,
+                    customer=self.customer,
+                    current_location=self.location,
+                )
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create_task) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        titles = list(Task.objects.values_list('title', flat=True))
+        self.assertEqual(len(titles), workers)
+        self.assertEqual(len(set(titles)), workers)
+
+
+class TaskActivitySnapshotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        self.customer = Customer.objects.create(name='Test Customer')
+        self.location = Location.objects.create(name='Main')
+        self.workshop = Location.objects.create(name='Workshop', is_workshop=True)
+        self.task = Task.objects.create(title='A1-001', created_by=self.user, customer=self.customer, current_location=self.location)
+
+    def test_logger_keeps_snapshots_in_sync(self):
+        ready = ActivityLogger.log_status_change(self.task, self.user, 'Ready for Pickup')
+        sent = ActivityLogger.log_workshop_send(self.task, self.user, self.workshop)
+        returned = ActivityLogger.log_workshop_return(self.task, self.user, 'Solved')
+        picked = ActivityLogger.log_status_change(self.task, self.user, 'Picked Up')
+
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual(task.approved_at, ready.timestamp)
+        self.assertEqual(task.approved_by, self.user)
+        self.assertEqual(task.workshop_sent_at, sent.timestamp)
+        self.assertEqual(task.workshop_returned_at, returned.timestamp)
+        self.assertEqual(task.date_out, picked.timestamp)
+        self.assertEqual(task.sent_out_by, self.user)
+        self.assertIsNone(task.qc_rejected_at)
+
+    def test_logged_activity_updates_task_once(self):
+        # INSERT the activity, then one UPDATE for the snapshot and execution-metric columns
+        with self.assertNumQueries(2):
+            ActivityLogger.log_status_change(self.task, self.user, 'Ready for Pickup')
+        self.assertIsNotNone(Task.objects.get(pk=self.task.pk).approved_at)
+
+    def test_backfill_matches_activity_history(self):
+        ready = TaskActivity.objects.create(task=self.task, user=self.user, type=TaskActivity.ActivityType.READY, message='ready')
+        rejected = TaskActivity.objects.create(task=self.task, user=self.user, type=TaskActivity.ActivityType.REJECTED, message='rejected')
+        sent = TaskActivity.objects.create(task=self.task, user=self.user, type=TaskActivity.ActivityType.WORKSHOP, message='sent')
+
+        call_command('backfill_activity_snapshots', stdout=StringIO())
+
+        task = Task.objects.get(pk=self.task.pk)
+        self.assertEqual(task.approved_at, ready.timestamp)
+        self.assertEqual(task.qc_rejected_at, rejected.timestamp)
+        self.assertEqual(task.qc_rejected_by, self.user)
+        self.assertEqual(task.workshop_sent_at, sent.timestamp)
+        self.assertIsNone(task.workshop_returned_at)
+
+
+class TaskKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        self.client.force_authenticate(user=self.user)
+        customer = Customer.objects.create(name='Test Customer')
+        location = Location.objects.create(name='Main')
+        for i in range(5):
+            Task.objects.create(title=f'A1-{i + 1:03d}', created_by=self.user, customer=customer, current_location=location)
+        # Force ties on created_at so ordering relies on the id tiebreaker
+        Task.objects.update(created_at=timezone.now())
+
+    def test_cursor_pages_walk_every_task_once(self):
+        expected = list(Task.objects.order_by('-created_at', '-id').values_list('title', flat=True))
+
+        seen = []
+        response = self.client.get('/api/tasks/', {'cursor': '', 'page_size': 2})
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        while True:
+            seen.extend(task['title'] for task in response.data['results'])
+            if not response.data['next']:
+                break
+            last_page = response
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(seen, expected)
+
+        previous = self.client.get(response.data['previous'])
+        self.assertEqual(
+            [task['title'] for task in previous.data['results']],
+            [task['title'] for task in last_page.data['results']],
+        )
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/tasks/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cursor', response.data)
+
+    def test_ranked_ordering_falls_back_to_page_numbers(self):
+        from django.db.models.functions import Length
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+        from Eapp.pagination import StandardResultsSetPagination
+
+        request = Request(APIRequestFactory().get('/api/tasks/', {'cursor': '', 'search': 'A1'}))
+        queryset = Task.objects.annotate(search_rank=Length('title')).order_by('-search_rank', '-id')
+        paginator = StandardResultsSetPagination()
+        paginator.paginate_queryset(queryset, request)
+
+        self.assertIsNone(paginator.keyset)
+        self.assertEqual(paginator.get_paginated_response([]).data['count'], 5)
+
+class TaskSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        self.client.force_authenticate(user=self.user)
+        location = Location.objects.create(name='Main')
+        juma = Customer.objects.create(name='Juma Hassan')
+        for phone in ('0712000111', '0712000222'):
+            PhoneNumber.objects.create(customer=juma, phone_number=encrypt_value(phone), phone_hash=phone_blind_index(phone))
+        other = Customer.objects.create(name='Neema Said')
+        Task.objects.create(title='A1-001', created_by=self.user, customer=juma, current_location=location)
+        Task.objects.create(title='A1-002', created_by=self.user, customer=other, current_location=location)
+
+    def _search(self, term):
+        response = self.client.get('/api/tasks/', {'search': term})
+        return [task['title'] for task in response.data['results']]
+
+    def test_search_matches_title_name_and_phone_without_duplicates(self):
+        self.assertEqual(self._search('A1-002'), ['A1-002'])
+        self.assertEqual(self._search('juma'), ['A1-001'])
+        self.assertEqual(self._search('+255 712 000 222'), ['A1-001'])
+
+    def test_phone_like_term_also_matches_titles(self):
+        Task.objects.filter(title='A1-002').update(title='0712000333')
+        self.assertEqual(self._search('0712000333'), ['0712000333'])
+
+
+class TaskSparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        self.client.force_authenticate(user=self.user)
+        customer = Customer.objects.create(name='Test Customer')
+        location = Location.objects.create(name='Main')
+        self.task = Task.objects.create(title='A1-001', created_by=self.user, customer=customer, current_location=location)
+
+    def test_fields_limit_payload_and_queries(self):
+        full = self.client.get(f'/api/tasks/{self.task.title}/')
+        self.assertIn('activities', full.data)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/tasks/{self.task.title}/', {'fields': 'id,status,payment_status,outstanding_balance'})
+
+        self.assertEqual(set(response.data), {'id', 'status', 'payment_status', 'outstanding_balance'})
+        task_queries = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'FROM "Eapp_task"' in q['sql']]
+        self.assertEqual(len(task_queries), 1)
+        self.assertNotIn('JOIN', task_queries[0])
+
+    def test_expand_keeps_plain_fields_and_only_requested_relations(self):
+        response = self.client.get(f'/api/tasks/{self.task.title}/', {'expand': 'customer_details'})
+
+        self.assertEqual(response.data['customer_details']['name'], 'Test Customer')
+        self.assertIn('status', response.data)
+        self.assertIn('current_location_name', response.data)
+        self.assertNotIn('activities', response.data)
+        self.assertNotIn('created_by_details', response.data)
+
+    def test_list_supports_fields(self):
+        response = self.client.get('/api/tasks/', {'fields': 'title,status'})
+        self.assertEqual(response.data['results'], [{'title': 'A1-001', 'status': self.task.status}])
+
+
+class BulkTaskOperationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        self.technician = User.objects.create_user(username='tech', password='testpassword', email='tech@gmail.com', first_name='test', last_name='tech', role='Technician')
+        self.client.force_authenticate(user=self.user)
+        customer = Customer.objects.create(name='Test Customer')
+        self.location = Location.objects.create(name='Main')
+        self.tasks = [
+            Task.objects.create(title=f'A1-{i + 1:03d}', created_by=self.user, customer=customer, current_location=self.location)
+            for i in range(20)
+        ]
+
+    def test_assign_updates_tasks_activities_and_metrics_in_bulk(self):
+        titles = [task.title for task in self.tasks]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/tasks/bulk/', {'task_ids': titles + ['NOPE-1'], 'operation': 'assign', 'assigned_to': self.technician.id}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['succeeded'], 20)
+        self.assertEqual(response.data['results'][-1], {'task_id': 'NOPE-1', 'success': False, 'error': 'Task not found.'})
+        self.assertLess(len(ctx.captured_queries), 15)
+
+        task = Task.objects.get(title='A1-001')
+        self.assertEqual(task.assigned_to, self.technician)
+        self.assertEqual(task.status, Task.Status.IN_PROGRESS)
+        activity = task.activities.get(type=TaskActivity.ActivityType.ASSIGNMENT)
+        self.assertEqual(task.first_assigned_at, activity.timestamp)
+        self.assertEqual([t['user_id'] for t in task.execution_technicians], [self.technician.id])
+
+    def test_transition_checks_permissions_per_task(self):
+        front_desk = User.objects.create_user(username='frontdesk', password='testpassword', email='fd@gmail.com', first_name='front', last_name='desk', role='Front Desk')
+        self.client.force_authenticate(user=front_desk)
+        Task.objects.filter(title='A1-001').update(status=Task.Status.IN_PROGRESS)
+        Task.objects.filter(title='A1-002').update(status=Task.Status.PICKED_UP)
+
+        response = self.client.post('/api/tasks/bulk/', {'task_ids': ['A1-001', 'A1-002'], 'operation': 'transition', 'status': 'Pending'}, format='json')
+
+        self.assertEqual([r['success'] for r in response.data['results']], [True, False])
+        self.assertEqual(Task.objects.get(title='A1-001').status, Task.Status.PENDING)
+        self.assertEqual(Task.objects.get(title='A1-002').status, Task.Status.PICKED_UP)
+
+    def test_statuses_with_side_effects_are_rejected(self):
+        for new_status in ('Completed', 'Ready for Pickup', 'Picked Up'):
+            response = self.client.post('/api/tasks/bulk/', {'task_ids': ['A1-001'], 'operation': 'transition', 'status': new_status}, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(Task.objects.get(title='A1-001').status, Task.Status.PENDING)
+
+    def test_assign_reassigns_returned_tasks_and_notifies_once(self):
+        returned = self.tasks[0]
+        ActivityLogger.log_assignment(returned, self.user, None, self.technician)
+        TaskActivity.objects.create(task=returned, user=self.user, type=TaskActivity.ActivityType.RETURNED, message='Screen flickers again')
+
+        with mock.patch('Eapp.services.notification_handler.send_toast_to_user') as send_toast:
+            self.client.post('/api/tasks/bulk/', {'task_ids': ['A1-001', 'A1-002'], 'operation': 'assign', 'assigned_to': self.technician.id}, format='json')
+
+        returned.refresh_from_db()
+        self.assertIsNotNone(returned.return_periods[-1]['reassigned_at'])
+        self.assertEqual(returned.activities.filter(message__startswith='Returned task assigned').count(), 1)
+        send_toast.assert_called_once()
+        self.assertEqual(send_toast.call_args.kwargs['toast_type'], 'tasks_assigned')
+
+    def test_relocate(self):
+        shelf = Location.objects.create(name='Shelf')
+        response = self.client.post('/api/tasks/bulk/', {'task_ids': ['A1-001', 'A1-002'], 'operation': 'relocate', 'location': shelf.id}, format='json')
+
+        self.assertEqual(response.data['succeeded'], 2)
+        self.assertEqual(Task.objects.filter(current_location=shelf).count(), 2)
+
+
+class ActivityBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        self.technician = User.objects.create_user(username='tech', password='testpassword', email='tech@gmail.com', first_name='test', last_name='tech', role='Technician')
+        customer = Customer.objects.create(name='Test Customer')
+        location = Location.objects.create(name='Main')
+        self.workshop = Location.objects.create(name='Workshop', is_workshop=True)
+        self.task = Task.objects.create(title='A1-001', created_by=self.user, customer=customer, current_location=location)
+
+    def _log_lifecycle(self, task):
+        ActivityLogger.log_intake(task, self.user)
+        ActivityLogger.log_assignment(task, self.user, None, self.technician)
+        ActivityLogger.log_workshop_send(task, self.user, self.workshop)
+        ActivityLogger.log_workshop_return(task, self.user, 'Solved')
+        ActivityLogger.log_assignment(task, self.user, self.technician, self.user)
+        ActivityLogger.log_status_change(task, self.user, 'Completed')
+        ActivityLogger.log_status_change(task, self.user, 'Ready for Pickup')
+
+    def test_batch_matches_per_activity_signal_results(self):
+        from Eapp.signals import EXECUTION_METRIC_FIELDS, apply_execution_metrics
+
+        # Activities INSERT, Task UPDATE, TaskAssignment close UPDATE and INSERT
+        with self.assertNumQueries(4):
+            with ActivityLogger.batch():
+                self._log_lifecycle(self.task)
+
+        stored = Task.objects.get(pk=self.task.pk)
+        activities = list(stored.activities.order_by('timestamp', 'id'))
+        self.assertEqual(len(activities), 7)
+
+        # Replay the saved activities through the signal logic one at a time
+        replay = Task(pk=self.task.pk)
+        for activity in activities:
+            apply_execution_metrics(replay, activity)
+            ActivityLogger.apply_snapshots(replay, activity, save=False)
+        for field in EXECUTION_METRIC_FIELDS + ['approved_at', 'approved_by_id', 'workshop_sent_at', 'workshop_returned_at']:
+            self.assertEqual(getattr(stored, field), getattr(replay, field), field)
+        self.assertEqual(stored.completed_at, activities[5].timestamp)
+
+    def test_unbatched_logging_is_unchanged(self):
+        self._log_lifecycle(self.task)
+        stored = Task.objects.get(pk=self.task.pk)
+        self.assertEqual(len(stored.execution_technicians), 2)
+        self.assertIsNotNone(stored.workshop_periods[0]['returned_at'])
+
+    def test_batched_and_unbatched_assignments_match(self):
+        other = Task.objects.create(title='A1-002', created_by=self.user, customer=self.task.customer, current_location=self.task.current_location)
+        self._log_lifecycle(self.task)
+        with ActivityLogger.batch():
+            self._log_lifecycle(other)
+
+        for task in (self.task, other):
+            assignments = list(task.assignments.order_by('assigned_at'))
+            assignment_times = list(
+                task.activities.filter(type=TaskActivity.ActivityType.ASSIGNMENT)
+                .order_by('timestamp').values_list('timestamp', flat=True)
+            )
+            self.assertEqual([a.user for a in assignments], [self.technician, self.user])
+            self.assertEqual([a.assigned_at for a in assignments], assignment_times)
+            self.assertEqual(assignments[0].unassigned_at, assignment_times[1])
+            self.assertIsNone(assignments[1].unassigned_at)
+
+    def test_activities_keep_the_time_they_were_logged(self):
+        with ActivityLogger.batch():
+            ActivityLogger.log_intake(self.task, self.user)
+            logged_before = timezone.now()
+        self.assertLessEqual(self.task.activities.get().timestamp, logged_before)
+
+    def test_multi_task_batch_schedules_reminders(self):
+        other = Task.objects.create(title='A1-002', created_by=self.user, customer=self.task.customer, current_location=self.task.current_location)
+        tasks = [self.task, other]
+        for task in tasks:
+            task.status = Task.Status.READY_FOR_PICKUP
+            task.save(update_fields=['status'])
+
+        with ActivityLogger.batch():
+            for task in tasks:
+                ActivityLogger.log_status_change(task, self.user, 'Ready for Pickup')
+
+        for task in Task.objects.filter(pk__in=[t.pk for t in tasks]):
+            self.assertIsNotNone(task.approved_at)
+            self.assertIsNotNone(task.next_pickup_reminder_at)
+
+    def test_nothing_is_written_when_the_batch_fails(self):
+        with self.assertRaises(RuntimeError):
+            with ActivityLogger.batch():
+                ActivityLogger.log_intake(self.task, self.user)
+                raise RuntimeError
+        self.assertFalse(self.task.activities.exists())
+
+
+class TaskAssignmentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        self.technician = User.objects.create_user(username='tech', password='testpassword', email='tech@gmail.com', first_name='test', last_name='tech', role='Technician')
+        customer = Customer.objects.create(name='Test Customer')
+        location = Location.objects.create(name='Main')
+        self.task = Task.objects.create(title='A1-001', created_by=self.user, customer=customer, current_location=location)
+
+    def test_unassignment_closes_the_open_row(self):
+        ActivityLogger.log_assignment(self.task, self.user, None, self.technician)
+        ActivityLogger.log_assignment(self.task, self.user, self.technician, None)
+
+        assignment = TaskAssignment.objects.get(task=self.task)
+        unassigned = self.task.activities.order_by('timestamp').last()
+        self.assertEqual(assignment.unassigned_at, unassigned.timestamp)
+
+    def test_backfill_rebuilds_rows_from_activities(self):
+        ActivityLogger.log_assignment(self.task, self.user, None, self.technician)
+        ActivityLogger.log_assignment(self.task, self.user, self.technician, self.user)
+        expected = list(TaskAssignment.objects.values_list('task', 'user', 'assigned_at', 'unassigned_at'))
+
+        call_command('backfill_task_assignments', '--reset', stdout=StringIO())
+
+        self.assertEqual(
+            list(TaskAssignment.objects.values_list('task', 'user', 'assigned_at', 'unassigned_at')),
+            expected
+        )
+
+    def test_backfill_falls_back_to_execution_technicians(self):
+        Task.objects.filter(pk=self.task.pk).update(
+            assigned_to=self.technician,
+            first_assigned_at=timezone.now(),
+            execution_technicians=[{'user_id': self.technician.id, 'name': 'test tech', 'role': 'Technician', 'assigned_at': None}],
+        )
+
+        call_command('backfill_task_assignments', stdout=StringIO())
+
+        assignment = TaskAssignment.objects.get(task=self.task)
+        self.assertEqual(assignment.user, self.technician)
+        self.assertIsNone(assignment.unassigned_at)
+
+
+class DashboardStatsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        customer = Customer.objects.create(name='Test Customer')
+        location = Location.objects.create(name='Main')
+        for i, status in enumerate(['Pending', 'In Progress', 'Ready for Pickup']):
+            Task.objects.create(title=f'A1-{i + 1:03d}', created_by=self.user, customer=customer, current_location=location, status=status)
+        Task.objects.filter(title='A1-001').update(is_debt=True, total_cost=500, paid_amount=200)
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+
+    def test_stats_use_one_query_per_table(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/dashboard-stats/')
+
+        self.assertEqual(response.data, {
+            'new_tasks_count': 3,
+            'messages_sent_count': 0,
+            'tasks_ready_for_pickup_count': 1,
+            'active_tasks_count': 2,
+            'revenue_this_month': 0.0,
+            'total_debt_balance': 300.0,
+        })
+
+    def test_stats_are_cached_until_a_hook_invalidates_them(self):
+        from financials.models import Payment
+
+        self.client.get('/api/dashboard-stats/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/dashboard-stats/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(task=Task.objects.get(title='A1-001'), amount=100)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/dashboard-stats/')
+        self.assertEqual(response.data['revenue_this_month'], 100.0)
+        # paid_amount is recomputed from the payments
+        self.assertEqual(response.data['total_debt_balance'], 400.0)
+
+    def test_task_writes_outside_the_broadcasts_invalidate_stats(self):
+        self.client.get('/api/dashboard-stats/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.get(title='A1-002').delete()
+        response = self.client.get('/api/dashboard-stats/')
+        self.assertEqual(response.data['active_tasks_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('clear_paid_debts', stdout=StringIO())
+            Task.objects.filter(title='A1-001').update(payment_status='Fully Paid')
+            call_command('clear_paid_debts', stdout=StringIO())
+        response = self.client.get('/api/dashboard-stats/')
+        self.assertEqual(response.data['total_debt_balance'], 0.0)
+
+    @override_settings(DASHBOARD_STATS_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        self.client.get('/api/dashboard-stats/')
+        with self.assertNumQueries(3):
+            self.client.get('/api/dashboard-stats/')
+
+
+class SeederTests(TestCase):
+    def _snapshot(self):
+        return list(Task.objects.order_by('title').values_list(
+            'title', 'status', 'total_cost', 'paid_amount', 'payment_status', 'net_execution_hours'
+        ))
+
+    def test_seeded_tasks_are_consistent_and_reproducible(self):
+        from django.db.models import Sum
+        from Eapp.seeders import clear_tasks, seed_tasks
+        from financials.models import Payment
+        from reports.models import DailyTaskRollup
+
+        counts = seed_tasks(tasks=60, days=30, seed=7, batch_size=25, log=lambda message: None)
+        self.assertEqual(counts['Eapp.Task'], 60)
+        self.assertEqual(DailyTaskRollup.objects.aggregate(total=Sum('count'))['total'], 60)
+        for task in Task.objects.prefetch_related('payments'):
+            self.assertEqual(task.paid_amount, sum(payment.amount for payment in task.payments.all()))
+            if task.status == 'Picked Up':
+                self.assertIsNotNone(task.latest_pickup_at)
+                self.assertIsNotNone(task.net_execution_hours)
+            self.assertEqual(task.next_pickup_reminder_at is not None, task.status == 'Ready for Pickup')
+        self.assertFalse(Payment.objects.filter(task__isnull=False, description='').exists())
+        self.assertEqual(
+            TaskAssignment.objects.filter(unassigned_at__isnull=True).count(),
+            Task.objects.filter(assigned_to__isnull=False).count(),
+        )
+        first_run = self._snapshot()
+
+        clear_tasks()
+        self.assertFalse(Task.objects.exists())
+        seed_tasks(tasks=60, days=30, seed=7, batch_size=25, log=lambda message: None)
+        self.assertEqual(self._snapshot(), first_run)
+
+        # Primary keys and task IDs continue after the seeded rows
+        task = Task.objects.create(
+            title=TaskIDGenerator.generate(), customer=Customer.objects.first(), created_by=User.objects.first(),
+            current_location=Location.objects.first(),
+        )
+        self.assertNotIn(task.title, [row[0] for row in first_run])
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Historical migrations run PostgreSQL-only SQL')
+class DataMigrationTests(TransactionTestCase):
+    """Runs the Eapp data migrations over rows written with the schema they migrate from."""
+
+    def _migrate(self, target):
+        from django.db.migrations.executor import MigrationExecutor
+
+        executor = MigrationExecutor(connection)
+        executor.migrate([target])
+        return executor.loader.project_state([target]).apps
+
+    def tearDown(self):
+        from django.db.migrations.executor import MigrationExecutor
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def _fixtures(self, apps):
+        user = apps.get_model('users', 'User').objects.create(username='manager', email='mgr@gmail.com', role='Manager')
+        customer = apps.get_model('customers', 'Customer').objects.create(name='Test Customer')
+        location = apps.get_model('common', 'Location').objects.create(name='Main')
+        return {'created_by_id': user.pk, 'customer_id': customer.pk, 'current_location_id': location.pk}
+
+    def test_0016_renames_duplicate_titles(self):
+        apps = self._migrate(('Eapp', '0015_add_to_be_checked_field'))
+        Task = apps.get_model('Eapp', 'Task')
+        fixtures = self._fixtures(apps)
+        first, second, third = (Task.objects.create(title='A1-001', **fixtures) for _ in range(3))
+        Task.objects.create(title='A1-001-2', **fixtures)
+
+        self._migrate(('Eapp', '0016_task_id_counter'))
+
+        titles = dict(Task.objects.values_list('pk', 'title'))
+        self.assertEqual(titles[first.pk], 'A1-001')
+        self.assertEqual(len(set(titles.values())), 4)
+
+    def test_0018_fills_snapshots_from_activities(self):
+        from datetime import timedelta
+
+        apps = self._migrate(('Eapp', '0017_task_activity_snapshots'))
+        Task = apps.get_model('Eapp', 'Task')
+        TaskActivity = apps.get_model('Eapp', 'TaskActivity')
+        fixtures = self._fixtures(apps)
+        task = Task.objects.create(title='A1-001', status='Ready for Pickup', **fixtures)
+        approved_at = timezone.now() - timedelta(hours=2)
+        for activity_type, at in (('ready', approved_at - timedelta(days=1)), ('ready', approved_at), ('workshop', approved_at)):
+            activity = TaskActivity.objects.create(task=task, user_id=fixtures['created_by_id'], type=activity_type, message='')
+            TaskActivity.objects.filter(pk=activity.pk).update(timestamp=at)
+
+        self._migrate(('Eapp', '0018_backfill_activity_snapshots'))
+
+        task.refresh_from_db()
+        self.assertEqual((task.approved_at, task.approved_by_id), (approved_at, fixtures['created_by_id']))
+        self.assertEqual((task.workshop_sent_at, task.workshop_returned_at), (approved_at, None))
+        self.assertIsNone(task.qc_rejected_at)
+
+    def test_0022_builds_assignments_from_history(self):
+        apps = self._migrate(('Eapp', '0021_task_assignment'))
+        Task = apps.get_model('Eapp', 'Task')
+        TaskActivity = apps.get_model('Eapp', 'TaskActivity')
+        User = apps.get_model('users', 'User')
+        fixtures = self._fixtures(apps)
+        first = User.objects.create(username='tech1', email='tech1@gmail.com', role='Technician')
+        second = User.objects.create(username='tech2', email='tech2@gmail.com', role='Technician')
+        now = timezone.now()
+        reassigned = Task.objects.create(title='A1-001', assigned_to=second, first_assigned_at=now, **fixtures)
+        for technician in (first, second):
+            TaskActivity.objects.create(
+                task=reassigned, user_id=fixtures['created_by_id'], type='assignment', message='',
+                details={'new_technician_id': technician.pk},
+            )
+        legacy = Task.objects.create(
+            title='A1-002', assigned_to=first, first_assigned_at=now,
+            execution_technicians=[{'user_id': first.pk, 'assigned_at': now.isoformat()}], **fixtures
+        )
+
+        self._migrate(('Eapp', '0022_backfill_task_assignments'))
+
+        TaskAssignment = apps.get_model('Eapp', 'TaskAssignment')
+        rows = list(TaskAssignment.objects.order_by('task_id', 'assigned_at', 'pk').values_list('task_id', 'user_id', 'unassigned_at'))
+        self.assertEqual([row[:2] for row in rows], [(reassigned.pk, first.pk), (reassigned.pk, second.pk), (legacy.pk, first.pk)])
+        self.assertIsNotNone(rows[0][2])
+        self.assertEqual([row[2] for row in rows[1:]], [None, None])
+
+    def test_0025_schedules_waiting_reminders(self):
+        from datetime import timedelta
+
+        # Rows from before the snapshot columns: approval is only recorded as a READY activity
+        apps = self._migrate(('Eapp', '0017_task_activity_snapshots'))
+        Task = apps.get_model('Eapp', 'Task')
+        TaskActivity = apps.get_model('Eapp', 'TaskActivity')
+        fixtures = self._fixtures(apps)
+        approved_at = timezone.now() - timedelta(hours=2)
+        ready = Task.objects.create(title='A1-001', status='Ready for Pickup', **fixtures)
+        activity = TaskActivity.objects.create(task=ready, user_id=fixtures['created_by_id'], type='ready', message='')
+        TaskActivity.objects.filter(pk=activity.pk).update(timestamp=approved_at)
+        debt = Task.objects.create(title='A1-002', status='Picked Up', is_debt=True, **fixtures)
+        pending = Task.objects.create(title='A1-003', **fixtures)
+
+        apps = self._migrate(('Eapp', '0025_backfill_reminder_due_times'))
+
+        due = {task.pk: task for task in apps.get_model('Eapp', 'Task').objects.all()}
+        self.assertEqual(due[ready.pk].next_pickup_reminder_at, approved_at + timedelta(hours=24))
+        self.assertIsNotNone(due[debt.pk].next_debt_reminder_at)
+        self.assertIsNone(due[pending.pk].next_pickup_reminder_at)
+
+    def test_0027_stores_hours_of_completed_tasks(self):
+        from datetime import timedelta
+
+        apps = self._migrate(('Eapp', '0026_activity_timestamp_default'))
+        Task = apps.get_model('Eapp', 'Task')
+        now = timezone.now()
+        task = Task.objects.create(
+            title='A1-001', first_assigned_at=now - timedelta(hours=6), completed_at=now, **self._fixtures(apps)
+        )
+
+        self._migrate(('Eapp', '0027_backfill_execution_hours'))
+
+        task.refresh_from_db()
+        self.assertAlmostEqual(task.net_execution_hours, 6.0)
+        self.assertEqual(task.return_hours, 0)
@@ -0,0 +1,68 @@
+"""
+Execution time metrics derived from a task's tracking fields.
+
+Net execution time is the time from first assignment to completion, minus
+the time the task spent returned to the customer and in an external
+workshop. The results are stored on the task (net_execution_hours,
+workshop_hours, return_hours) so reports can aggregate them in SQL.
+"""
+from datetime import datetime
+
+from django.utils import timezone
+
+# Task columns written by refresh_execution_hours()
+EXECUTION_HOURS_FIELDS = ['net_execution_hours', 'workshop_hours', 'return_hours']
+
+
+def _parse(value):
+    parsed = datetime.fromisoformat(value)
+    if timezone.is_naive(parsed):
+        return timezone.make_aware(parsed)
+    return parsed
+
+
+def period_hours(periods, completed_at, start_field, end_field):
+    """
+    Sum the length of {start_field, end_field} ISO timestamp periods in hours.
+
+    Only time up to completed_at counts: open periods end there, and periods
+    that began after it (the task was reopened) count as zero.
+    """
+    total_hours = 0
+    for period in periods or []:
+        if not period.get(start_field):
+            continue
+        start_time = _parse(period[start_field])
+        end_time = _parse(period[end_field]) if period.get(end_field) else completed_at
+        end_time = min(end_time, completed_at)
+        total_hours += max(0, (end_time - start_time).total_seconds() / 3600)
+    return total_hours
+
+
+def execution_hours(task):
+    """
+    Calculate (net_execution_hours, workshop_hours, return_hours) for a task.
+
+    Returns:
+        tuple: Hours as floats, or (None, None, None) if the task has not
+        been both assigned and completed
+    """
+    if not task.first_assigned_at or not task.completed_at:
+        return None, None, None
+
+    gross_hours = (task.completed_at - task.first_assigned_at).total_seconds() / 3600
+    return_hours = period_hours(task.return_periods, task.completed_at, 'returned_at', 'reassigned_at')
+    workshop_hours = period_hours(task.workshop_periods, task.completed_at, 'sent_at', 'returned_at')
+
+    # Net hours are never negative
+    return max(0, gross_hours - return_hours - workshop_hours), workshop_hours, return_hours
+
+
+def refresh_execution_hours(task):
+    """Set the stored execution hour columns from the task's current tracking fields (not saved)."""
+    task.net_execution_hours, task.workshop_hours, task.return_hours = execution_hours(task)
+
+
+def clear_execution_hours(task):
+    """Clear the stored execution hour columns of a reopened task until it is completed again (not saved)."""
+    task.net_execution_hours = task.workshop_hours = task.return_hours = None
@@ -7,13 +7,17 @@ Example: A1-001, A1-002, B3-015
 Year character starts at 'A' from the first task ever created,
 incrementing by one letter each year.
 
+Sequence numbers are allocated from a per-month TaskIDCounter row using a
+single atomic UPDATE ... RETURNING, so concurrent intakes never receive the
+same ID and allocation cost does not grow with the size of the task table.
+
 Configuration:
     TASK_ID_YEAR_OFFSET: Offset the starting year character.
         - 0 (default): Start at 'A'
         - 1: Start at 'B'
         - 2: Start at 'C'
         - etc.
-    
+
     TASK_ID_SEQUENCE_OFFSET: Offset the starting sequence number.
         - 0 (default): Start at 001
         - 50: Start at 051 (for clients already at 050)
@@ -21,84 +25,147 @@ Configuration:
         Only applies when no tasks exist for the current month prefix.
 """
 import os
+from django.db import connection, transaction
+from django.db.models import F, Min
 from django.utils import timezone
 
 
 class TaskIDGenerator:
     """Generates unique task IDs for tasks."""
-    
+
+    # Year of the first task ever created. It never changes once a task
+    # exists, so it is looked up once per process.
+    _first_year = None
+
     @staticmethod
     def generate():
         """
-        Generate a new task ID based on current date and existing tasks.
-        
+        Generate a new task ID based on current date and the month counter.
+
         Returns:
             str: Task ID in format {YearChar}{Month}-{Sequence}
         """
-        from Eapp.models import Task
-        
         now = timezone.now()
-        
+
         # Determine the year character
         year_char = TaskIDGenerator._get_year_char()
-        
+
         # Format the prefix for the current month
         month_prefix = f"{year_char}{now.month}"
-        
+
         # Get the next sequence number
         sequence = TaskIDGenerator._get_next_sequence(month_prefix)
-        
+
         return f"{month_prefix}-{sequence:03d}"
-    
+
     @staticmethod
     def _get_year_char():
         """
         Calculate the year character based on the first task ever created.
-        
+
         The starting character can be offset via TASK_ID_YEAR_OFFSET env var.
-        
+
         Returns:
             str: Single character representing the year offset
         """
         from Eapp.models import Task
-        
+
         now = timezone.now()
         offset = int(os.environ.get('TASK_ID_YEAR_OFFSET', 0))
-        first_task = Task.objects.order_by('created_at').first()
-        
-        if first_task:
-            first_year = first_task.created_at.year
-            year_char = chr(ord('A') + offset + now.year - first_year)
+
+        if TaskIDGenerator._first_year is None:
+            first_created = Task.objects.aggregate(first=Min('created_at'))['first']
+            if first_created:
+                TaskIDGenerator._first_year = first_created.year
+
+        if TaskIDGenerator._first_year is not None:
+            year_char = chr(ord('A') + offset + now.year - TaskIDGenerator._first_year)
         else:
             year_char = chr(ord('A') + offset)
-        
+
         return year_char
-    
+
     @staticmethod
     def _get_next_sequence(month_prefix):
         """
-        Get the next sequence number for the given month prefix.
-        
+        Atomically allocate the next sequence number for the given month prefix.
+
         Args:
             month_prefix (str): The month prefix (e.g., 'A1', 'B12')
-            
+
         Returns:
             int: The next sequence number
         """
+        value = TaskIDGenerator._increment(month_prefix)
+        if value is None:
+            TaskIDGenerator._create_counter(month_prefix)
+            value = TaskIDGenerator._increment(month_prefix)
+        return value
+
+    @staticmethod
+    def _increment(month_prefix):
+        """
+        Increment the counter row for month_prefix and return the new value.
+
+        Returns None when the counter row does not exist yet.
+        """
+        from Eapp.models import TaskIDCounter
+
+        if connection.vendor in ('postgresql', 'sqlite'):
+            table = connection.ops.quote_name(TaskIDCounter._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET last_value = last_value + 1 "
+                    f"WHERE prefix = %s RETURNING last_value",
+                    [month_prefix],
+                )
+                row = cursor.fetchone()
+            return row[0] if row else None
+
+        # Backends without UPDATE ... RETURNING: lock the row for the increment
+        with transaction.atomic():
+            updated = TaskIDCounter.objects.filter(prefix=month_prefix).update(
+                last_value=F('last_value') + 1
+            )
+            if not updated:
+                return None
+            return TaskIDCounter.objects.get(prefix=month_prefix).last_value
+
+    @staticmethod
+    def _create_counter(month_prefix):
+        """
+        Create the counter row for a new month prefix.
+
+        The counter starts at the highest sequence already used by tasks with
+        this prefix, or at TASK_ID_SEQUENCE_OFFSET when there are none. If
+        another process creates the row first, its row is kept.
+        """
+        from Eapp.models import TaskIDCounter
+
+        TaskIDCounter.objects.bulk_create(
+            [TaskIDCounter(prefix=month_prefix, last_value=TaskIDGenerator._last_used_sequence(month_prefix))],
+            ignore_conflicts=True,
+        )
+
+    @staticmethod
+    def _last_used_sequence(month_prefix):
+        """
+        Find the highest sequence number already issued for month_prefix.
+
+        Only consulted once per month, when the counter row is first created.
+        """
         from Eapp.models import Task
-        
-        # Find the last task created this month to determine the next sequence number
-        last_task = Task.objects.filter(
-            title__startswith=month_prefix
-        ).order_by('-title').first()
-        
-        if last_task:
-            # Extract the sequence number from the last task's title
-            last_seq = int(last_task.title.split('-')[-1])
-            new_seq = last_seq + 1
-        else:
+
+        last_seq = None
+        titles = Task.objects.filter(
+            title__startswith=f"{month_prefix}-"
+        ).values_list('title', flat=True)
+        for title in titles:
+            seq = title[len(month_prefix) + 1:].split('-')[0]
+            if seq.isdigit():
+                last_seq = max(last_seq or 0, int(seq))
+
+        if last_seq is None:
             # Start a new sequence for the month, with optional offset
-            offset = int(os.environ.get('TASK_ID_SEQUENCE_OFFSET', 0))
-            new_seq = offset + 1
-        
-        return new_seq
+            last_seq = int(os.environ.get('TASK_ID_SEQUENCE_OFFSET', 0))
+        return last_seq
@@ -6,6 +6,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from common.models import Location, Model
+from common.serializers import SparseFieldsetMixin
 from customers.models import Customer, Referrer
 from customers.serializers import CustomerSerializer
 from financials.serializers import PaymentSerializer, CostBreakdownSerializer
@@ -13,7 +14,7 @@ from financials.models import Payment, PaymentMethod, PaymentCategory, CostBreak
 from users.permissions import IsAdminOrManagerOrAccountant
 from users.models import User
 from .models import Task, TaskActivity
-from .serializers import TaskListSerializer, TaskDetailSerializer, TaskActivitySerializer
+from .serializers import TaskListSerializer, TaskDetailSerializer, TaskActivitySerializer, BulkTaskOperationSerializer
 from .filters import TaskFilter
 from .pagination import StandardResultsSetPagination
 from .utils import CanCreateTask, CanDeleteTask, CanAddPayment, TaskIDGenerator
@@ -40,21 +41,15 @@ class TaskViewSet(viewsets.ModelViewSet):
         if self.action in ['list', 'retrieve', 'debts', 'return_task', None]:
             queryset = queryset.with_outstanding_balance()
 
-        # Prefetch related objects to avoid N+1 queries
-        if self.action == 'list':
-            return queryset.select_related(
-                'customer', 'assigned_to', 'laptop_model'
-            ).prefetch_related(
-                'payments', 'cost_breakdowns'
-            )
-        elif self.action in ['retrieve', 'update', 'partial_update', 'return_task', None]:
-            # For detail view and updates, prefetch all related data
-            return queryset.select_related(
-                'assigned_to', 'created_by', 'negotiated_by', 'brand', 'referred_by', 'customer', 
-                'workshop_location', 'laptop_model'
-            ).prefetch_related(
-                'activities', 'payments', 'cost_breakdowns'
+        # Load only the relations the (possibly ?fields=/?expand= pruned) serializer will read
+        if self.action in ['list', 'retrieve', 'update', 'partial_update', 'return_task', None]:
+            select_related, prefetch_related = self.get_serializer_class().query_plan(
+                *self.get_fieldset()
             )
+            # select_related() with no arguments would follow every foreign key
+            if select_related:
+                queryset = queryset.select_related(*select_related)
+            return queryset.prefetch_related(*prefetch_related)
         
         return queryset
 
@@ -83,6 +78,18 @@ class TaskViewSet(viewsets.ModelViewSet):
             return TaskListSerializer
         return TaskDetailSerializer
 
+    def get_fieldset(self):
+        """Requested (fields, expand) from the ?fields= and ?expand= query params."""
+        request = getattr(self, 'request', None)
+        if request is None:
+            return None, None
+        return SparseFieldsetMixin.parse_params(request.query_params)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['expand'] = self.get_fieldset()
+        return context
+
     def get_object(self):
         import logging
         logger = logging.getLogger(__name__)
@@ -95,7 +102,6 @@ class TaskViewSet(viewsets.ModelViewSet):
         logger.warning(f"[TASK DEBUG] User: {self.request.user.username} (Role: {self.request.user.role})")
         logger.warning(f"[TASK DEBUG] Action: {self.action}, Method: {self.request.method}")
         logger.warning(f"[TASK DEBUG] Looking up task: {filter_kwargs}")
-        logger.warning(f"[TASK DEBUG] Queryset count: {queryset.count()}")
         
         try:
             obj = get_object_or_404(queryset, **filter_kwargs)
@@ -247,6 +253,41 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         return super().destroy(request, *args, **kwargs)
 
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Apply one operation to many tasks at once.
+
+        Body: {"task_ids": [...], "operation": "assign" | "transition" | "relocate",
+        plus "assigned_to", "status" or "location"}. Returns per-task results.
+        """
+        if not (request.user.role in ['Manager', _FRONT_DESK] or request.user.is_superuser):
+            return Response(
+                {"error": "You do not have permission to update tasks in bulk."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = BulkTaskOperationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        from .services import BulkTaskService
+        results = BulkTaskService.apply(
+            request.user,
+            data['task_ids'],
+            data['operation'],
+            assigned_to=data.get('assigned_to'),
+            new_status=data.get('status'),
+            location=data.get('location'),
+        )
+        succeeded = sum(1 for result in results if result['success'])
+        return Response({
+            'operation': data['operation'],
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results,
+        })
+
     @action(detail=False, methods=['get'], permission_classes=[IsAdminOrManagerOrAccountant])
     def debts(self, request):
         """
@@ -506,15 +547,10 @@ class TaskViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             activity = serializer.save(task=task, user=request.user)
             
-            # Update snapshots using service layer
+            # Update snapshots using service layer; the activity signal has set the activity-derived ones
             if activity.type == TaskActivity.ActivityType.WORKSHOP:
                 WorkshopHandler.update_snapshots_from_activity(task, activity)
             
-            if activity.type == TaskActivity.ActivityType.PICKED_UP:
-                task.latest_pickup_at = activity.timestamp
-                task.latest_pickup_by = activity.user
-                task.save(update_fields=['latest_pickup_at', 'latest_pickup_by'])
-            
             return Response(TaskActivitySerializer(activity).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1,19 +1,40 @@
 """
-PostgreSQL pgcrypto encryption utilities for sensitive fields.
+Field encryption utilities for sensitive fields.
 
-This module provides utilities for encrypting and decrypting sensitive data
-using PostgreSQL's pgcrypto extension with AES-256 encryption.
+Two engines are supported, selected with FIELD_ENCRYPTION_ENGINE:
+
+- 'pgcrypto' (default): PostgreSQL pgp_sym_encrypt/pgp_sym_decrypt, one
+  database round trip per value. Values are hex strings starting with 'c3'.
+- 'aesgcm': in-process AES-256-GCM via the `cryptography` package, no
+  database round trip. Values look like 'v1:<key id>:<base64 nonce+ciphertext>'.
+
+Decryption always understands both formats, so engines can be switched at any
+time; `python manage.py reencrypt_fields` migrates existing rows to AES-GCM.
+
+Decrypted values are kept in a small in-memory LRU (see DecryptionCache) so
+hot ciphertexts such as customer phone numbers are not decrypted repeatedly.
 
 Requires:
-- PostgreSQL database with pgcrypto extension enabled
 - FIELD_ENCRYPTION_KEY environment variable set
+- PostgreSQL with pgcrypto for the 'pgcrypto' engine and for legacy values
+- `cryptography` for the 'aesgcm' engine
 """
+import base64
+import hashlib
+import hmac
 import os
-from django.db import connection
+import re
+import threading
+import time
+from collections import OrderedDict
+from django.db import connection, transaction
 from django.conf import settings
-from functools import wraps
+from django.core.exceptions import ImproperlyConfigured
+from functools import lru_cache, wraps
 import logging
 
+from common.metrics import record_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,19 +55,288 @@ def get_encryption_key():
     return key
 
 
-def encrypt_value(plaintext):
+def get_encryption_key_silent():
+    """Get the encryption key without warning when it is missing."""
+    return os.environ.get('FIELD_ENCRYPTION_KEY') or None
+
+
+ENGINE_PGCRYPTO = 'pgcrypto'
+ENGINE_AESGCM = 'aesgcm'
+
+# Prefix of values written by the in-process AES-GCM engine (format version 1)
+LOCAL_PREFIX = 'v1:'
+_NONCE_SIZE = 12
+
+
+def get_encryption_engine():
+    """Get the engine used for new writes ('pgcrypto' or 'aesgcm')."""
+    engine = os.environ.get('FIELD_ENCRYPTION_ENGINE', ENGINE_PGCRYPTO).strip().lower()
+    if engine not in (ENGINE_PGCRYPTO, ENGINE_AESGCM):
+        raise ImproperlyConfigured(f"Unknown FIELD_ENCRYPTION_ENGINE '{engine}'")
+    return engine
+
+
+def get_previous_encryption_keys():
+    """Retired keys (comma-separated FIELD_ENCRYPTION_PREVIOUS_KEYS) still accepted for reads."""
+    raw = os.environ.get('FIELD_ENCRYPTION_PREVIOUS_KEYS', '')
+    return [key.strip() for key in raw.split(',') if key.strip()]
+
+
+def local_key_id(key):
+    """Short, non-secret identifier of a key, embedded in AES-GCM values."""
+    return hashlib.sha256(key.encode()).hexdigest()[:8]
+
+
+@lru_cache(maxsize=8)
+def _local_cipher(key):
+    """Build the AES-256-GCM cipher for a passphrase (HKDF-SHA256 derived key)."""
+    try:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+    except ImportError:
+        raise ImproperlyConfigured("The 'aesgcm' encryption engine requires the cryptography package")
+
+    derived = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b'a-express field encryption v1',
+    ).derive(key.encode())
+    return AESGCM(derived)
+
+
+def _local_encrypt(plaintext, key):
+    nonce = os.urandom(_NONCE_SIZE)
+    sealed = _local_cipher(key).encrypt(nonce, str(plaintext).encode(), None)
+    token = base64.urlsafe_b64encode(nonce + sealed).decode().rstrip('=')
+    return f"{LOCAL_PREFIX}{local_key_id(key)}:{token}"
+
+
+def _local_decrypt(value):
+    """Decrypt an AES-GCM value with whichever configured key matches its key id."""
+    _, key_id, token = value.split(':', 2)
+    candidates = [get_encryption_key_silent()] + get_previous_encryption_keys()
+    key = next((k for k in candidates if k and local_key_id(k) == key_id), None)
+    if key is None:
+        raise ValueError(f"No configured key matches key id {key_id}")
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    nonce, sealed = raw[:_NONCE_SIZE], raw[_NONCE_SIZE:]
+    return _local_cipher(key).decrypt(nonce, sealed, None).decode()
+
+
+def is_locally_encrypted(value):
+    """Check if a value was written by the in-process AES-GCM engine."""
+    return isinstance(value, str) and value.startswith(LOCAL_PREFIX)
+
+
+def needs_reencryption(value):
+    """
+    Check if a stored value should be rewritten with the current AES-GCM key.
+
+    True for legacy pgcrypto values and for AES-GCM values under a retired key.
+    """
+    if is_encrypted(value):
+        return True
+    if is_locally_encrypted(value):
+        key = get_encryption_key_silent()
+        return not key or not value.startswith(f"{LOCAL_PREFIX}{local_key_id(key)}:")
+    return False
+
+
+class DecryptionCache:
+    """
+    Thread-safe, bounded, TTL-based LRU of decrypted values.
+
+    Entries are keyed by a SHA-256 digest of the ciphertext, live only in
+    process memory, and are dropped when the configured keys change.
+    Controlled by the FIELD_DECRYPTION_CACHE_* settings.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._keys = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'FIELD_DECRYPTION_CACHE_ENABLED', True) and \
+            getattr(settings, 'FIELD_DECRYPTION_CACHE_SIZE', 4096) > 0
+
+    @staticmethod
+    def _digest(ciphertext):
+        return hashlib.sha256(ciphertext.encode()).digest()
+
+    def _check_keys(self):
+        """Clear all entries if the current or previous keys were rotated (lock held)."""
+        keys = (os.environ.get('FIELD_ENCRYPTION_KEY'), os.environ.get('FIELD_ENCRYPTION_PREVIOUS_KEYS'))
+        if keys != self._keys:
+            self._entries.clear()
+            self._keys = keys
+
+    def get(self, ciphertext):
+        """Return the cached plaintext for a ciphertext, or None."""
+        if not self.enabled():
+            return None
+        digest = self._digest(ciphertext)
+        with self._lock:
+            self._check_keys()
+            entry = self._entries.get(digest)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[digest]
+                self.misses += 1
+                plaintext = None
+            else:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                plaintext = entry[1]
+        record_cache('decryption', plaintext is not None)
+        return plaintext
+
+    def set(self, ciphertext, plaintext):
+        """Cache a successfully decrypted value."""
+        if not self.enabled():
+            return
+        ttl = getattr(settings, 'FIELD_DECRYPTION_CACHE_TTL', 600)
+        max_size = getattr(settings, 'FIELD_DECRYPTION_CACHE_SIZE', 4096)
+        digest = self._digest(ciphertext)
+        with self._lock:
+            self._check_keys()
+            self._entries[digest] = (time.monotonic() + ttl, plaintext)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: size, hits, misses and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+decryption_cache = DecryptionCache()
+
+
+# HKDF context for the blind index key derived from FIELD_ENCRYPTION_KEY
+BLIND_INDEX_KEY_INFO = b'blind-index-v1'
+
+
+@lru_cache(maxsize=8)
+def derive_key(secret, info):
     """
-    Encrypt a plaintext value using pgcrypto.
+    Derive a 32-byte subkey from a secret with HKDF-SHA256 (RFC 5869).
+
+    Different `info` values give independent keys, so one secret can back
+    several purposes without any of them using the secret itself.
+    """
+    try:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+    except ImportError:
+        raise ImproperlyConfigured("Deriving encryption subkeys requires the cryptography package")
+
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=info).derive(secret.encode())
+
+
+def get_blind_index_key():
+    """
+    Get the HMAC key used for blind indexes.
+
+    Uses BLIND_INDEX_KEY when set. Otherwise a separate key is derived with
+    HKDF from FIELD_ENCRYPTION_KEY (or SECRET_KEY), so the encryption key is
+    never used directly as an HMAC key. Changing the key requires re-running
+    populate_phone_blind_index --all.
+
+    Returns:
+        bytes: The HMAC key
+    """
+    key = os.environ.get('BLIND_INDEX_KEY')
+    if key:
+        return key.encode()
+    return derive_key(os.environ.get('FIELD_ENCRYPTION_KEY') or settings.SECRET_KEY, BLIND_INDEX_KEY_INFO)
+
+
+def normalize_phone_number(phone, default_country_code='255'):
+    """
+    Normalize a phone number to E.164 (e.g. '0712 345-678' -> '+255712345678').
+
+    Local numbers with a leading 0, and bare 9-digit subscriber numbers, are
+    given the default (Tanzania) country code.
+
+    Returns:
+        The E.164 string, or None if the value contains no digits
+    """
+    if not phone:
+        return None
+    digits = re.sub(r'\D', '', str(phone))
+    if not digits:
+        return None
+    if digits.startswith('00'):
+        digits = digits[2:]
+    elif digits.startswith('0'):
+        digits = default_country_code + digits[1:]
+    elif len(digits) == 9:
+        digits = default_country_code + digits
+    return f'+{digits}'
+
+
+def blind_index(value):
+    """
+    Compute a deterministic HMAC-SHA256 blind index for a plaintext value.
+
+    The index allows equality lookups on encrypted columns without decrypting
+    them, and reveals nothing about the value without the key.
+    """
+    if not value:
+        return None
+    return hmac.new(get_blind_index_key(), str(value).encode(), hashlib.sha256).hexdigest()
+
+
+def phone_blind_index(phone):
+    """Blind index of a phone number, computed from its normalized E.164 form."""
+    return blind_index(normalize_phone_number(phone))
+
+
+def encrypt_value(plaintext, engine=None):
+    """
+    Encrypt a plaintext value with the configured engine.
     
     Args:
         plaintext: The string value to encrypt
+        engine: Override FIELD_ENCRYPTION_ENGINE ('pgcrypto' or 'aesgcm')
         
     Returns:
-        The encrypted value as a hex string, or original if encryption fails/unavailable
+        The encrypted value, or original if encryption fails/unavailable
     """
     if not plaintext:
         return plaintext
     
+    if (engine or get_encryption_engine()) == ENGINE_AESGCM:
+        key = get_encryption_key()
+        if not key:
+            return plaintext
+        return _local_encrypt(plaintext, key)
+    
     # Skip encryption on non-PostgreSQL databases (MySQL, SQLite)
     if not is_postgresql():
         logger.debug("Skipping encryption - not PostgreSQL")
@@ -72,17 +362,41 @@ def encrypt_value(plaintext):
 
 def decrypt_value(encrypted):
     """
-    Decrypt an encrypted value using pgcrypto.
+    Decrypt a value written by either engine.
+    
+    AES-GCM values are decrypted in-process; legacy pgcrypto values need a
+    database round trip. Anything else is treated as plaintext. Successful
+    decryptions are served from the in-memory decryption cache.
     
     Args:
-        encrypted: The encrypted hex string
+        encrypted: The encrypted string
         
     Returns:
         The decrypted plaintext value, or original if decryption fails/unavailable
     """
-    if not encrypted:
+    if not encrypted or not (is_locally_encrypted(encrypted) or is_encrypted(encrypted)):
         return encrypted
     
+    cached = decryption_cache.get(encrypted)
+    if cached is not None:
+        return cached
+    
+    plaintext = _decrypt_uncached(encrypted)
+    if plaintext != encrypted:
+        decryption_cache.set(encrypted, plaintext)
+    return plaintext
+
+
+def _decrypt_uncached(encrypted):
+    if is_locally_encrypted(encrypted):
+        try:
+            return _local_decrypt(encrypted)
+        except ImproperlyConfigured:
+            raise
+        except Exception as e:
+            logger.error(f"Local decryption failed: {e}")
+            return encrypted
+    
     # Skip decryption on non-PostgreSQL databases
     if not is_postgresql():
         return encrypted
@@ -106,6 +420,60 @@ def decrypt_value(encrypted):
         return encrypted
 
 
+def decrypt_many(values):
+    """
+    Decrypt a batch of values written by either engine.
+
+    AES-GCM values are decrypted in-process and all legacy pgcrypto values
+    are decrypted in a single statement (unnest over an array), instead of
+    one round trip per value. Duplicates are decrypted once.
+
+    Args:
+        values: Iterable of encrypted (or plaintext) strings, may contain None
+
+    Returns:
+        list: Decrypted values in the same order as `values`
+    """
+    values = list(values)
+    results = {}
+    legacy = {}  # ordered set of pgcrypto values still to decrypt
+
+    for value in values:
+        if not value or value in results:
+            continue
+        if is_encrypted(value):
+            cached = decryption_cache.get(value)
+            if cached is not None:
+                results[value] = cached
+            else:
+                legacy[value] = None
+            continue
+        results[value] = decrypt_value(value)
+
+    if legacy:
+        key = get_encryption_key() if is_postgresql() else None
+        if key:
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT t.v, pgp_sym_decrypt(decode(t.v, 'hex'), %s) "
+                        "FROM unnest(%s::text[]) AS t(v)",
+                        [key, list(legacy)]
+                    )
+                    for value, plaintext in cursor.fetchall():
+                        results[value] = plaintext
+                        decryption_cache.set(value, plaintext)
+            except Exception as e:
+                # One bad value fails the whole statement; fall back per value
+                logger.debug(f"Batch decryption failed, decrypting individually: {e}")
+                for value in legacy:
+                    results[value] = decrypt_value(value)
+        else:
+            results.update((value, value) for value in legacy)
+
+    return [results.get(value, value) if value else value for value in values]
+
+
 def is_encrypted(value):
     """
     Check if a value appears to be encrypted (hex encoded pgcrypto output).
@@ -164,7 +532,7 @@ def encrypt_model_field(model_class, field_name, queryset=None):
     count = 0
     for obj in queryset.iterator():
         value = getattr(obj, field_name)
-        if value and not is_encrypted(value):
+        if value and not is_encrypted(value) and not is_locally_encrypted(value):
             encrypted = encrypt_value(value)
             # Use raw update to avoid triggering re-encryption
             model_class.objects.filter(pk=obj.pk).update(**{field_name: encrypted})
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.encryption import (
+    ENGINE_AESGCM,
+    ENGINE_PGCRYPTO,
+    decrypt_value,
+    encrypt_value,
+    get_encryption_key,
+    is_encrypted,
+    is_postgresql,
+)
+
+
+class Command(BaseCommand):
+    help = 'Compares decryption throughput of the pgcrypto and in-process AES-GCM engines'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=10000,
+            help='Number of values to decrypt per engine (default: 10000)',
+        )
+        parser.add_argument(
+            '--value',
+            default='+255712345678',
+            help='Plaintext to encrypt and decrypt (default: a phone number)',
+        )
+
+    def handle(self, *args, **options):
+        if not get_encryption_key():
+            raise CommandError("FIELD_ENCRYPTION_KEY must be set to benchmark encryption.")
+
+        count = options['count']
+        plaintext = options['value']
+        self.stdout.write(f"Decrypting {count} values per engine...")
+
+        engines = [ENGINE_AESGCM]
+        if is_postgresql():
+            engines.insert(0, ENGINE_PGCRYPTO)
+        else:
+            self.stdout.write(self.style.WARNING("Not on PostgreSQL - skipping the pgcrypto engine."))
+
+        results = {}
+        for engine in engines:
+            ciphertext = encrypt_value(plaintext, engine=engine)
+            if engine == ENGINE_PGCRYPTO and not is_encrypted(ciphertext):
+                self.stdout.write(self.style.WARNING("pgcrypto encryption unavailable - skipping."))
+                continue
+
+            started = time.perf_counter()
+            for _ in range(count):
+                decrypted = decrypt_value(ciphertext)
+            elapsed = time.perf_counter() - started
+
+            if decrypted != plaintext:
+                raise CommandError(f"{engine} round trip returned {decrypted!r}")
+            results[engine] = elapsed
+            self.stdout.write(
+                f"  {engine:<9} total {elapsed:8.3f}s  "
+                f"per value {elapsed / count * 1e6:9.1f}us  "
+                f"{count / elapsed:10.0f} values/s"
+            )
+
+        if len(results) == 2:
+            speedup = results[ENGINE_PGCRYPTO] / results[ENGINE_AESGCM]
+            self.stdout.write(self.style.SUCCESS(f"AES-GCM is {speedup:.1f}x faster than pgcrypto."))
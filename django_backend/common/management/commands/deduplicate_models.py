@@ -41,6 +41,12 @@ class Command(BaseCommand):
             duplicates = self.process_brand(brand, dry_run)
             total_duplicates += duplicates
 
+        if total_duplicates and not dry_run:
+            # Merges move tasks with .update(), which bypasses the rollup signals
+            from reports.rollup import TaskRollup
+            rows = TaskRollup.rebuild()
+            self.stdout.write(f"Rebuilt daily task rollup ({rows} rows).")
+
         if total_duplicates == 0:
             self.stdout.write(self.style.SUCCESS("\nNo duplicates found in any processed brands."))
         else:
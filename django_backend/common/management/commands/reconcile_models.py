@@ -37,8 +37,15 @@ class Command(BaseCommand):
 
         self.stdout.write(f"Starting reconciliation for {len(target_brands)} brands (Dry run: {dry_run})")
 
+        self.merged = False
         for brand in target_brands:
             self.reconcile_brand(brand, dry_run)
+
+        if self.merged:
+            # Merges move tasks with .update(), which bypasses the rollup signals
+            from reports.rollup import TaskRollup
+            rows = TaskRollup.rebuild()
+            self.stdout.write(f"Rebuilt daily task rollup ({rows} rows).")
             
         self.stdout.write(self.style.SUCCESS("\nReconciliation process finished."))
 
@@ -87,6 +94,7 @@ class Command(BaseCommand):
                     with transaction.atomic():
                         Task.objects.filter(laptop_model=bad_model).update(laptop_model=good_model)
                         bad_model.delete()
+                    self.merged = True
                     self.stdout.write(self.style.SUCCESS("  - Merge complete."))
                 else:
                     self.stdout.write(self.style.WARNING("  - [DRY RUN] Would update tasks and delete bad model."))
@@ -0,0 +1,102 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from common.encryption import (
+    ENGINE_AESGCM,
+    LOCAL_PREFIX,
+    decrypt_value,
+    encrypt_value,
+    get_encryption_key,
+    is_encrypted,
+    is_locally_encrypted,
+    local_key_id,
+)
+
+# (model label, field name) of every column holding encrypted values
+ENCRYPTED_FIELDS = [
+    ('customers.PhoneNumber', 'phone_number'),
+    ('customers.Referrer', 'phone'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-encrypts legacy pgcrypto values (and AES-GCM values under retired keys) '
+        'with the in-process AES-GCM engine, in small batches so it can run alongside the app'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Rows per batch/transaction (default: 200)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.0,
+            help='Seconds to pause between batches to limit load (default: 0)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows would be re-encrypted',
+        )
+
+    def handle(self, *args, **options):
+        key = get_encryption_key()
+        if not key:
+            self.stdout.write(self.style.ERROR("FIELD_ENCRYPTION_KEY is not set - nothing to do."))
+            return
+
+        current_prefix = f"{LOCAL_PREFIX}{local_key_id(key)}:"
+        total = 0
+
+        for label, field_name in ENCRYPTED_FIELDS:
+            model = apps.get_model(label)
+            # Legacy pgcrypto hex values, or AES-GCM values written under another key
+            stale = (
+                Q(**{f'{field_name}__startswith': 'c3'}) |
+                (Q(**{f'{field_name}__startswith': LOCAL_PREFIX}) & ~Q(**{f'{field_name}__startswith': current_prefix}))
+            )
+            queryset = model.objects.filter(stale).order_by('pk')
+
+            pending = queryset.count()
+            self.stdout.write(f"{label}.{field_name}: {pending} rows to re-encrypt")
+            if options['dry_run'] or not pending:
+                continue
+
+            migrated = self._migrate(model, field_name, queryset, options['batch_size'], options['sleep'])
+            total += migrated
+            self.stdout.write(f"  {migrated} rows re-encrypted")
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully re-encrypted {total} values."))
+
+    def _migrate(self, model, field_name, queryset, batch_size, sleep):
+        last_pk = 0
+        migrated = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).values_list('pk', field_name)[:batch_size])
+            if not batch:
+                break
+
+            with transaction.atomic():
+                for pk, value in batch:
+                    plaintext = decrypt_value(value)
+                    if plaintext == value and (is_encrypted(value) or is_locally_encrypted(value)):
+                        self.stdout.write(self.style.WARNING(f"  Could not decrypt {model.__name__} {pk}; skipped"))
+                        continue
+                    # Only overwrite if the row was not changed since it was read
+                    migrated += model.objects.filter(pk=pk, **{field_name: value}).update(
+                        **{field_name: encrypt_value(plaintext, engine=ENGINE_AESGCM)}
+                    )
+
+            last_pk = batch[-1][0]
+            if sleep:
+                time.sleep(sleep)
+        return migrated
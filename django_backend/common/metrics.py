@@ -0,0 +1,192 @@
+"""
+Lightweight in-process metrics registry with Prometheus text exposition.
+
+Each process keeps its counters and histograms in memory (updates are a
+dict lookup under a lock). With METRICS_DIR set, every process also writes
+a snapshot of its own metrics to ``METRICS_DIR/metrics-<pid>.json`` at most
+every METRICS_FLUSH_INTERVAL seconds; render() sums the snapshots of all
+processes, so several workers can share one scrape endpoint without any
+cross-process locking. Without METRICS_DIR only the serving process's
+metrics are exposed.
+
+Request metrics are recorded by common.middleware.MetricsMiddleware;
+other code can add its own with inc() and observe(), e.g. record_cache().
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HELP = {
+    'http_request_duration_seconds': ('histogram', 'Request latency by route and method'),
+    'http_response_size_bytes': ('histogram', 'Response body size by route and method'),
+    'http_requests_total': ('counter', 'Requests by route, method and status'),
+    'db_queries_per_request': ('histogram', 'Database queries per request by route and method'),
+    'db_queries_total': ('counter', 'Database queries by route and method'),
+    'db_query_duration_seconds_total': ('counter', 'Time spent in database queries by route and method'),
+    'cache_requests_total': ('counter', 'Cache lookups by cache, route and result (hit/miss)'),
+    'sms_outbox_total': ('counter', 'SMS outbox messages by result (queued/sent/retried/failed)'),
+    'sms_gateway_request_duration_seconds': ('histogram', 'SMS gateway request latency by outcome (HTTP status, timeout or connection_error)'),
+    'scheduler_job_duration_seconds': ('histogram', 'Scheduled job runtime by job and result (ok/disabled/error)'),
+    'scheduler_job_items_total': ('counter', 'Tasks found and messages sent or failed by scheduled jobs, by job and kind'),
+}
+
+# [route label] of the request being handled, for metrics recorded deeper in the stack
+current_route = ContextVar('metrics_route', default=None)
+
+
+class MetricsRegistry:
+    """Counters and histograms for one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._last_flush = 0.0
+
+    def inc(self, name, labels, value=1):
+        """Add to a counter. ``labels`` is a tuple of (name, value) pairs."""
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        """Record one histogram observation."""
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [list(buckets), [0] * len(buckets), 0.0, 0]
+            bounds, counts = histogram[0], histogram[1]
+            for i, bound in enumerate(bounds):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            histogram[2] += value
+            histogram[3] += 1
+
+    def snapshot(self):
+        """JSON-serializable copy of this process's metrics."""
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [
+                    [name, list(labels), bounds, list(counts), total, count]
+                    for (name, labels), (bounds, counts, total, count) in self._histograms.items()
+                ],
+            }
+
+    def maybe_flush(self, force=False):
+        """Write this process's snapshot to METRICS_DIR if the flush interval has passed."""
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < getattr(settings, 'METRICS_FLUSH_INTERVAL', 5):
+            return
+        self._last_flush = now
+
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, os.path.join(directory, f'metrics-{os.getpid()}.json'))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+registry = MetricsRegistry()
+
+
+def inc(name, value=1, **labels):
+    registry.inc(name, tuple(sorted(labels.items())), value)
+
+
+def observe(name, value, buckets, **labels):
+    registry.observe(name, tuple(sorted(labels.items())), value, buckets)
+
+
+def record_cache(cache_name, hit):
+    """Count a cache lookup, attributed to the route being served."""
+    route = current_route.get()
+    inc('cache_requests_total', cache=cache_name, route=route[0] if route else '', result='hit' if hit else 'miss')
+
+
+def _snapshots():
+    """This process's live snapshot plus the latest snapshot of every other process."""
+    registry.maybe_flush(force=True)
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory or not os.path.isdir(directory):
+        return [registry.snapshot()]
+
+    snapshots = []
+    for filename in os.listdir(directory):
+        if not (filename.startswith('metrics-') and filename.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # Being replaced or truncated; picked up on the next scrape
+    return snapshots
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def render():
+    """
+    All processes' metrics in Prometheus text exposition format (version 0.0.4).
+    """
+    counters = {}
+    histograms = {}
+    for snapshot in _snapshots():
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, bounds, counts, total, count in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [bounds, [0] * len(bounds), 0.0, 0])
+            merged[1] = [a + b for a, b in zip(merged[1], counts)]
+            merged[2] += total
+            merged[3] += count
+
+    lines = []
+    for metric in sorted({name for name, _ in counters} | {name for name, _ in histograms}):
+        metric_type, help_text = HELP.get(metric, ('counter' if any(n == metric for n, _ in counters) else 'histogram', metric))
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} {metric_type}')
+        for (name, labels), value in sorted(counters.items()):
+            if name == metric:
+                lines.append(f'{metric}{_format_labels(labels)} {value}')
+        for (name, labels), (bounds, counts, total, count) in sorted(histograms.items()):
+            if name != metric:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{metric}_bucket{_format_labels(labels, [("le", "+Inf")])} {count}')
+            lines.append(f'{metric}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{metric}_count{_format_labels(labels)} {count}')
+    return '\n'.join(lines) + '\n'
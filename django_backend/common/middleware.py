@@ -0,0 +1,80 @@
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from common import metrics
+
+
+class MetricsMiddleware:
+    """
+    Record per-route request metrics in common.metrics.
+
+    Routes are labelled with the matched URL pattern (e.g.
+    ``api/tasks/(?P<title>[^/.]+)/$``) so label cardinality stays bounded;
+    requests that match no pattern are labelled ``unmatched``. Database
+    queries on the default connection are counted and timed with
+    ``connection.execute_wrapper``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        db = _QueryTimer()
+        # A mutable holder so process_view can fill it in from a copied context under ASGI
+        route = ['unmatched']
+        token = metrics.current_route.set(route)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(db):
+                response = self.get_response(request)
+        finally:
+            metrics.current_route.reset(token)
+        duration = time.perf_counter() - start
+
+        self._record(request.method, route[0], response, duration, db)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        route = metrics.current_route.get()
+        if match is not None and route is not None:
+            route[0] = match.route or match.view_name or 'unmatched'
+        return None
+
+    @staticmethod
+    def _record(method, route, response, duration, db):
+        labels = (('method', method), ('route', route))
+        registry = metrics.registry
+        registry.inc('http_requests_total', (*labels, ('status', response.status_code)))
+        registry.observe('http_request_duration_seconds', labels, duration, metrics.LATENCY_BUCKETS)
+        registry.observe('db_queries_per_request', labels, db.count, metrics.QUERY_COUNT_BUCKETS)
+        if db.count:
+            registry.inc('db_queries_total', labels, db.count)
+            registry.inc('db_query_duration_seconds_total', labels, db.seconds)
+        if not response.streaming:
+            registry.observe('http_response_size_bytes', labels, len(response.content), metrics.SIZE_BUCKETS)
+        registry.maybe_flush()
+
+
+class _QueryTimer:
+    """execute_wrapper that counts and times queries."""
+
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
@@ -0,0 +1,34 @@
+"""
+Migration to enable the pg_trgm extension for trigram search indexes.
+
+This migration only runs on PostgreSQL databases where pg_trgm is available.
+Elsewhere it is skipped and search falls back to plain icontains matching.
+"""
+from django.db import migrations, connection
+
+
+def enable_pg_trgm(apps, schema_editor):
+    """Enable pg_trgm extension on PostgreSQL only, if the server ships it."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm';")
+            if cursor.fetchone():
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+
+
+def disable_pg_trgm(apps, schema_editor):
+    """Disable pg_trgm extension on PostgreSQL only."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("DROP EXTENSION IF EXISTS pg_trgm;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0004_add_location_is_active'),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_pg_trgm, disable_pg_trgm),
+    ]
@@ -18,3 +18,91 @@ class ModelSerializer(serializers.ModelSerializer):
     class Meta:
         model = Model
         fields = ['id', 'name', 'brand']
+
+
+class SparseFieldsetMixin:
+    """
+    Lets a read-only serializer return a subset of its fields.
+
+    The view passes ``fields`` and ``expand`` (sets of field names, or None)
+    in the serializer context:
+
+    - neither given: every field is returned, as before
+    - ``fields``: only those fields are returned
+    - ``expand``: nested fields listed in ``expandable_fields`` are returned
+      only when expanded; plain fields are unaffected unless ``fields`` is set
+
+    ``related_fields`` maps a field to the (select_related, prefetch_related)
+    paths it needs, so the view can load only what will be serialized.
+    Pruning only applies to output; serializers built with ``data`` keep
+    every field so writes validate as usual.
+    """
+
+    related_fields = {}
+    expandable_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'data' in kwargs:
+            return
+        requested = self.requested_fields(
+            self.context.get('fields'), self.context.get('expand')
+        )
+        if requested is not None:
+            for name in list(self.fields):
+                if name not in requested:
+                    self.fields.pop(name)
+
+    @staticmethod
+    def parse_params(query_params):
+        """
+        Read ``?fields=`` and ``?expand=`` from request query params.
+
+        Returns:
+            tuple: (fields, expand), each a set of names or None when absent
+        """
+        def _split(name):
+            raw = query_params.get(name)
+            if raw is None:
+                return None
+            return {part.strip() for part in raw.split(',') if part.strip()}
+
+        return _split('fields'), _split('expand')
+
+    @classmethod
+    def requested_fields(cls, fields, expand):
+        """
+        Resolve which fields to serialize.
+
+        Returns:
+            set or None: Field names, or None for every field
+        """
+        if fields is None and expand is None:
+            return None
+        if expand and '*' in expand:
+            expand = set(cls.expandable_fields)
+        expand = set(expand or ())
+        if fields is not None:
+            return set(fields) | expand
+        return {
+            name for name in cls.Meta.fields
+            if name not in cls.expandable_fields or name in expand
+        }
+
+    @classmethod
+    def query_plan(cls, fields=None, expand=None):
+        """
+        Work out the relations needed to serialize the requested fields.
+
+        Returns:
+            tuple: (select_related paths, prefetch_related paths)
+        """
+        requested = cls.requested_fields(fields, expand)
+        select_related, prefetch_related = [], []
+        for name in cls.Meta.fields:
+            if requested is not None and name not in requested:
+                continue
+            selects, prefetches = cls.related_fields.get(name, ((), ()))
+            select_related.extend(p for p in selects if p not in select_related)
+            prefetch_related.extend(p for p in prefetches if p not in prefetch_related)
+        return select_related, prefetch_related
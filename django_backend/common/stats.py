@@ -0,0 +1,198 @@
+"""
+Dashboard statistics engine.
+
+A StatsDashboard is a named set of tiles. Each tile is one aggregate
+expression over one of the dashboard's sources (queryset factories). When
+the dashboard is computed, all tiles that share a source are evaluated in a
+single ``.aggregate()`` call using conditional aggregation
+(``Count('id', filter=Q(...))``), so a dashboard costs one query per table
+however many tiles it has. Date windows come from StatsContext as half-open
+ranges, which keeps the filters index-friendly, unlike ``__date``/``__month``
+lookups.
+
+Example:
+    dashboard = StatsDashboard('front_desk', sources={'tasks': lambda ctx: Task.objects.all()})
+
+    @dashboard.tile('new_tasks_count', source='tasks')
+    def new_tasks(ctx):
+        return Count('id', filter=Q(created_at__gte=ctx.day_start, created_at__lt=ctx.day_end))
+
+    data = dashboard.compute(StatsContext(user=request.user))
+
+compute_cached() serves the numbers from the Django cache. Cache keys embed
+a version per source name ('tasks', 'payments', 'messages', ...), and the
+hooks that change those tables call invalidate() to bump it, so every open
+dashboard recomputes once per change instead of once per poll.
+"""
+import time as _time
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from common.metrics import record_cache
+
+# Seconds a recompute may hold the lock before another process may start one
+RECOMPUTE_LOCK_TIMEOUT = 10
+
+
+def _version_key(source):
+    return f'stats:version:{source}'
+
+
+def _bump_versions(sources):
+    for source in sources:
+        try:
+            cache.incr(_version_key(source))
+        except ValueError:
+            # Missing or evicted: restart from a fresh value so old keys cannot match
+            cache.set(_version_key(source), _time.time_ns(), timeout=None)
+
+
+def invalidate(*sources):
+    """
+    Mark cached stats computed from these sources as stale.
+
+    Call from the hooks that change a source's table. Inside a transaction
+    the bump waits for the commit, so a reader cannot cache pre-commit data
+    under the new version.
+
+    Args:
+        *sources: Source names, e.g. 'tasks', 'payments'
+    """
+    transaction.on_commit(lambda: _bump_versions(sources))
+
+
+class StatsContext:
+    """
+    Per-request values tiles can filter on.
+
+    Attributes:
+        user: Requesting user
+        now: Current time
+        today, tomorrow: Dates for DateField filters
+        day_start, day_end: Aware datetimes bounding today in the current time zone
+        month_start, next_month_start: Dates bounding the current month
+    """
+
+    def __init__(self, user=None, now=None):
+        self.user = user
+        self.now = now or timezone.now()
+        self.today = self.now.date()
+        self.tomorrow = self.today + timedelta(days=1)
+        self.day_start = timezone.make_aware(datetime.combine(self.today, time.min))
+        self.day_end = timezone.make_aware(datetime.combine(self.tomorrow, time.min))
+        self.month_start = self.today.replace(day=1)
+        self.next_month_start = (self.month_start + timedelta(days=32)).replace(day=1)
+
+
+class Tile:
+    """One dashboard number: an aggregate expression over a named source."""
+
+    def __init__(self, key, source, expression, transform=None):
+        self.key = key
+        self.source = source
+        self.expression = expression
+        self.transform = transform
+
+    def value(self, raw):
+        value = raw or 0
+        return self.transform(value) if self.transform else value
+
+
+class StatsDashboard:
+    """A named, extensible set of tiles computed with one query per source."""
+
+    def __init__(self, name, sources, per_user=False):
+        """
+        Args:
+            name (str): Dashboard name, used in cache keys
+            sources (dict): Source name -> callable(ctx) returning the base queryset
+            per_user (bool): Whether the numbers depend on ctx.user (cached per user)
+        """
+        self.name = name
+        self.sources = dict(sources)
+        self.per_user = per_user
+        self.tiles = {}
+
+    def add_tile(self, key, source, expression, transform=None):
+        """
+        Register a tile.
+
+        Args:
+            key (str): Response key for the value
+            source (str): Name of one of the dashboard's sources
+            expression: Aggregate expression, or callable(ctx) returning one
+            transform: Optional callable applied to the value (None counts as 0)
+        """
+        if source not in self.sources:
+            raise ValueError(f"Dashboard '{self.name}' has no source '{source}'")
+        if key in self.tiles:
+            raise ValueError(f"Dashboard '{self.name}' already has a tile '{key}'")
+        self.tiles[key] = Tile(key, source, expression, transform)
+
+    def tile(self, key, source, transform=None):
+        """Decorator form of add_tile() for a callable(ctx) returning the expression."""
+        def register(expression):
+            self.add_tile(key, source, expression, transform)
+            return expression
+        return register
+
+    def compute(self, ctx):
+        """
+        Evaluate every tile.
+
+        Returns:
+            dict: Tile key -> value, in registration order
+        """
+        by_source = {}
+        for tile in self.tiles.values():
+            by_source.setdefault(tile.source, []).append(tile)
+
+        raw = {}
+        for source, tiles in by_source.items():
+            queryset = self.sources[source](ctx)
+            raw.update(queryset.aggregate(**{
+                tile.key: tile.expression(ctx) if callable(tile.expression) else tile.expression
+                for tile in tiles
+            }))
+        return {key: tile.value(raw[key]) for key, tile in self.tiles.items()}
+
+    def compute_cached(self, ctx):
+        """
+        compute() through the cache.
+
+        On a miss one caller recomputes while concurrent callers get the
+        previous numbers (or compute themselves if there are none yet).
+
+        Returns:
+            dict: Tile key -> value
+        """
+        if not getattr(settings, 'DASHBOARD_STATS_CACHE_ENABLED', True):
+            return self.compute(ctx)
+
+        base_key = f'stats:{self.name}:{ctx.today.isoformat()}'
+        if self.per_user:
+            base_key += f':user:{ctx.user.pk}'
+        sources = sorted(self.sources)
+        versions = cache.get_many([_version_key(source) for source in sources])
+        key = base_key + ':' + ':'.join(str(versions.get(_version_key(source), 0)) for source in sources)
+
+        data = cache.get(key)
+        record_cache('dashboard_stats', data is not None)
+        if data is not None:
+            return data
+
+        latest_key = f'{base_key}:latest'
+        if not cache.add(f'{key}:lock', 1, timeout=RECOMPUTE_LOCK_TIMEOUT):
+            latest = cache.get(latest_key)
+            if latest is not None:
+                return latest
+
+        data = self.compute(ctx)
+        timeout = getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 300)
+        cache.set_many({key: data, latest_key: data}, timeout=timeout)
+        cache.delete(f'{key}:lock')
+        return data
@@ -1,3 +1,386 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from common.encryption import (
+    ENGINE_AESGCM,
+    ENGINE_PGCRYPTO,
+    decryption_cache,
+    decrypt_many,
+    decrypt_value,
+    encrypt_value,
+    is_encrypted,
+    is_locally_encrypted,
+    local_key_id,
+    needs_reencryption,
+)
+from common import metrics
+from common.stats import StatsContext, StatsDashboard
+from common.models import Brand, Location, Model
+from customers.models import Customer, PhoneNumber, Referrer
+from Eapp.models import Task, TaskActivity, TaskAssignment
+from financials.models import (
+    Account, ApprovalRequest, CostBreakdown, DebtRequest, Payment, PaymentCategory, PaymentMethod, TransactionRequest,
+)
+from messaging.models import MessageLog, MessageTemplate, SchedulerNotification, SmsCampaign
+from users.models import User
+
+
+@mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_KEY': 'current-key', 'FIELD_ENCRYPTION_PREVIOUS_KEYS': ''})
+class LocalEncryptionEngineTests(TestCase):
+    def test_roundtrip_without_database(self):
+        encrypted = encrypt_value('+255712345678', engine=ENGINE_AESGCM)
+        self.assertTrue(encrypted.startswith(f"v1:{local_key_id('current-key')}:"))
+        with self.assertNumQueries(0):
+            self.assertEqual(decrypt_value(encrypted), '+255712345678')
+
+    def test_values_are_randomized(self):
+        self.assertNotEqual(encrypt_value('secret', engine=ENGINE_AESGCM), encrypt_value('secret', engine=ENGINE_AESGCM))
+
+    def test_engine_is_selected_from_environment(self):
+        with mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_ENGINE': 'aesgcm'}):
+            self.assertTrue(is_locally_encrypted(encrypt_value('secret')))
+
+    def test_previous_key_is_still_readable(self):
+        with mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_KEY': 'old-key'}):
+            encrypted = encrypt_value('secret', engine=ENGINE_AESGCM)
+        self.assertEqual(decrypt_value(encrypted), encrypted)  # unknown key id
+
+        with mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_PREVIOUS_KEYS': 'old-key'}):
+            self.assertEqual(decrypt_value(encrypted), 'secret')
+            self.assertTrue(needs_reencryption(encrypted))
+
+    def test_tampered_value_is_not_decrypted(self):
+        encrypted = encrypt_value('secret', engine=ENGINE_AESGCM)
+        tampered = encrypted[:-2] + ('A' if encrypted[-2] != 'A' else 'B') + encrypted[-1]
+        self.assertEqual(decrypt_value(tampered), tampered)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'pgcrypto requires PostgreSQL')
+class ReencryptFieldsTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_KEY': 'current-key', 'FIELD_ENCRYPTION_PREVIOUS_KEYS': ''})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.legacy = encrypt_value('+255712345678', engine=ENGINE_PGCRYPTO)
+        customer = Customer.objects.create(name='Juma Hassan')
+        PhoneNumber.objects.create(customer=customer, phone_number=self.legacy)
+
+    def test_legacy_values_remain_readable(self):
+        self.assertTrue(is_encrypted(self.legacy))
+        self.assertEqual(decrypt_value(self.legacy), '+255712345678')
+
+    def test_command_migrates_legacy_values(self):
+        call_command('reencrypt_fields', batch_size=1, stdout=StringIO())
+        stored = PhoneNumber.objects.get().phone_number
+        self.assertTrue(is_locally_encrypted(stored))
+        self.assertFalse(needs_reencryption(stored))
+        self.assertEqual(decrypt_value(stored), '+255712345678')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'pgcrypto requires PostgreSQL')
+class DecryptManyTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_KEY': 'current-key', 'FIELD_ENCRYPTION_PREVIOUS_KEYS': ''})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_mixed_batch_is_decrypted_in_one_query(self):
+        legacy = [encrypt_value(f'+2557000000{i:02d}', engine=ENGINE_PGCRYPTO) for i in range(5)]
+        local = encrypt_value('+255799999999', engine=ENGINE_AESGCM)
+        values = legacy + [local, None, 'plain', legacy[0]]
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = decrypt_many(values)
+
+        decrypts = [q for q in ctx.captured_queries if 'pgp_sym_decrypt' in q['sql']]
+        self.assertEqual(len(decrypts), 1)
+        expected = [f'+2557000000{i:02d}' for i in range(5)] + ['+255799999999', None, 'plain', '+255700000000']
+        self.assertEqual(result, expected)
+
+    def test_undecryptable_value_does_not_break_the_batch(self):
+        good = encrypt_value('+255700000001', engine=ENGINE_PGCRYPTO)
+        bad = 'c3' + '0' * 60
+        self.assertEqual(decrypt_many([good, bad]), ['+255700000001', bad])
+
+
+class DecryptionCacheTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_KEY': 'current-key', 'FIELD_ENCRYPTION_PREVIOUS_KEYS': ''})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        decryption_cache.clear()
+        self.encrypted = encrypt_value('+255712345678', engine=ENGINE_AESGCM)
+
+    def test_repeated_decrypts_are_cache_hits(self):
+        for _ in range(3):
+            self.assertEqual(decrypt_value(self.encrypted), '+255712345678')
+        self.assertEqual(decryption_cache.stats()['hits'], 2)
+        self.assertEqual(decryption_cache.stats()['misses'], 1)
+
+    def test_key_rotation_clears_cache(self):
+        decrypt_value(self.encrypted)
+        with mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_KEY': 'new-key'}):
+            self.assertEqual(decrypt_value(self.encrypted), self.encrypted)
+        self.assertEqual(decryption_cache.stats()['hits'], 0)
+
+    @override_settings(FIELD_DECRYPTION_CACHE_SIZE=2)
+    def test_cache_is_bounded(self):
+        for i in range(5):
+            decrypt_value(encrypt_value(f'value {i}', engine=ENGINE_AESGCM))
+        self.assertEqual(decryption_cache.stats()['size'], 2)
+
+    @override_settings(FIELD_DECRYPTION_CACHE_TTL=0)
+    def test_expired_entries_are_not_served(self):
+        decrypt_value(self.encrypted)
+        decrypt_value(self.encrypted)
+        self.assertEqual(decryption_cache.stats()['hits'], 0)
+
+    @override_settings(FIELD_DECRYPTION_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        decrypt_value(self.encrypted)
+        decrypt_value(self.encrypted)
+        self.assertEqual(decryption_cache.stats()['size'], 0)
+
+
+class StatsDashboardTests(TestCase):
+    def setUp(self):
+        self.dashboard = StatsDashboard('test', sources={
+            'customers': lambda ctx: Customer.objects.all(),
+            'phones': lambda ctx: PhoneNumber.objects.all(),
+        })
+        for name in ('Alice', 'Bob', 'Carol'):
+            Customer.objects.create(name=name)
+
+    def test_tiles_sharing_a_source_are_computed_in_one_query(self):
+        self.dashboard.add_tile('customers', 'customers', Count('id'))
+        self.dashboard.add_tile('named_a', 'customers', Count('id', filter=Q(name__startswith='A')))
+
+        @self.dashboard.tile('created_today', source='customers')
+        def created_today(ctx):
+            return Count('id', filter=Q(created_at__gte=ctx.day_start, created_at__lt=ctx.day_end))
+
+        self.dashboard.add_tile('phones', 'phones', Count('id'))
+
+        with self.assertNumQueries(2):
+            data = self.dashboard.compute(StatsContext())
+
+        self.assertEqual(data, {'customers': 3, 'named_a': 1, 'created_today': 3, 'phones': 0})
+
+    def test_registration_is_validated(self):
+        with self.assertRaises(ValueError):
+            self.dashboard.add_tile('orders', 'orders', Count('id'))
+        self.dashboard.add_tile('customers', 'customers', Count('id'))
+        with self.assertRaises(ValueError):
+            self.dashboard.add_tile('customers', 'customers', Count('id'))
+
+
+@override_settings(METRICS_DIR=None)
+class MetricsTests(APITestCase):
+    def setUp(self):
+        metrics.registry.reset()
+        self.staff = User.objects.create_user(username='staff', password='testpassword', email='staff@gmail.com', role='Manager', is_staff=True)
+        self.client.force_authenticate(user=self.staff)
+
+    def _counter(self, name, **labels):
+        expected = sorted(labels.items())
+        for counter, counter_labels, value in metrics.registry.snapshot()['counters']:
+            if counter == name and sorted(map(tuple, counter_labels)) == expected:
+                return value
+        return 0
+
+    def test_requests_are_recorded_per_route(self):
+        Location.objects.create(name='Main')
+        self.client.get('/api/locations/')
+        self.client.get('/api/locations/')
+
+        labels = {'method': 'GET', 'route': 'api/locations/$'}
+        self.assertEqual(self._counter('http_requests_total', status=200, **labels), 2)
+        self.assertGreater(self._counter('db_queries_total', **labels), 0)
+        output = metrics.render()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', output)
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="api/locations/$"} 2', output)
+        self.assertIn('http_response_size_bytes_bucket{method="GET",route="api/locations/$",le="+Inf"} 2', output)
+
+    def test_endpoint_is_staff_only(self):
+        other = User.objects.create_user(username='frontdesk', password='testpassword', email='fd@gmail.com', role='Front Desk')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(b'http_requests_total{method="GET",route="api/metrics/",status="403"} 1', response.content)
+
+    def test_snapshots_of_all_processes_are_summed(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            with open(os.path.join(directory, 'metrics-1.json'), 'w') as f:
+                f.write('{"counters": [["db_queries_total", [["method", "GET"], ["route", "x"]], 5]], "histograms": []}')
+            metrics.inc('db_queries_total', 2, method='GET', route='x')
+            output = metrics.render()
+        self.assertIn('db_queries_total{method="GET",route="x"} 7', output)
+
+
+QUERY_BUDGETS_PATH = os.path.join(os.path.dirname(__file__), 'query_budgets.json')
+
+# Roles every endpoint is called as
+BUDGET_ROLES = ['Manager', 'Front Desk', 'Technician', 'Accountant']
+
+
+def _api_endpoints():
+    """
+    Every GET endpoint under api/ as (route, url name, view class).
+
+    Format-suffix variants and router root views are left out.
+    """
+    def walk(patterns, prefix, namespace):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                inner = f'{namespace}:{pattern.namespace}' if namespace and pattern.namespace else pattern.namespace or namespace
+                yield from walk(pattern.url_patterns, prefix + str(pattern.pattern), inner)
+            else:
+                yield prefix + str(pattern.pattern), pattern, namespace
+
+    seen = set()
+    for route, pattern, namespace in walk(get_resolver().url_patterns, '', None):
+        view_class = getattr(pattern.callback, 'cls', None)
+        if not route.startswith('api/') or view_class is None or pattern.name == 'api-root':
+            continue
+        if 'format' in pattern.pattern.regex.groupindex or route in seen:
+            continue
+        actions = getattr(pattern.callback, 'actions', None)
+        if 'get' not in actions if actions is not None else not hasattr(view_class, 'get'):
+            continue
+        seen.add(route)
+        name = f'{namespace}:{pattern.name}' if namespace else pattern.name
+        yield route.replace('/^', '/').rstrip('$'), name, view_class, sorted(pattern.pattern.regex.groupindex)
+
+
+class QueryBudgetTests(APITestCase):
+    """
+    Calls every GET API endpoint as every role against a seeded dataset and
+    compares its query count with the budget checked in to query_budgets.json.
+
+    Budgets must hold on SQLite and PostgreSQL. After an intended change,
+    regenerate them with QUERY_BUDGETS_UPDATE=1 and review the diff.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {
+            role: User.objects.create_user(
+                username=role.lower().replace(' ', ''), password='testpassword', email=f"{role.lower().replace(' ', '')}@gmail.com",
+                first_name='test', last_name=role.lower(), role=role,
+            )
+            for role in BUDGET_ROLES
+        }
+        technician = cls.users['Technician']
+        front_desk, accountant = cls.users['Front Desk'], cls.users['Accountant']
+        User.objects.create_user(username='tech2', password='testpassword', email='tech2@gmail.com', first_name='second', last_name='tech', role='Technician')
+
+        main = Location.objects.create(name='Main')
+        workshop = Location.objects.create(name='Workshop', is_workshop=True)
+        brand = Brand.objects.create(name='Dell')
+        model = Model.objects.create(name='XPS', brand=brand)
+        referrer = Referrer.objects.create(name='Referrer')
+        method = PaymentMethod.objects.create(name='Cash')
+        category = PaymentCategory.objects.create(name='Repair')
+        Account.objects.create(name='Till')
+        MessageTemplate.objects.create(name='Ready', content='Your device {task_id} is ready')
+
+        statuses = list(Task.Status.values)
+        now = timezone.now()
+        for i in range(12):
+            customer = Customer.objects.create(name=f'Customer {i}')
+            PhoneNumber.objects.create(customer=customer, phone_number=f'+2557000000{i:02d}')
+            task = Task.objects.create(
+                title=f'A1-{i + 1:03d}', created_by=front_desk, customer=customer, current_location=main if i % 3 else workshop,
+                assigned_to=technician if i % 2 else None, brand=brand, laptop_model=model, status=statuses[i % len(statuses)],
+                estimated_cost=200, referred_by=referrer if i % 4 == 0 else None, is_referred=i % 4 == 0,
+                date_in=now.date() - timedelta(days=i),
+            )
+            TaskActivity.objects.create(task=task, user=front_desk, type=TaskActivity.ActivityType.INTAKE, message='Task created')
+            TaskAssignment.objects.create(task=task, user=technician, assigned_at=now)
+            CostBreakdown.objects.create(task=task, description='Screen', amount=150, cost_type=CostBreakdown.CostType.ADDITIVE)
+            Payment.objects.create(task=task, amount=100, method=method, category=category)
+            MessageLog.objects.create(task=task, recipient_phone=f'+2557000000{i:02d}', message_content='Ready', status='sent', sent_by=front_desk)
+            if i < 3:
+                DebtRequest.objects.create(task=task, task_title=task.title, requester=front_desk)
+        Task.objects.filter(status__in=['Completed', 'Picked Up']).update(first_assigned_at=now - timedelta(hours=30), completed_at=now)
+        TransactionRequest.objects.create(
+            description='Parts', amount=50, category=category, payment_method=method, requester=accountant,
+            transaction_type=TransactionRequest.TransactionType.EXPENDITURE,
+        )
+        SchedulerNotification.objects.create(job_type='pickup_reminder', tasks_found=3, messages_sent=3)
+        SmsCampaign.objects.create(created_by=front_desk, message='Ready', total=1)
+
+    # Models behind detail routes whose serializer does not name one
+    DETAIL_MODELS = {'UnifiedApprovalRequestViewSet': ApprovalRequest, 'bulk_send_status': SmsCampaign}
+
+    def _url(self, name, kwarg_names, view_class):
+        kwargs = {}
+        for kwarg in kwarg_names:
+            if kwarg == 'task_id':
+                task = Task.objects.order_by('pk').first()
+                kwargs[kwarg] = task.title if view_class.__name__ == 'TaskViewSet' else task.pk
+            elif kwarg == 'role':
+                kwargs[kwarg] = 'Technician'
+            elif kwarg == 'pk':
+                model = self.DETAIL_MODELS.get(view_class.__name__)
+                if model is None:
+                    queryset = getattr(view_class, 'queryset', None)
+                    model = queryset.model if queryset is not None else view_class.serializer_class.Meta.model
+                kwargs[kwarg] = model.objects.order_by('pk').values_list('pk', flat=True).first()
+        return reverse(name, kwargs=kwargs)
+
+    def _measure(self):
+        self.client.raise_request_exception = False
+        results = {}
+        for route, name, view_class, kwarg_names in _api_endpoints():
+            url = self._url(name, kwarg_names, view_class)
+            for role in BUDGET_ROLES:
+                self.client.force_authenticate(user=self.users[role])
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                results[(route, role)] = (url, response.status_code, [query['sql'] for query in queries.captured_queries])
+        return results
+
+    def test_endpoints_stay_within_query_budgets(self):
+        results = self._measure()
+
+        if os.environ.get('QUERY_BUDGETS_UPDATE'):
+            budgets = {}
+            for (route, role), (url, status, queries) in sorted(results.items()):
+                budgets.setdefault(route, {})[role] = len(queries)
+            with open(QUERY_BUDGETS_PATH, 'w') as f:
+                json.dump(budgets, f, indent=2, sort_keys=True)
+                f.write('\n')
+            return
+
+        with open(QUERY_BUDGETS_PATH) as f:
+            budgets = json.load(f)
+        report = []
+        for (route, role), (url, status, queries) in sorted(results.items()):
+            budget = budgets.get(route, {}).get(role)
+            if budget is not None and len(queries) <= budget and status < 500:
+                continue
+            limit = 'no budget' if budget is None else f'budget {budget}'
+            report.append(f'GET {url} as {role} (HTTP {status}): {len(queries)} queries, {limit}')
+            report.extend(f'    {i}. {sql}' for i, sql in enumerate(queries, 1))
+        if report:
+            self.fail('Endpoints failing or over their query budget:\n' + '\n'.join(report))
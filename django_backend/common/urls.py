@@ -9,4 +9,5 @@ router.register(r'models', views.ModelViewSet, basename='model')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
 ]
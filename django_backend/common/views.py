@@ -6,6 +6,10 @@ from rest_framework.response import Response
 
 
 from rest_framework.decorators import action
+from rest_framework.views import APIView
+from django.http import HttpResponse
+
+from . import metrics
 
 class LocationViewSet(viewsets.ModelViewSet):
     """
@@ -87,4 +91,14 @@ class ModelViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ['name', 'brand__name']
-    filterset_fields = ['brand']
\ No newline at end of file
+    filterset_fields = ['brand']
+
+
+class MetricsView(APIView):
+    """
+    Request metrics of all worker processes in Prometheus text format.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,23 @@
+from django.db.models import Exists, OuterRef
+from rest_framework import filters
+from .models import PhoneNumber
+
+
+class PhoneAwareSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter that matches full phone numbers through the blind index.
+
+    Phone numbers are stored encrypted, so they cannot be matched with
+    icontains. When the search term looks like a phone number it is normalized,
+    hashed and matched exactly against PhoneNumber.phone_hash; any other term
+    falls through to the view's regular search_fields.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '')
+        phone_hash = PhoneNumber.lookup_hash(term)
+        if phone_hash:
+            return queryset.filter(
+                Exists(PhoneNumber.objects.filter(customer=OuterRef('pk'), phone_hash=phone_hash))
+            )
+        return super().filter_queryset(request, queryset, view)
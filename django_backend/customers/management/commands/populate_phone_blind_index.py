@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from common.encryption import decrypt_many, is_encrypted, is_locally_encrypted, phone_blind_index
+from customers.models import PhoneNumber
+
+
+class Command(BaseCommand):
+    help = 'Populates the phone_hash blind index for phone numbers in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of phone numbers to process per batch (default: 500)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every row, e.g. after changing BLIND_INDEX_KEY (default: only rows without a hash)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = PhoneNumber.objects.order_by('pk')
+        if not options['all']:
+            queryset = queryset.filter(phone_hash__isnull=True)
+
+        total = queryset.count()
+        self.stdout.write(f"Found {total} phone numbers to index...")
+
+        # Walk by primary key so each batch is an index range scan, not an OFFSET
+        last_pk = 0
+        processed = 0
+        skipped = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+
+            plaintexts = decrypt_many(phone.phone_number for phone in batch)
+            for phone, plaintext in zip(batch, plaintexts):
+                # Undecryptable values come back unchanged; never index the ciphertext
+                if is_encrypted(plaintext) or is_locally_encrypted(plaintext):
+                    skipped += 1
+                else:
+                    phone.phone_hash = phone_blind_index(plaintext)
+
+            with transaction.atomic():
+                PhoneNumber.objects.bulk_update(batch, ['phone_hash'])
+
+            last_pk = batch[-1].pk
+            processed += len(batch)
+            self.stdout.write(f"  {processed}/{total} indexed")
+
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"{skipped} phone numbers could not be decrypted and were left unchanged."))
+        self.stdout.write(self.style.SUCCESS(f"Successfully indexed {processed - skipped} phone numbers."))
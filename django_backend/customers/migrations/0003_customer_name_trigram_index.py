@@ -0,0 +1,39 @@
+"""
+Trigram GIN index on customer name for type-ahead task search.
+
+The index is built on UPPER(name::text), the expression Django emits for
+icontains on PostgreSQL. Skipped when not on PostgreSQL or when pg_trgm is
+not installed.
+"""
+from django.db import migrations, connection
+
+
+def create_trigram_index(apps, schema_editor):
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm';")
+        if not cursor.fetchone():
+            return
+        cursor.execute(
+            'CREATE INDEX IF NOT EXISTS idx_customer_name_trgm '
+            'ON "customers_customer" USING gin (UPPER("name"::text) gin_trgm_ops);'
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX IF EXISTS idx_customer_name_trgm;')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_expand_phone_fields'),
+        ('common', '0005_enable_pg_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
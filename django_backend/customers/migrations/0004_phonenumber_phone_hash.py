@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:26
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def populate_phone_blind_index(apps, schema_editor):
+    """Hash existing phone numbers with the blind index key. Equivalent to `populate_phone_blind_index`."""
+    from common.encryption import decrypt_many, is_encrypted, is_locally_encrypted, phone_blind_index
+
+    PhoneNumber = apps.get_model('customers', 'PhoneNumber')
+    last_pk = 0
+    while True:
+        batch = list(PhoneNumber.objects.filter(pk__gt=last_pk).order_by('pk')[:BATCH_SIZE])
+        if not batch:
+            break
+        plaintexts = decrypt_many(phone.phone_number for phone in batch)
+        for phone, plaintext in zip(batch, plaintexts):
+            # Undecryptable values come back unchanged; leave them unindexed rather than hash the ciphertext
+            if not (is_encrypted(plaintext) or is_locally_encrypted(plaintext)):
+                phone.phone_hash = phone_blind_index(plaintext)
+        PhoneNumber.objects.bulk_update(batch, ['phone_hash'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_customer_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='phonenumber',
+            name='phone_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.RunPython(populate_phone_blind_index, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
+import re
 from django.db import models
+from common.encryption import phone_blind_index
 from django.utils.translation import gettext_lazy as _
 
 class Customer(models.Model):
@@ -24,10 +26,25 @@ class Customer(models.Model):
 class PhoneNumber(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='phone_numbers')
     phone_number = models.CharField(max_length=500, unique=True)  # Longer for encrypted values
+    # HMAC of the normalized E.164 number; lets us look numbers up without decrypting
+    phone_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True)
 
     def __str__(self):
         return self.phone_number
 
+    # Search terms made only of digits and phone punctuation are treated as numbers
+    _PHONE_TERM = re.compile(r'^\+?[\d\s()-]{9,}$')
+
+    @classmethod
+    def lookup_hash(cls, term):
+        """
+        Return the blind index to search for when `term` looks like a full
+        phone number, otherwise None.
+        """
+        if not term or not cls._PHONE_TERM.match(term.strip()):
+            return None
+        return phone_blind_index(term)
+
 class Referrer(models.Model):
     name = models.CharField(max_length=100, unique=True)
     phone = models.CharField(max_length=500, blank=True, null=True)  # Longer for encrypted values
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import Customer, PhoneNumber, Referrer
 from django.db import transaction
-from common.encryption import encrypt_value, decrypt_value, is_encrypted
+from common.encryption import encrypt_value, decrypt_value, is_encrypted, phone_blind_index
 
 
 class PhoneNumberSerializer(serializers.ModelSerializer):
@@ -38,12 +38,14 @@ class PhoneNumberWriteSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Encrypt phone number before saving
         if 'phone_number' in validated_data and validated_data['phone_number']:
+            validated_data['phone_hash'] = phone_blind_index(validated_data['phone_number'])
             validated_data['phone_number'] = encrypt_value(validated_data['phone_number'])
         return super().create(validated_data)
     
     def update(self, instance, validated_data):
         # Encrypt phone number before saving
         if 'phone_number' in validated_data and validated_data['phone_number']:
+            validated_data['phone_hash'] = phone_blind_index(validated_data['phone_number'])
             validated_data['phone_number'] = encrypt_value(validated_data['phone_number'])
         return super().update(instance, validated_data)
 
@@ -66,7 +68,7 @@ class CustomerSerializer(serializers.ModelSerializer):
         for phone_number_data in phone_numbers_data:
             phone = phone_number_data.get('phone_number', '')
             if phone:
-                existing = PhoneNumber.objects.filter(phone_number=phone).select_related('customer').first()
+                existing = PhoneNumber.objects.filter(phone_hash=phone_blind_index(phone)).select_related('customer').first()
                 if existing:
                     raise serializers.ValidationError({
                         'phone_number_duplicate': {
@@ -79,9 +81,10 @@ class CustomerSerializer(serializers.ModelSerializer):
         for phone_number_data in phone_numbers_data:
             # Encrypt phone number before saving
             phone = phone_number_data.get('phone_number', '')
+            phone_hash = phone_blind_index(phone)
             if phone:
                 phone = encrypt_value(phone)
-            PhoneNumber.objects.create(customer=customer, phone_number=phone)
+            PhoneNumber.objects.create(customer=customer, phone_number=phone, phone_hash=phone_hash)
         return customer
 
     def update(self, instance, validated_data):
@@ -102,8 +105,9 @@ class CustomerSerializer(serializers.ModelSerializer):
                 else:
                     # Check if this new phone number already belongs to another customer
                     phone = pn_data.get('phone_number', '')
+                    phone_hash = phone_blind_index(phone)
                     if phone:
-                        existing = PhoneNumber.objects.filter(phone_number=phone).exclude(customer=instance).select_related('customer').first()
+                        existing = PhoneNumber.objects.filter(phone_hash=phone_hash).exclude(customer=instance).select_related('customer').first()
                         if existing:
                             raise serializers.ValidationError({
                                 'phone_number_duplicate': {
@@ -112,7 +116,7 @@ class CustomerSerializer(serializers.ModelSerializer):
                                 }
                             })
                         phone = encrypt_value(phone)
-                    new_phone_numbers.append(PhoneNumber(customer=instance, phone_number=phone))
+                    new_phone_numbers.append(PhoneNumber(customer=instance, phone_number=phone, phone_hash=phone_hash))
 
             # Collect IDs of existing phone numbers to keep
             phone_ids_to_keep = [pn['id'] for pn in existing_phone_numbers_data if 'id' in pn]
@@ -129,9 +133,10 @@ class CustomerSerializer(serializers.ModelSerializer):
                 for pn_data in existing_phone_numbers_data:
                     pn = PhoneNumber.objects.get(id=pn_data['id'], customer=instance)
                     if 'phone_number' in pn_data:
+                        pn.phone_hash = phone_blind_index(pn_data['phone_number'])
                         pn.phone_number = encrypt_value(pn_data['phone_number'])
                     pns_to_update.append(pn)
-                PhoneNumber.objects.bulk_update(pns_to_update, ['phone_number'])
+                PhoneNumber.objects.bulk_update(pns_to_update, ['phone_number', 'phone_hash'])
             
             # Delete phone numbers that are not in the payload (excluding newly created ones)
             all_ids_to_keep = phone_ids_to_keep + created_phone_ids
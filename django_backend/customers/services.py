@@ -5,7 +5,9 @@ Handles customer-related operations during task creation and updates,
 including customer creation, retrieval, and phone number management.
 """
 from django.db import transaction
-from .models import Customer
+from django.db.models import Prefetch
+from common.encryption import decrypt_many
+from .models import Customer, PhoneNumber
 from .serializers import CustomerSerializer
 
 
@@ -88,3 +90,44 @@ class CustomerHandler:
         )
         customer_serializer.is_valid(raise_exception=True)
         return customer_serializer.save()
+
+    @staticmethod
+    def phone_numbers_prefetch(lookup='phone_numbers'):
+        """
+        Prefetch for a customer's phone numbers in primary-first order.
+
+        Args:
+            lookup (str): Path to the phone numbers relation, e.g. 'customer__phone_numbers'
+
+        Returns:
+            Prefetch: Use with prefetch_related() before calling primary_phones()
+        """
+        return Prefetch(lookup, queryset=PhoneNumber.objects.order_by('pk'))
+
+    @staticmethod
+    def primary_phones(customers):
+        """
+        Decrypt the primary (first) phone number of many customers at once.
+
+        Phone numbers should be prefetched with phone_numbers_prefetch(); all
+        values are then decrypted in a single batch.
+
+        Args:
+            customers: Iterable of Customer instances (None entries are ignored)
+
+        Returns:
+            dict: customer id -> decrypted phone number, for customers that have one
+        """
+        encrypted = {}
+        for customer in customers:
+            if customer is None or customer.pk in encrypted:
+                continue
+            phones = list(customer.phone_numbers.all())
+            if phones and phones[0].phone_number:
+                encrypted[customer.pk] = phones[0].phone_number
+
+        decrypted = decrypt_many(encrypted.values())
+        return {
+            customer_id: plain or cipher
+            for (customer_id, cipher), plain in zip(encrypted.items(), decrypted)
+        }
@@ -1,9 +1,14 @@
+import os
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from customers.models import Customer, PhoneNumber
 from Eapp.models import User
+from common.encryption import get_blind_index_key, phone_blind_index
 
 class CustomerAPITests(APITestCase):
     def setUp(self):
@@ -23,4 +28,38 @@ class CustomerAPITests(APITestCase):
         url = reverse('customer-search')
         response = self.client.get(url, {'query': 'Test'}, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
\ No newline at end of file
+        self.assertEqual(len(response.data), 2)
+
+class PhoneBlindIndexTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='frontdesk', password='testpassword', email='fd@gmail.com', first_name='front', last_name='desk', role='Front Desk')
+        self.client.force_authenticate(user=self.user)
+        self.client.post('/api/customers/', {'name': 'Juma Hassan', 'phone_numbers_write': [{'phone_number': '0712 345 678'}]}, format='json')
+
+    def test_duplicate_phone_is_detected_in_any_format(self):
+        response = self.client.post('/api/customers/', {'name': 'Someone Else', 'phone_numbers_write': [{'phone_number': '+255712345678'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['phone_number_duplicate']['customer_name'], 'Juma Hassan')
+
+    def test_search_by_phone_uses_blind_index(self):
+        response = self.client.get('/api/customers/', {'search': '255-712-345-678'})
+        self.assertEqual([c['name'] for c in response.data['results']], ['Juma Hassan'])
+
+    def test_populate_command_fills_missing_hashes(self):
+        PhoneNumber.objects.update(phone_hash=None)
+        call_command('populate_phone_blind_index', batch_size=1, stdout=StringIO())
+        self.assertEqual(PhoneNumber.objects.get().phone_hash, phone_blind_index('0712345678'))
+
+    def test_populate_command_skips_undecryptable_numbers(self):
+        customer = Customer.objects.get(name='Juma Hassan')
+        unreadable = PhoneNumber.objects.create(customer=customer, phone_number='v1:00000000:bm90LWEtcmVhbC12YWx1ZQ==', phone_hash='previous')
+        call_command('populate_phone_blind_index', '--all', stdout=StringIO())
+        unreadable.refresh_from_db()
+        self.assertEqual(unreadable.phone_hash, 'previous')
+
+    def test_index_key_is_not_the_encryption_key(self):
+        with mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_KEY': 'current-key', 'BLIND_INDEX_KEY': ''}):
+            derived = get_blind_index_key()
+            self.assertNotEqual(derived, b'current-key')
+        with mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_KEY': 'current-key', 'BLIND_INDEX_KEY': 'index-key'}):
+            self.assertEqual(get_blind_index_key(), b'index-key')
@@ -1,6 +1,7 @@
 from django.db.models import Count, Exists, OuterRef
-from rest_framework import viewsets, permissions, filters
-from .models import Customer, Referrer
+from rest_framework import viewsets, permissions
+from .models import Customer, PhoneNumber, Referrer
+from .filters import PhoneAwareSearchFilter
 from .serializers import CustomerSerializer, ReferrerSerializer
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -11,8 +12,8 @@ class CustomerViewSet(viewsets.ModelViewSet):
     serializer_class = CustomerSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'phone_numbers__phone_number']
+    filter_backends = [PhoneAwareSearchFilter]
+    search_fields = ['name']
 
     def get_queryset(self):
         debt_subquery = Task.objects.filter(customer=OuterRef('pk'), is_debt=True)
@@ -141,10 +142,13 @@ class CustomerViewSet(viewsets.ModelViewSet):
         
         # Apply search filter
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(phone_numbers__phone_number__icontains=search)
-            ).distinct()
+            phone_hash = PhoneNumber.lookup_hash(search)
+            if phone_hash:
+                queryset = queryset.filter(
+                    Exists(PhoneNumber.objects.filter(customer=OuterRef('pk'), phone_hash=phone_hash))
+                )
+            else:
+                queryset = queryset.filter(name__icontains=search)
         
         # Paginate
         page = self.paginate_queryset(queryset)
@@ -157,16 +161,21 @@ class CustomerViewSet(viewsets.ModelViewSet):
     
     def _serialize_customers_with_tasks(self, customers, broadcast_mode=False):
         """Serialize customers with their filtered tasks for messaging."""
-        from common.encryption import decrypt_value
+        from common.encryption import decrypt_many
         from Eapp.models import Task
         
+        # Decrypt every phone number on the page in one batch
+        customers = list(customers)
+        encrypted = [pn.phone_number for customer in customers for pn in customer.phone_numbers.all()]
+        decrypted = dict(zip(encrypted, decrypt_many(encrypted)))
+        
         result = []
         for customer in customers:
             phone_numbers = []
             for pn in customer.phone_numbers.all():
-                decrypted = decrypt_value(pn.phone_number) if pn.phone_number else ''
-                if decrypted:
-                    phone_numbers.append(decrypted)
+                plain = decrypted.get(pn.phone_number) if pn.phone_number else ''
+                if plain:
+                    phone_numbers.append(plain)
             
             # Get tasks: either pre-filtered or fetch most recent for broadcast
             if broadcast_mode:
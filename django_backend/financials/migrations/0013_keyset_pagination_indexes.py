@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0019_keyset_pagination_indexes'),
+        ('financials', '0012_remove_costbreakdown_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['date', 'id'], name='idx_payment_date_keyset'),
+        ),
+    ]
@@ -60,6 +60,10 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ['-date']
+        indexes = [
+            # Keyset pagination on (date, id)
+            models.Index(fields=['date', 'id'], name='idx_payment_date_keyset'),
+        ]
 
 
 
@@ -1,6 +1,7 @@
 from rest_framework.pagination import PageNumberPagination
+from Eapp.pagination import KeysetOptInMixin
 
-class CustomPagination(PageNumberPagination):
+class CustomPagination(KeysetOptInMixin, PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
\ No newline at end of file
@@ -4,9 +4,12 @@ from django.db.models import Sum, Q
 from decimal import Decimal
 from .models import Payment, CostBreakdown, Account
 from Eapp.models import Task
+from common.stats import invalidate as invalidate_stats
 
 @receiver([post_save, post_delete], sender=Payment)
 def update_task_on_payment_change(sender, instance, **kwargs):
+    # Revenue tiles read payments; balance and payment-status tiles read tasks
+    invalidate_stats('payments', 'tasks')
     try:
         if instance.task:
             task = instance.task
@@ -31,6 +34,7 @@ def update_task_on_payment_change(sender, instance, **kwargs):
 
 @receiver([post_save, post_delete], sender=CostBreakdown)
 def update_task_on_cost_breakdown_change(sender, instance, **kwargs):
+    invalidate_stats('tasks')
     try:
         if instance.task:
             task = instance.task
@@ -109,6 +109,7 @@ class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
         IsAdminOrManagerOrFrontDeskOrAccountant,
     ]
     pagination_class = CustomPagination
+    keyset_ordering = ("-date", "-id")
 
     def get_queryset(self):
         queryset = Payment.objects.select_related("task", "method", "category").all()
@@ -149,7 +150,7 @@ class CostBreakdownViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsAdminOrManagerOrAccountant]
 
     def get_queryset(self):
-        queryset = CostBreakdown.objects.all()
+        queryset = CostBreakdown.objects.select_related("task")
         task_id = self.kwargs.get("task_id")
         if task_id:
             queryset = queryset.filter(task__title=task_id)
@@ -667,40 +668,29 @@ class FinancialSummaryView(APIView):
 # Accountant Dashboard Stats
 # =============================================================================
 
-from django.db.models import F
+from django.db.models import Count, F
+from common.stats import StatsContext, StatsDashboard
+
+accountant_dashboard_stats = StatsDashboard('accountant', sources={
+    'payments': lambda ctx: Payment.objects.filter(date=ctx.today),
+    'tasks': lambda ctx: Task.objects.all(),
+})
+
+# 1. Today's Revenue (Sum of payments made today)
+accountant_dashboard_stats.add_tile('todays_revenue', 'payments', Sum('amount'), transform=float)
+# 2. Outstanding Payments (Sum of outstanding balance for all tasks)
+accountant_dashboard_stats.add_tile(
+    'outstanding_payments_total', 'tasks', Sum(F('total_cost') - F('paid_amount')), transform=float
+)
+# 3. Tasks Pending Payment (Count of tasks with payment status 'Unpaid' or 'Partially Paid')
+accountant_dashboard_stats.add_tile(
+    'pending_payment_count', 'tasks', Count('id', filter=Q(payment_status__in=['Unpaid', 'Partially Paid']))
+)
 
 
 class AccountantDashboardStats(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        today = timezone.now().date()
-        
-        # 1. Today's Revenue (Sum of payments made today)
-        todays_revenue = (
-            Payment.objects.filter(
-                date=today
-            ).aggregate(total=Sum("amount"))["total"]
-            or 0
-        )
-        
-        # 2. Outstanding Payments (Sum of outstanding balance for all tasks)
-        outstanding_payments_total = (
-            Task.objects.aggregate(
-                total=Sum(F("total_cost") - F("paid_amount"))
-            )["total"] 
-            or 0
-        )
-
-        # 3. Tasks Pending Payment (Count of tasks with payment status 'Unpaid' or 'Partially Paid')
-        pending_payment_count = Task.objects.filter(
-            payment_status__in=['Unpaid', 'Partially Paid']
-        ).count()
-
-        data = {
-            "todays_revenue": float(todays_revenue),
-            "outstanding_payments_total": float(outstanding_payments_total),
-            "pending_payment_count": pending_payment_count,
-        }
-        return Response(data)
+        return Response(accountant_dashboard_stats.compute_cached(StatsContext(user=request.user)))
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import MessageLog
+from .models import MessageLog, SmsCampaign
 
 
 @admin.register(MessageLog)
@@ -9,3 +9,11 @@ class MessageLogAdmin(admin.ModelAdmin):
     search_fields = ['recipient_phone', 'message_content', 'task__title']
     readonly_fields = ['sent_at']
     ordering = ['-sent_at']
+
+
+@admin.register(SmsCampaign)
+class SmsCampaignAdmin(admin.ModelAdmin):
+    list_display = ['id', 'created_by', 'status', 'total', 'sent', 'failed', 'api_calls', 'created_at']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['recipients', 'errors', 'created_at', 'updated_at', 'started_at', 'finished_at']
+    ordering = ['-created_at']
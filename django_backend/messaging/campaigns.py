@@ -0,0 +1,381 @@
+"""
+Bulk SMS campaigns.
+
+The bulk-send endpoint only records an SmsCampaign and returns its ID. The
+outbox worker (process_sms_outbox) claims queued campaigns and runs them:
+
+1. Every recipient's message is rendered and one pending MessageLog row per
+   recipient is written with a single bulk_create.
+2. Recipients whose rendered message is identical are grouped into
+   multi-recipient gateway calls of up to BRIQ_MAX_RECIPIENTS numbers, sent
+   in parallel on the worker's thread pool.
+3. Outcomes are written back in batches (bulk_update of the logs,
+   bulk_create of the sms_sent activities, one counter update) and each
+   batch is pushed to the campaign's creator over the notifications
+   WebSocket as an sms_campaign_progress message.
+
+A campaign whose worker stops is reclaimed once it has not made progress for
+SMS_OUTBOX_LEASE_SECONDS; only its still-pending messages are sent again.
+After SMS_CAMPAIGN_MAX_ATTEMPTS runs that raised or stalled it is marked
+failed, and its creator is told it is done.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from common.stats import invalidate as invalidate_stats
+from messaging.models import MessageLog, SmsCampaign
+from messaging.sms_client import briq_client
+
+logger = logging.getLogger(__name__)
+
+# Errors kept on a campaign; the counters still cover every failure
+MAX_STORED_ERRORS = 200
+
+# Progress is written and broadcast at most this often (seconds)
+PROGRESS_INTERVAL = 0.5
+
+STATUS_LABELS = {
+    'Pending': 'Imepokelewa',
+    'In Progress': 'Inashughulikiwa',
+    'Ready for Pickup': 'Ipo Tayari',
+    'Picked Up': 'Imeshachukuliwa',
+    'Completed': 'Imekamilika',
+}
+
+
+def bulk_message_context():
+    """Company values shared by every message of a bulk send."""
+    from settings.models import SystemSettings
+
+    system_settings = SystemSettings.get_settings()
+    company_phones = system_settings.company_phone_numbers or []
+    return {
+        'company_name': system_settings.company_name or 'A PLUS EXPRESS TECHNOLOGIES LTD',
+        'contact_info': f" Wasiliana nasi: {', '.join(company_phones)}." if company_phones else '',
+        'storage_fee': f'{system_settings.storage_fee_per_day:,}',
+        'pickup_deadline_days': str(system_settings.pickup_deadline_days),
+    }
+
+
+def render_bulk_message(task, base_message, template_key, context):
+    """Fill in a bulk message's placeholders for one task."""
+    from messaging.templates import TEMPLATE_READY_NOT_SOLVED, TEMPLATE_READY_SOLVED
+
+    final_message = base_message
+
+    if template_key == 'ready_for_pickup':
+        if task.workshop_status == 'Solved':
+            final_message = TEMPLATE_READY_SOLVED
+        elif task.workshop_status == 'Not Solved':
+            final_message = TEMPLATE_READY_NOT_SOLVED
+
+    final_message = final_message.replace('{customer}', task.customer.name)
+    final_message = final_message.replace('{device}', f"{task.brand or ''} {task.laptop_model or ''}".strip() or "Device")
+    final_message = final_message.replace('{taskId}', task.title)
+
+    description = task.description or "Unknown Issue"
+    final_message = final_message.replace('{DESCRIPTION}', description.upper())
+    final_message = final_message.replace('{description}', description)
+    final_message = final_message.replace('{notes}', task.device_notes or '')
+    final_message = final_message.replace('{status}', STATUS_LABELS.get(task.status, task.status))
+
+    amount_val = str(task.total_cost)
+    if task.total_cost:
+        amount_val = "{:,.0f}".format(task.total_cost)
+    final_message = final_message.replace('{amount}', amount_val)
+
+    outstanding = task.total_cost - task.paid_amount
+    outstanding_str = "{:,.0f}".format(outstanding) if outstanding > 0 else "0"
+    final_message = final_message.replace('{outstanding_balance}', outstanding_str)
+
+    final_message = final_message.replace('{company_name}', context['company_name'])
+    final_message = final_message.replace('{contact_info}', context['contact_info'])
+    final_message = final_message.replace('{storage_fee}', context['storage_fee'])
+    final_message = final_message.replace('{pickup_deadline_days}', context['pickup_deadline_days'])
+
+    return final_message
+
+
+class SmsCampaignRunner:
+    """Creates and runs bulk SMS campaigns."""
+
+    @staticmethod
+    def create(user, recipients, message, template_key=''):
+        """
+        Record a campaign for the background worker.
+
+        Without an outbox worker (SMS_OUTBOX_ENABLED off) the campaign runs in
+        a background thread of this process once the transaction commits.
+
+        Returns:
+            SmsCampaign: The queued campaign
+        """
+        campaign = SmsCampaign.objects.create(
+            created_by=user,
+            message=message,
+            template_key=template_key or '',
+            recipients=[{'task_id': str(r.get('task_id')), 'phone': r.get('phone') or ''} for r in recipients],
+            total=len(recipients),
+        )
+        if not getattr(settings, 'SMS_OUTBOX_ENABLED', True):
+            transaction.on_commit(
+                lambda: threading.Thread(target=SmsCampaignRunner._run_detached, args=(campaign.pk,), daemon=True).start()
+            )
+        return campaign
+
+    @staticmethod
+    def _run_detached(campaign_id):
+        campaign = None
+        try:
+            campaign = SmsCampaignRunner.claim(campaign_id)
+            if campaign:
+                with ThreadPoolExecutor(max_workers=getattr(settings, 'SMS_OUTBOX_WORKERS', 4)) as executor:
+                    SmsCampaignRunner.run(campaign, executor)
+        except Exception as e:
+            logger.exception(f"SMS campaign {campaign_id} failed")
+            if campaign:
+                SmsCampaignRunner.record_failure(campaign, e)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def claim(campaign_id=None):
+        """
+        Claim the oldest queued campaign, or a running one that has stalled.
+
+        A stalled campaign that has used up its SMS_CAMPAIGN_MAX_ATTEMPTS runs is
+        marked failed instead of being claimed.
+
+        Returns:
+            SmsCampaign or None
+        """
+        now = timezone.now()
+        stalled = now - timedelta(seconds=getattr(settings, 'SMS_OUTBOX_LEASE_SECONDS', 120))
+        max_attempts = getattr(settings, 'SMS_CAMPAIGN_MAX_ATTEMPTS', 3)
+        abandoned = None
+        with transaction.atomic():
+            campaigns = SmsCampaign.objects.filter(
+                Q(status='queued') | Q(status='running', updated_at__lt=stalled)
+            ).order_by('created_at')
+            if campaign_id is not None:
+                campaigns = campaigns.filter(pk=campaign_id)
+            if connection.features.has_select_for_update_skip_locked:
+                campaigns = campaigns.select_for_update(skip_locked=True)
+            campaign = campaigns.first()
+            if campaign and campaign.attempts >= max_attempts:
+                abandoned, campaign = campaign, None
+                SmsCampaignRunner._mark_failed(abandoned, f"Stopped after {abandoned.attempts} attempts")
+            elif campaign:
+                campaign.status = 'running'
+                campaign.started_at = campaign.started_at or now
+                campaign.attempts += 1
+                campaign.save(update_fields=['status', 'started_at', 'attempts', 'updated_at'])
+        if abandoned:
+            SmsCampaignRunner.broadcast_progress(abandoned)
+        return campaign
+
+    @staticmethod
+    def record_failure(campaign, error):
+        """
+        Handle a run of ``campaign`` that raised.
+
+        The campaign is marked failed once it has used up its
+        SMS_CAMPAIGN_MAX_ATTEMPTS runs; before that it stays 'running' and is
+        claimed again once it has stalled for a lease period.
+        """
+        campaign.refresh_from_db()
+        if campaign.status != 'running' or campaign.attempts < getattr(settings, 'SMS_CAMPAIGN_MAX_ATTEMPTS', 3):
+            return
+        SmsCampaignRunner._mark_failed(campaign, f"Stopped after {campaign.attempts} attempts: {error}")
+        SmsCampaignRunner.broadcast_progress(campaign)
+
+    @staticmethod
+    def _mark_failed(campaign, reason):
+        campaign.status = 'failed'
+        campaign.finished_at = timezone.now()
+        campaign.errors = (campaign.errors + [reason])[-MAX_STORED_ERRORS:]
+        campaign.save(update_fields=['status', 'finished_at', 'errors', 'updated_at'])
+        logger.error(f"SMS campaign {campaign.pk} failed: {reason}")
+
+    @staticmethod
+    def _prepare(campaign):
+        """Render every recipient's message and write the pending logs in one insert."""
+        from Eapp.models import Task
+
+        task_ids = set()
+        for recipient in campaign.recipients:
+            try:
+                task_ids.add(int(recipient['task_id']))
+            except (TypeError, ValueError):
+                pass
+        task_map = Task.objects.select_related('customer', 'brand', 'laptop_model').in_bulk(task_ids)
+        context = bulk_message_context()
+
+        logs = []
+        errors = []
+        for recipient in campaign.recipients:
+            task_id, phone_number = recipient['task_id'], recipient['phone']
+            task = task_map.get(int(task_id)) if str(task_id).isdigit() else None
+            if not task:
+                errors.append(f"Task {task_id} not found")
+                continue
+            if not phone_number:
+                errors.append(f"Task {task_id}: No phone number provided")
+                continue
+            logs.append(MessageLog(
+                task=task,
+                recipient_phone=phone_number,
+                message_content=render_bulk_message(task, campaign.message, campaign.template_key, context),
+                status='pending',
+                sent_by=campaign.created_by,
+                activity_message="Bulk SMS sent",
+                campaign=campaign,
+            ))
+
+        MessageLog.objects.bulk_create(logs, batch_size=1000)
+        campaign.failed = len(errors)
+        campaign.errors = errors[:MAX_STORED_ERRORS]
+        campaign.save(update_fields=['failed', 'errors', 'updated_at'])
+
+    @staticmethod
+    def _chunks(campaign):
+        """Pending messages grouped by identical content, split into multi-recipient calls."""
+        size = getattr(settings, 'BRIQ_MAX_RECIPIENTS', 100)
+        groups = defaultdict(list)
+        pending = campaign.messages.filter(status='pending').only(
+            'id', 'task_id', 'recipient_phone', 'message_content', 'sent_by_id', 'activity_message'
+        ).order_by('id')
+        for log in pending:
+            groups[log.message_content].append(log)
+        return [
+            (content, logs[i:i + size])
+            for content, logs in groups.items()
+            for i in range(0, len(logs), size)
+        ]
+
+    @staticmethod
+    def run(campaign, executor):
+        """
+        Send a claimed campaign's pending messages on ``executor`` and record the outcomes.
+
+        Returns:
+            SmsCampaign: The finished campaign
+        """
+        from Eapp.models import TaskActivity
+
+        if not campaign.messages.exists():
+            SmsCampaignRunner._prepare(campaign)
+
+        chunks = SmsCampaignRunner._chunks(campaign)
+        futures = {
+            executor.submit(briq_client.send_sms, content, [log.recipient_phone for log in logs]): logs
+            for content, logs in chunks
+        }
+
+        done_logs, activities, errors = [], [], []
+        counts = {'sent': 0, 'failed': 0, 'api_calls': 0}
+        last_flush = time.monotonic()
+
+        def flush():
+            nonlocal last_flush
+            MessageLog.objects.bulk_update(done_logs, ['status', 'response_data', 'sent_at', 'attempts'], batch_size=500)
+            TaskActivity.objects.bulk_create(activities, batch_size=500)
+            SmsCampaign.objects.filter(pk=campaign.pk).update(
+                sent=F('sent') + counts['sent'],
+                failed=F('failed') + counts['failed'],
+                api_calls=F('api_calls') + counts['api_calls'],
+                updated_at=timezone.now(),
+            )
+            if errors:
+                campaign.refresh_from_db(fields=['errors'])
+                campaign.errors = (campaign.errors + errors)[:MAX_STORED_ERRORS]
+                campaign.save(update_fields=['errors'])
+            done_logs.clear()
+            activities.clear()
+            errors.clear()
+            for key in counts:
+                counts[key] = 0
+            last_flush = time.monotonic()
+            campaign.refresh_from_db()
+            SmsCampaignRunner.broadcast_progress(campaign)
+
+        for future in as_completed(futures):
+            logs = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # send_sms reports errors itself; this is a bug guard
+                result = {'success': False, 'error': f'Unexpected error: {e}'}
+            now = timezone.now()
+            success = result.get('success')
+            for log in logs:
+                log.status = 'sent' if success else 'failed'
+                log.response_data = result.get('data') if success else result
+                log.sent_at = now
+                log.attempts += 1
+                if success:
+                    activities.append(TaskActivity(
+                        task_id=log.task_id, user_id=log.sent_by_id, type='sms_sent', message=log.activity_message
+                    ))
+                else:
+                    errors.append(f"Task {log.task_id}: {result.get('error')}")
+            done_logs.extend(logs)
+            counts['sent' if success else 'failed'] += len(logs)
+            counts['api_calls'] += 1
+            if time.monotonic() - last_flush >= PROGRESS_INTERVAL:
+                flush()
+        flush()
+
+        campaign.status = 'completed'
+        campaign.finished_at = timezone.now()
+        campaign.save(update_fields=['status', 'finished_at', 'updated_at'])
+        invalidate_stats('messages')
+        SmsCampaignRunner.broadcast_progress(campaign)
+        logger.info(
+            f"SMS campaign {campaign.pk}: {campaign.sent} sent, {campaign.failed} failed "
+            f"in {campaign.api_calls} API calls"
+        )
+        return campaign
+
+    @staticmethod
+    def process_next(executor):
+        """
+        Claim and run one campaign on ``executor``.
+
+        Returns:
+            bool: True if a campaign was run
+        """
+        campaign = SmsCampaignRunner.claim()
+        if campaign is None:
+            return False
+        try:
+            SmsCampaignRunner.run(campaign, executor)
+        except Exception as e:
+            logger.exception(f"SMS campaign {campaign.pk} failed")
+            SmsCampaignRunner.record_failure(campaign, e)
+        return True
+
+    @staticmethod
+    def broadcast_progress(campaign):
+        """Push the campaign's counters to its creator's notification socket."""
+        from notifications.utils import send_to_user_group
+
+        if not campaign.created_by_id:
+            return
+        send_to_user_group(campaign.created_by_id, 'sms.campaign.progress', {
+            'type': 'sms_campaign_progress',
+            'job_id': campaign.pk,
+            'status': campaign.status,
+            'total': campaign.total,
+            'sent': campaign.sent,
+            'failed': campaign.failed,
+            'done': campaign.status in ('completed', 'failed'),
+        })
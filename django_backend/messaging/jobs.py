@@ -1,185 +1,119 @@
 """
 Scheduled jobs for automated SMS messaging.
-Contains the pickup reminder job that runs periodically.
+Contains the pickup and debt reminder jobs that run periodically.
+
+Each job reads the tasks whose reminder is due from the Task due-time
+columns (see messaging.reminders) in chunks, instead of checking every
+candidate task's message history.
 """
 import logging
+import time
 from django.utils import timezone
-from django.db.models import Q
-from messaging.models import MessageLog
-from messaging.services import send_pickup_reminder_sms
-from common.encryption import decrypt_value
+from messaging.reminders import DEBT, PICKUP, ReminderSchedule
+from messaging.services import send_debt_reminder_sms, send_pickup_reminder_sms
+from customers.services import CustomerHandler
 from settings.models import SystemSettings
 from Eapp.models import Task
 from messaging.models import SchedulerNotification
 from notifications.utils import broadcast_scheduler_notification
 
-    
 
 logger = logging.getLogger(__name__)
 
 
-def _process_pickup_task(task, now, reminder_hours):
-    """Process a single task for pickup reminder."""
-    
-   # Check when was the last reminder sent for this task
-    last_reminder = MessageLog.objects.filter(
-        task=task,
-        status='sent',
-        message_content__icontains='tunakukumbusha'  # Reminder keyword
-    ).order_by('-sent_at').first()
-    
-    # Determine when to compare against
-    if last_reminder:
-        last_contact_time = last_reminder.sent_at
-    else:
-        # No reminder sent yet - use approved time
-        last_contact_time = task.approved_at
-    
-    if not last_contact_time:
-        logger.warning(f"Task {task.title}: No approved_at time, skipping")
-        return None, None
-    
-    # Calculate hours since last contact
-    hours_since_contact = (now - last_contact_time).total_seconds() / 3600
-    
-    if hours_since_contact < reminder_hours:
-        logger.debug(
-            f"Task {task.title}: Only {hours_since_contact:.1f}h since last contact, "
-            f"need {reminder_hours}h"
-        )
-        return None, None
-        
-    # Get customer phone
-    if not task.customer or not task.customer.phone_numbers.exists():
-        logger.warning(f"Task {task.title}: No phone number, skipping")
-        return None, None
-    
-    # Use primary phone number (decrypt since stored encrypted in PostgreSQL)
-    primary_phone = task.customer.phone_numbers.first()
-    phone_number = decrypt_value(primary_phone.phone_number)
-    
-    # Send reminder
-    result = send_pickup_reminder_sms(task, phone_number)
-    
-    if result.get('success'):
-        logger.info(f"Sent reminder for task {task.title} to {phone_number}")
-        return True, None
-    else:
-        error_msg = result.get('error', 'Unknown error')
-        logger.error(f"Failed to send reminder for task {task.title}: {error_msg}")
-        return False, {
-            'task_id': task.title,
-            'task_title': task.title,
-            'error': error_msg
-        }
+# Due tasks loaded and sent per round
+REMINDER_CHUNK_SIZE = 200
 
 
-def _process_debt_task(task, now, reminder_hours):
-    """Process a single task for debt reminder."""
-    # Check when was the last debt reminder sent for this task
-    last_reminder = MessageLog.objects.filter(
-        task=task,
-        status='sent',
-        message_content__icontains='deni'  # Debt reminder keyword in Swahili
-    ).order_by('-sent_at').first()
-    
-    # Determine when to compare against
-    if last_reminder:
-        last_contact_time = last_reminder.sent_at
-    else:
-        # No reminder sent yet - use when task was last updated (likely when marked as debt)
-        last_contact_time = task.updated_at
-    
-    if not last_contact_time:
-        logger.warning(f"Task {task.title}: No timestamp available, skipping")
-        return None, None
-    
-    # Calculate hours since last contact
-    hours_since_contact = (now - last_contact_time).total_seconds() / 3600
-    
-    if hours_since_contact < reminder_hours:
-        logger.debug(
-            f"Task {task.title}: Only {hours_since_contact:.1f}h since last contact, "
-            f"need {reminder_hours}h"
-        )
-        return None, None
-        
-    # Get customer phone
-    if not task.customer or not task.customer.phone_numbers.exists():
-        logger.warning(f"Task {task.title}: No phone number, skipping")
-        return None, None
-    
-    # Use primary phone number (decrypt since stored encrypted in PostgreSQL)
-    primary_phone = task.customer.phone_numbers.first()
-    phone_number = decrypt_value(primary_phone.phone_number)
-    
-    # Send reminder using existing debt reminder service
-    result = send_debt_reminder_sms(task, phone_number, user=None)
-    
-    if result.get('success'):
-        logger.info(f"Sent debt reminder for task {task.title} to {phone_number}")
-        return True, None
-    else:
-        error_msg = result.get('error', 'Unknown error')
-        logger.error(f"Failed to send debt reminder for task {task.title}: {error_msg}")
-        return False, {
-            'task_id': task.title,
-            'task_title': task.title,
-            'error': error_msg
-        }
+def _due_tasks(field, now, **filters):
+    """
+    Yield the tasks whose reminder ``field`` is due, in chunks of REMINDER_CHUNK_SIZE.
 
+    The due task IDs come from one query on the partial due-time index; each
+    chunk is then loaded by primary key with the customers' primary phone
+    numbers decrypted in one batch.
 
-def send_pickup_reminders():
+    Yields:
+        tuple: (tasks, {customer_id: phone})
     """
-    Scheduled job to send pickup reminder SMS for tasks that are ready for pickup.
-    
-    Logic:
-    1. Check if auto_pickup_reminders_enabled is True
-    2. Find tasks with status 'Ready for Pickup'
-    3. For each task, check if enough hours have passed since:
-       - The last reminder SMS was sent, OR
-       - The task was approved (if no reminder sent yet)
-    4. Send reminder SMS and log it
+    due_ids = list(Task.objects.filter(
+        **{f'{field}__lte': now}, **filters
+    ).order_by(field).values_list('pk', flat=True))
+    for start in range(0, len(due_ids), REMINDER_CHUNK_SIZE):
+        tasks = list(Task.objects.filter(
+            pk__in=due_ids[start:start + REMINDER_CHUNK_SIZE]
+        ).select_related('customer').prefetch_related(
+            CustomerHandler.phone_numbers_prefetch('customer__phone_numbers')
+        ).order_by(field))
+        yield tasks, CustomerHandler.primary_phones(task.customer for task in tasks)
+
+
+def _send_reminders(field, now, reminder_hours, send, label, **filters):
     """
-    # Get settings
-    settings = SystemSettings.get_settings()
-    
-    if not settings.auto_pickup_reminders_enabled:
-        logger.info("Pickup reminders disabled - skipping job")
-        return
-    
-    reminder_hours = settings.pickup_reminder_hours
-    now = timezone.now()
-    
-    # Find tasks ready for pickup
-    ready_tasks = Task.objects.filter(
-        status=Task.Status.READY_FOR_PICKUP
-    ).select_related('customer')
-    
-    logger.info(f"Found {ready_tasks.count()} tasks ready for pickup")
-    
+    Send a reminder to every task that is due and move each reminded task's
+    due time one interval forward. Failed sends stay due for the next run.
+
+    Args:
+        field: Task due-time column (see messaging.reminders)
+        now: Job start time
+        reminder_hours: Reminder interval
+        send: Callable (task, phone_number) returning the SMS service result
+        label: Reminder name for log messages
+        **filters: Extra Task filters the due tasks must match
+
+    Returns:
+        tuple: (tasks found, reminders sent, failure dicts)
+    """
+    tasks_found = 0
     reminders_sent = 0
     failures = []  # Track failures for notification
-    
-    for task in ready_tasks:
-        try:
-            success, failure_data = _process_pickup_task(task, now, reminder_hours)
-            if success is True:
+
+    for tasks, phones in _due_tasks(field, now, **filters):
+        tasks_found += len(tasks)
+        reminded = []
+        for task in tasks:
+            phone_number = phones.get(task.customer_id)
+            if not phone_number:
+                logger.warning(f"Task {task.title}: No phone number, skipping")
+                reminded.append(task.pk)  # Check again after one interval
+                continue
+            try:
+                result = send(task, phone_number)
+            except Exception as e:
+                logger.exception(f"Error processing task {task.title}: {e}")
+                continue
+            if result.get('success'):
+                logger.info(f"Sent {label} for task {task.title} to {phone_number}")
+                reminded.append(task.pk)
                 reminders_sent += 1
-            elif success is False and failure_data:
-                failures.append(failure_data)
-        except Exception as e:
-            logger.exception(f"Error processing task {task.title}: {e}")
-    
-    logger.info(f"Pickup reminder job completed: {reminders_sent} reminders sent")
-    
+            else:
+                error_msg = result.get('error', 'Unknown error')
+                logger.error(f"Failed to send {label} for task {task.title}: {error_msg}")
+                failures.append({
+                    'task_id': task.title,
+                    'task_title': task.title,
+                    'error': error_msg
+                })
+        ReminderSchedule.postpone(field, reminded, hours=reminder_hours, now=now)
+
+    return tasks_found, reminders_sent, failures
+
+
+def _notify(job_type, now, started, tasks_found, reminders_sent, failures):
+    """
+    Record the run for the frontend and drop notifications older than 7 days.
+
+    Returns:
+        dict: The run's tasks_found, messages_sent and messages_failed
+    """
     # Create notification for frontend
     notification = SchedulerNotification.objects.create(
-        job_type='pickup_reminder',
-        tasks_found=ready_tasks.count(),
+        job_type=job_type,
+        tasks_found=tasks_found,
         messages_sent=reminders_sent,
         messages_failed=len(failures),
         failure_details=failures,
+        duration_seconds=round(time.perf_counter() - started, 3),
     )
     
     # Broadcast via WebSocket for instant notifications
@@ -191,6 +125,44 @@ def send_pickup_reminders():
     if deleted_count:
         logger.info(f"Cleaned up {deleted_count} old scheduler notifications")
 
+    return {
+        'tasks_found': tasks_found,
+        'messages_sent': reminders_sent,
+        'messages_failed': len(failures),
+    }
+
+
+def send_pickup_reminders():
+    """
+    Scheduled job to send pickup reminder SMS for tasks that are ready for pickup.
+    
+    Logic:
+    1. Check if auto_pickup_reminders_enabled is True
+    2. Find tasks ready for pickup whose next_pickup_reminder_at has passed
+       (pickup_reminder_hours after approval or after the last reminder)
+    3. Send reminder SMS and log it
+    4. Schedule the next reminder pickup_reminder_hours from now
+
+    Returns:
+        dict: tasks_found, messages_sent and messages_failed, or None when disabled
+    """
+    started = time.perf_counter()
+    # Get settings
+    settings = SystemSettings.get_settings()
+    
+    if not settings.auto_pickup_reminders_enabled:
+        logger.info("Pickup reminders disabled - skipping job")
+        return None
+    
+    now = timezone.now()
+    tasks_found, reminders_sent, failures = _send_reminders(
+        PICKUP, now, settings.pickup_reminder_hours, send_pickup_reminder_sms, 'pickup reminder',
+        status=Task.Status.READY_FOR_PICKUP,
+    )
+    
+    logger.info(f"Pickup reminder job completed: {tasks_found} tasks due, {reminders_sent} reminders sent")
+    return _notify('pickup_reminder', now, started, tasks_found, reminders_sent, failures)
+
 
 def send_debt_reminders():
     """
@@ -198,64 +170,37 @@ def send_debt_reminders():
     
     Logic:
     1. Check if auto_debt_reminders_enabled is True
-    2. Find tasks with is_debt=True and status='Picked Up'
-    3. Skip tasks older than debt_reminder_max_days since pickup
-    4. Send reminder if debt_reminder_hours have passed since last debt reminder
-    """    
+    2. Stop reminding tasks picked up more than debt_reminder_max_days ago
+    3. Find picked up debt tasks whose next_debt_reminder_at has passed
+    4. Send reminder SMS and schedule the next one debt_reminder_hours from now
+
+    Returns:
+        dict: tasks_found, messages_sent and messages_failed, or None when disabled
+    """
+    started = time.perf_counter()
     # Get settings
     settings = SystemSettings.get_settings()
     
     if not settings.auto_debt_reminders_enabled:
         logger.info("Debt reminders disabled - skipping job")
-        return
+        return None
     
-    reminder_hours = settings.debt_reminder_hours
-    max_days = settings.debt_reminder_max_days
     now = timezone.now()
     
-    # Calculate the cutoff date (don't send reminders for very old debts)
-    cutoff_date = now - timezone.timedelta(days=max_days)
-    
-    # Find tasks with debt that were picked up within the max_days window
-    debt_tasks = Task.objects.filter(
-        is_debt=True,
-        status=Task.Status.PICKED_UP,
-        updated_at__gte=cutoff_date  # Only tasks updated within max_days
-    ).select_related('customer')
-    
-    logger.info(f"Found {debt_tasks.count()} debt tasks within {max_days} day window")
-    
-    reminders_sent = 0
-    failures = []  # Track failures for notification
-    
-    for task in debt_tasks:
-        try:
-            success, failure_data = _process_debt_task(task, now, reminder_hours)
-            if success is True:
-                reminders_sent += 1
-            elif success is False and failure_data:
-                failures.append(failure_data)
-        except Exception as e:
-            logger.exception(f"Error processing debt task {task.title}: {e}")
-    
-    logger.info(f"Debt reminder job completed: {reminders_sent} reminders sent")
-    
-    # Create notification for frontend
-    from messaging.models import SchedulerNotification
-    notification = SchedulerNotification.objects.create(
-        job_type='debt_reminder',
-        tasks_found=debt_tasks.count(),
-        messages_sent=reminders_sent,
-        messages_failed=len(failures),
-        failure_details=failures,
+    # Don't send reminders for very old debts
+    cutoff_date = now - timezone.timedelta(days=settings.debt_reminder_max_days)
+    expired = Task.objects.filter(
+        next_debt_reminder_at__lte=now, latest_pickup_at__lt=cutoff_date
+    ).update(next_debt_reminder_at=None)
+    if expired:
+        logger.info(f"Stopped debt reminders for {expired} tasks past the {settings.debt_reminder_max_days} day window")
+    
+    tasks_found, reminders_sent, failures = _send_reminders(
+        DEBT, now, settings.debt_reminder_hours,
+        lambda task, phone_number: send_debt_reminder_sms(task, phone_number, user=None, queue=False),
+        'debt reminder',
+        is_debt=True, status=Task.Status.PICKED_UP,
     )
     
-    # Broadcast via WebSocket for instant notifications
-    from notifications.utils import broadcast_scheduler_notification
-    broadcast_scheduler_notification(notification)
-    
-    # Cleanup: Delete notifications older than 7 days
-    cleanup_cutoff = now - timezone.timedelta(days=7)
-    deleted_count, _ = SchedulerNotification.objects.filter(created_at__lt=cleanup_cutoff).delete()
-    if deleted_count:
-        logger.info(f"Cleaned up {deleted_count} old scheduler notifications")
\ No newline at end of file
+    logger.info(f"Debt reminder job completed: {tasks_found} tasks due, {reminders_sent} reminders sent")
+    return _notify('debt_reminder', now, started, tasks_found, reminders_sent, failures)
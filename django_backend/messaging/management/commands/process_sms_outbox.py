@@ -0,0 +1,74 @@
+import signal
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common import metrics
+from messaging.campaigns import SmsCampaignRunner
+from messaging.outbox import SmsOutbox
+
+
+class Command(BaseCommand):
+    help = 'Sends queued SMS messages and bulk SMS campaigns from the outbox using a pool of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'SMS_OUTBOX_WORKERS', 4),
+            help='Messages sent in parallel (default: SMS_OUTBOX_WORKERS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Messages claimed per round (default: 50)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'SMS_OUTBOX_POLL_INTERVAL', 2.0),
+            help='Seconds to wait when the outbox is empty (default: SMS_OUTBOX_POLL_INTERVAL)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Send everything that is due now and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            sent = SmsOutbox.drain(workers=options['workers'], limit=options['batch_size'])
+            campaigns = 0
+            with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='sms-outbox') as executor:
+                while SmsCampaignRunner.process_next(executor):
+                    campaigns += 1
+            self.stdout.write(self.style.SUCCESS(f"Processed {sent} queued messages and {campaigns} campaigns."))
+            return
+
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        self.stdout.write(f"SMS outbox worker started with {options['workers']} threads.")
+
+        with ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='sms-outbox') as executor:
+            while not self._stopping:
+                try:
+                    claimed = SmsOutbox.process_batch(executor, options['batch_size'])
+                    if SmsCampaignRunner.process_next(executor):
+                        claimed = options['batch_size']
+                except Exception as e:
+                    # Database unavailable or similar; try again after a pause
+                    self.stderr.write(f"Outbox round failed: {e}")
+                    claimed = 0
+                metrics.registry.maybe_flush()
+                if claimed < options['batch_size']:
+                    time.sleep(options['poll_interval'])
+
+        self.stdout.write("SMS outbox worker stopped.")
+
+    def _stop(self, signum, frame):
+        self._stopping = True
@@ -0,0 +1,110 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common import metrics
+from messaging.scheduler import JOBS, LeaderLock, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the scheduled reminder jobs. Several instances may run; the one holding '
+        'the PostgreSQL advisory lock runs the jobs and the others stand by to take over'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--standby-interval',
+            type=float,
+            default=getattr(settings, 'SCHEDULER_STANDBY_INTERVAL', 15.0),
+            help='Seconds between attempts to take the lock, and between lock checks while '
+                 'leading (default: SCHEDULER_STANDBY_INTERVAL)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run every job once if the lock is free, then exit',
+        )
+
+    def handle(self, *args, **options):
+        lock = LeaderLock()
+        if options['once']:
+            self._run_once(lock)
+            return
+
+        self._stopping = threading.Event()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        interval = options['standby_interval']
+        self.stdout.write("Scheduler started; waiting for the leader lock.")
+
+        while not self._stopping.is_set():
+            if not lock.acquire():
+                metrics.registry.maybe_flush()
+                self._stopping.wait(interval)
+                continue
+
+            self.stdout.write("Leader lock acquired; running jobs.")
+            scheduler = self._start_scheduler()
+            try:
+                while not self._stopping.wait(interval):
+                    metrics.registry.maybe_flush()
+                    if not lock.held():
+                        self.stderr.write("Leader lock lost; standing by.")
+                        break
+            finally:
+                # Let running jobs finish so they never overlap with the next leader's
+                scheduler.shutdown(wait=True)
+                lock.release()
+
+        metrics.registry.maybe_flush(force=True)
+        self.stdout.write("Scheduler stopped.")
+
+    def _run_once(self, lock):
+        if not lock.acquire():
+            self.stdout.write("Another scheduler holds the leader lock; nothing to do.")
+            return
+        try:
+            for job_id in JOBS:
+                counts = run_job(job_id)
+                summary = 'disabled' if counts is None else (
+                    f"{counts['tasks_found']} tasks, {counts['messages_sent']} sent, "
+                    f"{counts['messages_failed']} failed"
+                )
+                self.stdout.write(f"{job_id}: {summary}")
+        finally:
+            lock.release()
+            metrics.registry.maybe_flush(force=True)
+
+    def _start_scheduler(self):
+        """Start APScheduler with the jobs, keeping any schedule already in the job store."""
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.triggers.interval import IntervalTrigger
+        from django_apscheduler.jobstores import DjangoJobStore
+
+        scheduler = BackgroundScheduler(timezone=settings.TIME_ZONE)
+        scheduler.add_jobstore(DjangoJobStore(), 'default')
+        scheduler.start()
+
+        for job_id, (name, _, hours) in JOBS.items():
+            existing = scheduler.get_job(job_id)
+            next_run = {'next_run_time': existing.next_run_time} if existing and existing.next_run_time else {}
+            scheduler.add_job(
+                run_job,
+                trigger=IntervalTrigger(hours=hours),
+                args=[job_id],
+                id=job_id,
+                name=name,
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+                **next_run,
+            )
+            job = scheduler.get_job(job_id)
+            self.stdout.write(f"  {job_id}: every {hours}h, next run {job.next_run_time:%Y-%m-%d %H:%M:%S %Z}")
+        return scheduler
+
+    def _stop(self, signum, frame):
+        self._stopping.set()
@@ -5,8 +5,6 @@ Centralizes context extraction, variable substitution, and logging.
 import logging
 from django.utils import timezone
 
-from messaging.models import MessageLog
-from messaging.sms_client import briq_client
 from messaging.templates import (
     get_template_by_key_or_id,
     TEMPLATE_READY_SOLVED,
@@ -195,7 +193,7 @@ class MessageBuilder:
         return self.sanitize(self.substitute_variables(template))
 
 
-def send_sms_with_logging(task, phone_number: str, message: str, user, activity_message: str) -> dict:
+def send_sms_with_logging(task, phone_number: str, message: str, user, activity_message: str, queue: bool = True) -> dict:
     """
     Common pattern for sending SMS with logging.
     
@@ -204,56 +202,33 @@ def send_sms_with_logging(task, phone_number: str, message: str, user, activity_
         phone_number: Recipient phone number
         message: SMS content to send
         user: User who initiated the send (for logging)
-        activity_message: Message to log in TaskActivity
+        activity_message: Message to log in TaskActivity once the SMS is sent
+        queue: Hand the message to the outbox worker (see messaging.outbox) instead
+            of waiting for the gateway. Success then means the message was queued.
     
     Returns:
-        dict: {success: bool, phone: str, message: str, error: str (if failed)}
+        dict: {success: bool, phone: str, message: str, queued: bool, error: str (if failed)}
     """
-    from Eapp.models import TaskActivity
+    from messaging.outbox import SmsOutbox
     
-    # Create message log entry (pending)
-    message_log = MessageLog.objects.create(
-        task=task,
-        recipient_phone=phone_number,
-        message_content=message,
-        status='pending',
-        sent_by=user
-    )
-    
-    # Send SMS via Briq
-    result = briq_client.send_sms(
-        content=message,
-        recipients=[phone_number]
-    )
-    
-    # Update message log with result
-    if result.get('success'):
-        message_log.status = 'sent'
-        message_log.response_data = result.get('data')
-        message_log.save()
-        
-        # Log activity on the task
-        TaskActivity.objects.create(
-            task=task,
-            user=user,
-            type='sms_sent',
-            message=activity_message
-        )
-        
-        logger.info(f"{activity_message} for task {task.title}")
-        return {
-            'success': True,
-            'phone': phone_number,
-            'message': message
-        }
+    if queue:
+        message_log = SmsOutbox.enqueue(task, phone_number, message, user, activity_message)
     else:
-        message_log.status = 'failed'
-        message_log.response_data = result
-        message_log.save()
-        
-        logger.error(f"SMS failed for {phone_number}: {result.get('error')}")
+        message_log = SmsOutbox.send_now(task, phone_number, message, user, activity_message)
+    
+    if message_log.status == 'failed':
         return {
             'success': False,
             'phone': phone_number,
-            'error': result.get('error', 'Unknown error')
+            'error': (message_log.response_data or {}).get('error', 'Unknown error')
         }
+    
+    if message_log.status == 'sent':
+        logger.info(f"{activity_message} for task {task.title}")
+    return {
+        'success': True,
+        'phone': phone_number,
+        'message': message,
+        'queued': message_log.status == 'pending',
+        'message_log_id': message_log.id
+    }
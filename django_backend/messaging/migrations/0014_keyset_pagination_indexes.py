@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0019_keyset_pagination_indexes'),
+        ('messaging', '0013_add_scheduler_notification'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='messagelog',
+            index=models.Index(fields=['sent_at', 'id'], name='idx_messagelog_sent_keyset'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Eapp', '0023_task_execution_hours'),
+        ('messaging', '0014_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='messagelog',
+            name='activity_message',
+            field=models.CharField(blank=True, default='', help_text='Task activity to log once the message is sent', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='messagelog',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Delivery attempts made so far'),
+        ),
+        migrations.AddField(
+            model_name='messagelog',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, help_text='When the outbox worker may next try to send a pending message', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='messagelog',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='idx_messagelog_outbox_due'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0015_sms_outbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SmsCampaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('message', models.TextField(help_text='Message or template content before placeholders are filled in')),
+                ('template_key', models.CharField(blank=True, default='', max_length=50)),
+                ('recipients', models.JSONField(default=list, help_text='List of {task_id, phone} objects')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('api_calls', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sms_campaigns', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'SMS Campaign',
+                'verbose_name_plural': 'SMS Campaigns',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='messagelog',
+            name='campaign',
+            field=models.ForeignKey(blank=True, help_text='Bulk SMS campaign this message was sent by', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='messages', to='messaging.smscampaign'),
+        ),
+    ]
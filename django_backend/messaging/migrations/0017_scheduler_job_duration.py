@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0016_sms_campaign'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedulernotification',
+            name='duration_seconds',
+            field=models.FloatField(blank=True, help_text='How long the job run took', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0017_scheduler_job_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='smscampaign',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Times a worker has claimed the campaign'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.db.models import Q
 
 
 class MessageLog(models.Model):
@@ -43,11 +44,41 @@ class MessageLog(models.Model):
         blank=True,
         help_text='Response data from Briq API'
     )
+    # Outbox state (see messaging.outbox)
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text='Delivery attempts made so far'
+    )
+    next_attempt_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='When the outbox worker may next try to send a pending message'
+    )
+    activity_message = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        help_text='Task activity to log once the message is sent'
+    )
+    campaign = models.ForeignKey(
+        'SmsCampaign',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='messages',
+        help_text='Bulk SMS campaign this message was sent by'
+    )
     
     class Meta:
         ordering = ['-sent_at']
         verbose_name = 'Message Log'
         verbose_name_plural = 'Message Logs'
+        indexes = [
+            # Keyset pagination on (sent_at, id)
+            models.Index(fields=['sent_at', 'id'], name='idx_messagelog_sent_keyset'),
+            # Outbox worker's due-now scan
+            models.Index(fields=['next_attempt_at'], name='idx_messagelog_outbox_due', condition=Q(status='pending')),
+        ]
     
     def __str__(self):
         return f"SMS to {self.recipient_phone} - {self.status}"
@@ -71,6 +102,47 @@ class MessageTemplate(models.Model):
         return f"{self.name} ({self.get_category_display()})"
 
 
+class SmsCampaign(models.Model):
+    """
+    A bulk SMS send, run in the background by the outbox worker (see messaging.campaigns).
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='sms_campaigns'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    message = models.TextField(help_text='Message or template content before placeholders are filled in')
+    template_key = models.CharField(max_length=50, blank=True, default='')
+    recipients = models.JSONField(default=list, help_text='List of {task_id, phone} objects')
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    api_calls = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0, help_text='Times a worker has claimed the campaign')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'SMS Campaign'
+        verbose_name_plural = 'SMS Campaigns'
+
+    def __str__(self):
+        return f"SMS campaign {self.pk} - {self.status} ({self.sent}/{self.total} sent)"
+
+
 class SchedulerNotification(models.Model):
     """
     Stores scheduler job results for frontend notification display.
@@ -90,6 +162,11 @@ class SchedulerNotification(models.Model):
         blank=True,
         help_text='List of {task_id, task_title, error} objects'
     )
+    duration_seconds = models.FloatField(
+        null=True,
+        blank=True,
+        help_text='How long the job run took'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     acknowledged_by = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
@@ -0,0 +1,215 @@
+"""
+Durable SMS outbox.
+
+Request code never talks to the SMS gateway. enqueue() writes a pending
+MessageLog row - inside the caller's transaction, if there is one - and
+returns straight away. The process_sms_outbox worker claims due rows with
+SELECT ... FOR UPDATE SKIP LOCKED, sends them from a thread pool and records
+the outcome, retrying retryable failures with exponential backoff.
+
+Claiming a row moves its next_attempt_at forward by SMS_OUTBOX_LEASE_SECONDS
+and counts the attempt, so a row whose worker dies or raises mid-send is
+picked up again once the lease runs out, and one that keeps doing so is
+failed after SMS_OUTBOX_MAX_ATTEMPTS claims. Delivery is therefore at least
+once.
+
+Rows with status 'pending' and no next_attempt_at are not in the outbox
+(messages being sent synchronously, or left over from before it existed).
+"""
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from common import metrics
+from messaging.models import MessageLog
+from messaging.sms_client import briq_client
+
+logger = logging.getLogger(__name__)
+
+
+class SmsOutbox:
+    """Queueing and delivery of outgoing SMS messages."""
+
+    @staticmethod
+    def enqueue(task, phone_number, message, user, activity_message=''):
+        """
+        Queue an SMS for the outbox worker.
+
+        With SMS_OUTBOX_ENABLED off the message is sent immediately instead.
+
+        Args:
+            task: Task the message is about
+            phone_number: Recipient phone number
+            message: SMS content
+            user: User who initiated the send, or None for automated messages
+            activity_message: Task activity to log once the message is sent
+
+        Returns:
+            MessageLog: The queued row, or the sent/failed row when sent immediately
+        """
+        if not getattr(settings, 'SMS_OUTBOX_ENABLED', True):
+            return SmsOutbox.send_now(task, phone_number, message, user, activity_message)
+
+        message_log = MessageLog.objects.create(
+            task=task,
+            recipient_phone=phone_number,
+            message_content=message,
+            status='pending',
+            sent_by=user,
+            activity_message=activity_message[:255],
+            next_attempt_at=timezone.now(),
+        )
+        metrics.inc('sms_outbox_total', result='queued')
+        return message_log
+
+    @staticmethod
+    def send_now(task, phone_number, message, user, activity_message=''):
+        """
+        Send an SMS synchronously, for callers that need the outcome (scheduled jobs).
+
+        Returns:
+            MessageLog: The row, with status 'sent' or 'failed'
+        """
+        message_log = MessageLog.objects.create(
+            task=task,
+            recipient_phone=phone_number,
+            message_content=message,
+            status='pending',
+            sent_by=user,
+            activity_message=activity_message[:255],
+            attempts=1,
+        )
+        SmsOutbox.deliver(message_log, retry=False)
+        return message_log
+
+    @staticmethod
+    def claim(limit):
+        """
+        Claim up to ``limit`` due messages for this worker.
+
+        Rows locked by another worker are skipped rather than waited on.
+        The claim takes out a lease by pushing next_attempt_at forward and
+        counts the attempt in the same UPDATE. Due rows that have already used
+        SMS_OUTBOX_MAX_ATTEMPTS (their sends kept crashing) are failed instead.
+
+        Returns:
+            list: Claimed MessageLog rows, oldest first
+        """
+        now = timezone.now()
+        max_attempts = getattr(settings, 'SMS_OUTBOX_MAX_ATTEMPTS', 5)
+        with transaction.atomic():
+            due = MessageLog.objects.filter(status='pending', next_attempt_at__lte=now).order_by('next_attempt_at')
+            if connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            rows = list(due[:limit])
+            exhausted = [row.pk for row in rows if row.attempts >= max_attempts]
+            rows = [row for row in rows if row.attempts < max_attempts]
+            if exhausted:
+                MessageLog.objects.filter(pk__in=exhausted).update(status='failed', next_attempt_at=None)
+                metrics.inc('sms_outbox_total', len(exhausted), result='failed')
+                logger.error(f"SMS {exhausted} failed after {max_attempts} attempts")
+            if rows:
+                lease_until = now + timedelta(seconds=getattr(settings, 'SMS_OUTBOX_LEASE_SECONDS', 120))
+                MessageLog.objects.filter(pk__in=[row.pk for row in rows]).update(
+                    next_attempt_at=lease_until, attempts=F('attempts') + 1
+                )
+                for row in rows:
+                    row.attempts += 1
+        return rows
+
+    @staticmethod
+    def retry_delay(attempts):
+        """Seconds to wait before the next attempt: exponential backoff with full jitter."""
+        base = getattr(settings, 'SMS_OUTBOX_RETRY_BASE_SECONDS', 30)
+        cap = getattr(settings, 'SMS_OUTBOX_RETRY_MAX_SECONDS', 3600)
+        return random.uniform(base / 2, min(cap, base * 2 ** (attempts - 1)))
+
+    @staticmethod
+    def deliver(message_log, retry=True):
+        """
+        Send one message and record the outcome on its row.
+
+        The attempt has already been counted by claim() (or send_now()). A
+        retryable failure leaves the row pending with a later next_attempt_at
+        until SMS_OUTBOX_MAX_ATTEMPTS is reached.
+
+        Returns:
+            dict: The SMS client's result
+        """
+        from Eapp.models import TaskActivity
+
+        result = briq_client.send_sms(
+            content=message_log.message_content,
+            recipients=[message_log.recipient_phone]
+        )
+
+        if result.get('success'):
+            message_log.status = 'sent'
+            message_log.response_data = result.get('data')
+            message_log.next_attempt_at = None
+            message_log.sent_at = timezone.now()
+            if message_log.activity_message:
+                TaskActivity.objects.create(
+                    task_id=message_log.task_id,
+                    user=message_log.sent_by,
+                    type='sms_sent',
+                    message=message_log.activity_message
+                )
+            outcome = 'sent'
+        elif retry and result.get('retryable') and message_log.attempts < getattr(settings, 'SMS_OUTBOX_MAX_ATTEMPTS', 5):
+            message_log.response_data = result
+            message_log.next_attempt_at = timezone.now() + timedelta(seconds=SmsOutbox.retry_delay(message_log.attempts))
+            outcome = 'retried'
+            logger.warning(
+                f"SMS {message_log.pk} to {message_log.recipient_phone} failed "
+                f"(attempt {message_log.attempts}), retrying: {result.get('error')}"
+            )
+        else:
+            message_log.status = 'failed'
+            message_log.response_data = result
+            message_log.next_attempt_at = None
+            outcome = 'failed'
+            logger.error(f"SMS failed for {message_log.recipient_phone}: {result.get('error')}")
+
+        message_log.save(update_fields=['status', 'response_data', 'next_attempt_at', 'sent_at'])
+        metrics.inc('sms_outbox_total', result=outcome)
+        return result
+
+    @staticmethod
+    def _deliver_in_thread(message_log):
+        close_old_connections()
+        try:
+            SmsOutbox.deliver(message_log)
+        except Exception:
+            # The lease expires and the row is claimed again, up to SMS_OUTBOX_MAX_ATTEMPTS times
+            logger.exception(f"Unexpected error delivering SMS {message_log.pk}")
+
+    @staticmethod
+    def process_batch(executor, limit):
+        """
+        Claim a batch of due messages and send them on ``executor``.
+
+        Returns:
+            int: Number of messages claimed
+        """
+        rows = SmsOutbox.claim(limit)
+        if rows:
+            list(executor.map(SmsOutbox._deliver_in_thread, rows))
+        return len(rows)
+
+    @staticmethod
+    def drain(workers=1, limit=50):
+        """
+        Send everything that is due now and return the number of messages claimed.
+        """
+        total = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sms-outbox') as executor:
+            while claimed := SmsOutbox.process_batch(executor, limit):
+                total += claimed
+        return total
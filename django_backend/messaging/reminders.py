@@ -0,0 +1,107 @@
+"""
+Due times for the automated pickup and debt reminders.
+
+Task.next_pickup_reminder_at and Task.next_debt_reminder_at hold when each
+task's next reminder is due, or NULL when none is. Task.save() keeps them in
+step with status, is_debt and approved_at, and the jobs in messaging.jobs move
+them one interval forward after each reminder, so a job run is a single
+indexed "due now" query instead of a MessageLog scan per task.
+"""
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from Eapp.models import Task
+from settings.models import SystemSettings
+
+PICKUP = 'next_pickup_reminder_at'
+DEBT = 'next_debt_reminder_at'
+REMINDER_FIELDS = (PICKUP, DEBT)
+
+# Task fields the schedules are derived from
+SOURCE_FIELDS = {'status', 'is_debt', 'approved_at', 'latest_pickup_at'}
+
+# SystemSettings field holding each schedule's interval
+INTERVAL_SETTINGS = {PICKUP: 'pickup_reminder_hours', DEBT: 'debt_reminder_hours'}
+
+
+class ReminderSchedule:
+    """Maintains the reminder due-time columns on Task."""
+
+    @staticmethod
+    def sync(task, update_fields=None, system_settings=None):
+        """
+        Schedule or clear the task's reminders for its current state, in memory.
+
+        - Pickup reminders are due one interval after approval while the task
+          is Ready for Pickup.
+        - Debt reminders are due one interval after the task becomes a debt
+          while it is Picked Up, unless the pickup is older than
+          debt_reminder_max_days.
+
+        An existing due time is kept, since the jobs move it forward.
+
+        Args:
+            task: Task instance about to be saved
+            update_fields: The save's update_fields; None for a full save
+            system_settings: SystemSettings to use (default: loaded when needed)
+
+        Returns:
+            list: Names of the changed reminder fields
+        """
+        if update_fields is not None and not SOURCE_FIELDS.intersection(update_fields):
+            return []
+
+        changed = []
+        settings = system_settings
+
+        if task.status != Task.Status.READY_FOR_PICKUP or task.approved_at is None:
+            if task.next_pickup_reminder_at is not None:
+                task.next_pickup_reminder_at = None
+                changed.append(PICKUP)
+        elif task.next_pickup_reminder_at is None:
+            settings = settings or SystemSettings.get_settings()
+            task.next_pickup_reminder_at = task.approved_at + timedelta(hours=settings.pickup_reminder_hours)
+            changed.append(PICKUP)
+
+        if not task.is_debt or task.status != Task.Status.PICKED_UP:
+            if task.next_debt_reminder_at is not None:
+                task.next_debt_reminder_at = None
+                changed.append(DEBT)
+        elif task.next_debt_reminder_at is None:
+            settings = settings or SystemSettings.get_settings()
+            now = timezone.now()
+            if (task.latest_pickup_at or now) >= now - timedelta(days=settings.debt_reminder_max_days):
+                task.next_debt_reminder_at = now + timedelta(hours=settings.debt_reminder_hours)
+                changed.append(DEBT)
+
+        return changed
+
+    @staticmethod
+    def postpone(field, task_ids, hours=None, now=None):
+        """
+        Make the next reminder due one interval from now, for tasks that have one scheduled.
+
+        Args:
+            field: PICKUP or DEBT
+            task_ids: Primary keys of the reminded tasks
+            hours: Reminder interval (default: from SystemSettings)
+            now: Time the reminder was sent (default: now)
+
+        Returns:
+            int: Number of tasks updated
+        """
+        if not task_ids:
+            return 0
+        if hours is None:
+            hours = getattr(SystemSettings.get_settings(), INTERVAL_SETTINGS[field])
+        due = (now or timezone.now()) + timedelta(hours=hours)
+        return Task.objects.filter(pk__in=task_ids, **{f'{field}__isnull': False}).update(**{field: due})
+
+    @staticmethod
+    def shift(field, hours):
+        """Move every scheduled reminder by ``hours``, after its interval setting changed."""
+        if not hours:
+            return 0
+        return Task.objects.filter(**{f'{field}__isnull': False}).update(**{field: F(field) + timedelta(hours=hours)})
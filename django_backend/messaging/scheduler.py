@@ -0,0 +1,127 @@
+"""
+Scheduled reminder jobs and the leader lock for the run_scheduler worker.
+
+Any number of run_scheduler processes may run; each tries to take a
+session-level PostgreSQL advisory lock and only the holder runs the
+APScheduler jobs. The others stand by and retry, so when the leader exits
+or its database session ends the lock is released and a standby takes over
+within SCHEDULER_STANDBY_INTERVAL seconds. The lock lives in one server
+session, so it is taken on SCHEDULER_LOCK_DATABASE, a direct connection
+when the default one goes through PgBouncer. Job schedules are kept in the
+django_apscheduler job store, so a new leader continues them rather than
+starting over.
+"""
+import logging
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections
+
+from common import metrics
+
+logger = logging.getLogger(__name__)
+
+# Job ID -> (display name, job function path, interval in hours)
+JOBS = {
+    'send_pickup_reminders': ('Send Pickup Reminders', 'messaging.jobs.send_pickup_reminders', 1),
+    'send_debt_reminders': ('Send Debt Reminders', 'messaging.jobs.send_debt_reminders', 1),
+}
+
+JOB_DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0)
+
+
+def run_job(job_id):
+    """
+    Run one scheduled job and record its runtime and what it processed.
+
+    The job function returns a dict with tasks_found, messages_sent and
+    messages_failed, or None when it is disabled.
+
+    Returns:
+        dict or None: The job's counts
+    """
+    module_path, func_name = JOBS[job_id][1].rsplit('.', 1)
+    func = getattr(import_module(module_path), func_name)
+
+    close_old_connections()
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        counts = func()
+        outcome = 'ok' if counts is not None else 'disabled'
+        return counts
+    finally:
+        duration = time.perf_counter() - started
+        metrics.observe('scheduler_job_duration_seconds', duration, JOB_DURATION_BUCKETS, job=job_id, result=outcome)
+        if outcome == 'ok':
+            for kind in ('tasks_found', 'messages_sent', 'messages_failed'):
+                metrics.inc('scheduler_job_items_total', counts[kind], job=job_id, kind=kind)
+            logger.info(
+                f"Job {job_id} finished in {duration:.2f}s: {counts['tasks_found']} tasks, "
+                f"{counts['messages_sent']} sent, {counts['messages_failed']} failed"
+            )
+        close_old_connections()
+
+
+class LeaderLock:
+    """
+    Session-level PostgreSQL advisory lock held on this thread's connection to `using`.
+
+    acquire(), held() and release() must all reach the same server session, so
+    the connection must be session-pinned: a direct connection, never one
+    through a transaction-pooling PgBouncer. `using` defaults to
+    SCHEDULER_LOCK_DATABASE.
+
+    On other databases there is nothing to coordinate with, so the lock is
+    always granted; run a single scheduler there.
+    """
+
+    def __init__(self, key=None, using=None):
+        self.key = key if key is not None else getattr(settings, 'SCHEDULER_LOCK_ID', 7242001)
+        self.using = using or getattr(settings, 'SCHEDULER_LOCK_DATABASE', 'default')
+        self.supported = self.connection.vendor == 'postgresql'
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def acquire(self):
+        """Take the lock if no other session holds it. Returns True on success."""
+        if not self.supported:
+            return True
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [self.key])
+                return cursor.fetchone()[0]
+        except DatabaseError as e:
+            logger.warning(f"Scheduler lock unavailable: {e}")
+            self.connection.close()
+            return False
+
+    def held(self):
+        """True while this session still holds the lock; False once the session is gone."""
+        if not self.supported:
+            return True
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' AND granted "
+                    "AND pid = pg_backend_pid() AND classid = %s AND objid = %s AND objsubid = 1)",
+                    [self.key >> 32, self.key & 0xFFFFFFFF],
+                )
+                return cursor.fetchone()[0]
+        except DatabaseError as e:
+            logger.warning(f"Scheduler lock lost: {e}")
+            self.connection.close()
+            return False
+
+    def release(self):
+        if not self.supported:
+            return
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [self.key])
+        except DatabaseError:
+            # Ending the session releases it too
+            self.connection.close()
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import MessageTemplate, MessageLog
+from .models import MessageTemplate, MessageLog, SmsCampaign
 
 
 class SendSMSSerializer(serializers.Serializer):
@@ -68,6 +68,15 @@ class BulkSendSMSSerializer(serializers.Serializer):
         return data
 
 
+class SmsCampaignSerializer(serializers.ModelSerializer):
+    """Progress of a bulk SMS send."""
+
+    class Meta:
+        model = SmsCampaign
+        fields = ['id', 'status', 'total', 'sent', 'failed', 'api_calls', 'errors', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+
 class MessageLogSerializer(serializers.ModelSerializer):
     sent_by_name = serializers.CharField(source='sent_by.get_full_name', read_only=True)
     task_id = serializers.IntegerField(source='task.id', read_only=True)
@@ -94,6 +103,6 @@ class SchedulerNotificationSerializer(serializers.ModelSerializer):
         model = SchedulerNotification
         fields = [
             'id', 'job_type', 'tasks_found', 'messages_sent',
-            'messages_failed', 'failure_details', 'created_at'
+            'messages_failed', 'failure_details', 'duration_seconds', 'created_at'
         ]
         read_only_fields = fields
@@ -48,7 +48,7 @@ def send_task_registration_sms(task, phone_number, user):
     )
 
 
-def send_debt_reminder_sms(task, phone_number, user):
+def send_debt_reminder_sms(task, phone_number, user, queue=True):
     """
     Send SMS reminder to customer about their outstanding debt.
     
@@ -56,6 +56,7 @@ def send_debt_reminder_sms(task, phone_number, user):
         task: Task instance with outstanding balance
         phone_number: Customer's phone number
         user: User who initiated the reminder (for logging)
+        queue: Queue for the outbox worker; False sends synchronously
     
     Returns:
         dict: {success: bool, phone: str, message: str, error: str (if failed)}
@@ -74,7 +75,8 @@ def send_debt_reminder_sms(task, phone_number, user):
         phone_number=phone_number,
         message=message,
         user=user,
-        activity_message=f"Debt reminder SMS sent to {phone_number}"
+        activity_message=f"Debt reminder SMS sent to {phone_number}",
+        queue=queue
     )
 
 
@@ -156,7 +158,8 @@ def build_template_message(task, template_key):
 def send_pickup_reminder_sms(task, phone_number):
     """
     Send automated pickup reminder SMS to customer.
-    Called by the scheduler - no user context needed.
+    Called by the scheduler - no user context needed. Sent synchronously,
+    since the job reports how many reminders went out.
     
     Args:
         task: Task instance that is ready for pickup
@@ -179,5 +182,6 @@ def send_pickup_reminder_sms(task, phone_number):
         phone_number=phone_number,
         message=message,
         user=None,  # Automated - no user context
-        activity_message=f"Automated pickup reminder SMS sent to {phone_number}"
+        activity_message=f"Automated pickup reminder SMS sent to {phone_number}",
+        queue=False
     )
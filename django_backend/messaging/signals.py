@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from common.stats import invalidate as invalidate_stats
+from settings.models import SystemSettings
+from .models import MessageLog
+from .reminders import INTERVAL_SETTINGS, ReminderSchedule
+
+
+@receiver(post_save, sender=MessageLog)
+def invalidate_message_stats(sender, instance, **kwargs):
+    """Sent-message counts on the dashboards read MessageLog."""
+    invalidate_stats('messages')
+
+
+@receiver(pre_save, sender=SystemSettings)
+def shift_reminder_schedules(sender, instance, **kwargs):
+    """Scheduled reminder due times include the interval, so move them when it changes."""
+    if instance._state.adding:
+        return
+    previous = SystemSettings.objects.filter(pk=instance.pk).values(*INTERVAL_SETTINGS.values()).first()
+    if not previous:
+        return
+    for field, setting in INTERVAL_SETTINGS.items():
+        ReminderSchedule.shift(field, getattr(instance, setting) - previous[setting])
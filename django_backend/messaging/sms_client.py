@@ -1,29 +1,73 @@
 """
 SMS Client module for Briq Karibu API.
 Handles low-level SMS sending via the Briq API.
+
+All sends share one requests.Session per client, so the pooled keep-alive
+connections (and their TLS sessions) are reused instead of paying for a new
+handshake per message. The pool is sized for the outbox worker's threads.
 """
-import requests
 import logging
+import random
+import threading
+import time
+
+import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from common import metrics
 
 logger = logging.getLogger(__name__)
 
+# Statuses where the gateway did not act on the request, so resending cannot duplicate a message
+RETRY_STATUSES = (429, 503)
+
 
 class BriqClient:
     """
     Client for Briq Karibu SMS API.
     Documentation: https://docs.briq.tz/
     """
-    
-    def __init__(self):
-        self.api_key = getattr(settings, 'BRIQ_API_KEY', None)
+
+    def __init__(self, api_key=None, base_url=None):
+        self.api_key = api_key or getattr(settings, 'BRIQ_API_KEY', None)
         self.sender_id = getattr(settings, 'BRIQ_SENDER_ID', 'A-EXPRESS')
-        self.base_url = 'https://karibu.briq.tz'
+        self.base_url = base_url or getattr(settings, 'BRIQ_BASE_URL', 'https://karibu.briq.tz')
         self.headers = {
             'X-API-Key': self.api_key,
             'Content-Type': 'application/json'
         }
-    
+        self.timeout = (
+            getattr(settings, 'BRIQ_CONNECT_TIMEOUT', 3.05),
+            getattr(settings, 'BRIQ_READ_TIMEOUT', 15),
+        )
+        self.max_retries = getattr(settings, 'BRIQ_MAX_RETRIES', 2)
+        self.retry_backoff = getattr(settings, 'BRIQ_RETRY_BACKOFF', 0.5)
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Shared session with a keep-alive connection pool, created on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    pool_size = getattr(settings, 'BRIQ_POOL_SIZE', 10)
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update(self.headers)
+                    self._session = session
+        return self._session
+
+    def close(self):
+        """Close the pooled connections."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
     def _clean_phone_number(self, phone: str) -> str:
         """Clean and normalize a phone number to Tanzania format."""
         # Remove any spaces, dashes, or plus signs
@@ -32,46 +76,96 @@ class BriqClient:
         if cleaned.startswith('0'):
             cleaned = '255' + cleaned[1:]
         return cleaned
-    
+
+    def _retry_delay(self, attempt, response=None):
+        """Seconds before retry ``attempt`` (1-based): Retry-After if given, else backoff with full jitter."""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), 30)
+        return random.uniform(0, self.retry_backoff * 2 ** (attempt - 1))
+
+    @staticmethod
+    def _request_not_sent(exc):
+        """True if the connection failed before the request reached the gateway."""
+        if isinstance(exc, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(exc.args[0], 'reason', None) if exc.args else None
+        return isinstance(reason, NewConnectionError)
+
+    def _post(self, path, payload):
+        """
+        POST with retries where the gateway cannot have acted on the request:
+        connections that failed before it was sent, and 429/503 responses.
+        Read timeouts, dropped connections and other errors are not retried
+        here since the message may already be on its way; the caller decides
+        (see 'retryable').
+        """
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            outcome = 'error'
+            response = None
+            try:
+                response = self.session.post(f'{self.base_url}{path}', json=payload, timeout=self.timeout)
+                outcome = str(response.status_code)
+            except requests.exceptions.ConnectionError as e:
+                outcome = 'connection_error'
+                if not self._request_not_sent(e) or attempt >= self.max_retries:
+                    raise
+            except requests.exceptions.Timeout:
+                outcome = 'timeout'
+                raise
+            finally:
+                metrics.observe('sms_gateway_request_duration_seconds', time.perf_counter() - started,
+                                metrics.LATENCY_BUCKETS, outcome=outcome)
+
+            if response is not None and (response.status_code not in RETRY_STATUSES or attempt >= self.max_retries):
+                return response
+            attempt += 1
+            delay = self._retry_delay(attempt, response)
+            logger.warning(f"Briq request failed ({outcome}), retry {attempt}/{self.max_retries} in {delay:.2f}s")
+            time.sleep(delay)
+
     def send_sms(self, content: str, recipients: list, sender_id: str = None) -> dict:
         """
         Send an instant SMS message.
-        
+
         Args:
             content: Message content (recommended max 160 chars for single SMS)
             recipients: List of phone numbers with country code (e.g., ['255788344348'])
             sender_id: Your brand name/identifier (optional, uses default if not provided)
-        
+
         Returns:
-            dict: API response containing success status and message data
+            dict: API response containing success status and message data. Failed
+            sends carry 'retryable', True when the same request may succeed later
+            (timeouts, connection errors, rate limiting and server errors).
         """
         if not self.api_key:
             logger.error("BRIQ_API_KEY not configured")
             return {
                 'success': False,
-                'error': 'BRIQ_API_KEY not configured in settings'
+                'error': 'BRIQ_API_KEY not configured in settings',
+                'retryable': False
             }
-        
+
         # Clean phone numbers
         cleaned_recipients = [self._clean_phone_number(phone) for phone in recipients]
-        
+
         payload = {
             'content': content,
             'recipients': cleaned_recipients,
             'sender_id': sender_id or self.sender_id
         }
-        
+
         try:
             logger.info(f"Sending SMS to {cleaned_recipients}")
-            response = requests.post(
-                f'{self.base_url}/v1/message/send-instant',
-                json=payload,
-                headers=self.headers,
-                timeout=30
-            )
-            
-            response_data = response.json()
-            
+            response = self._post('/v1/message/send-instant', payload)
+
+            try:
+                response_data = response.json()
+            except ValueError:
+                response_data = {'message': f'HTTP {response.status_code}: {response.text[:200]}'}
+
             if response.status_code == 200 and response_data.get('success'):
                 logger.info(f"SMS sent successfully to {cleaned_recipients}")
                 return {
@@ -84,26 +178,30 @@ class BriqClient:
                 return {
                     'success': False,
                     'error': response_data.get('message', 'Unknown error'),
-                    'data': response_data
+                    'data': response_data,
+                    'retryable': response.status_code == 429 or response.status_code >= 500
                 }
-                
+
         except requests.exceptions.Timeout:
             logger.error("SMS send timed out")
             return {
                 'success': False,
-                'error': 'Request timed out'
+                'error': 'Request timed out',
+                'retryable': True
             }
         except requests.exceptions.RequestException as e:
             logger.error(f"SMS send failed with exception: {str(e)}")
             return {
                 'success': False,
-                'error': str(e)
+                'error': str(e),
+                'retryable': True
             }
         except Exception as e:
             logger.error(f"Unexpected error sending SMS: {str(e)}")
             return {
                 'success': False,
-                'error': f'Unexpected error: {str(e)}'
+                'error': f'Unexpected error: {str(e)}',
+                'retryable': False
             }
 
 
@@ -0,0 +1,409 @@
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common import metrics
+from common.models import Location
+from customers.models import Customer, PhoneNumber
+from Eapp.models import Task, TaskActivity
+from messaging import jobs
+from messaging.campaigns import SmsCampaignRunner
+from messaging.models import MessageLog, SchedulerNotification
+from messaging.outbox import SmsOutbox
+from messaging.scheduler import LeaderLock, run_job
+from settings.models import SystemSettings
+from messaging.sms_client import BriqClient
+from users.models import User
+
+SENT = {'success': True, 'data': {'id': 'abc'}}
+TIMED_OUT = {'success': False, 'error': 'Request timed out', 'retryable': True}
+REJECTED = {'success': False, 'error': 'Invalid number', 'retryable': False}
+
+
+def create_task():
+    user = User.objects.create_user(username='frontdesk', password='testpassword', email='fd@gmail.com', first_name='front', last_name='desk', role='Front Desk')
+    return Task.objects.create(
+        title='A1-001', created_by=user, customer=Customer.objects.create(name='Customer'),
+        current_location=Location.objects.create(name='Main'),
+    ), user
+
+
+@mock.patch('messaging.outbox.briq_client.send_sms')
+class SmsOutboxTests(TestCase):
+    def setUp(self):
+        self.task, self.user = create_task()
+
+    def _queue(self):
+        return SmsOutbox.enqueue(self.task, '+255712345678', 'Habari', self.user, activity_message='SMS sent')
+
+    def test_enqueue_does_not_call_the_gateway(self, send_sms):
+        log = self._queue()
+
+        send_sms.assert_not_called()
+        self.assertEqual(log.status, 'pending')
+        self.assertIsNotNone(log.next_attempt_at)
+
+    def test_claimed_message_is_sent_and_logged(self, send_sms):
+        send_sms.return_value = SENT
+        log = self._queue()
+
+        claimed = SmsOutbox.claim(10)
+        self.assertEqual(claimed, [log])
+        # Leased until the worker reports back
+        self.assertEqual(SmsOutbox.claim(10), [])
+
+        SmsOutbox.deliver(claimed[0])
+        log.refresh_from_db()
+        self.assertEqual((log.status, log.attempts, log.next_attempt_at), ('sent', 1, None))
+        self.assertTrue(TaskActivity.objects.filter(task=self.task, type='sms_sent', message='SMS sent').exists())
+
+    @override_settings(SMS_OUTBOX_MAX_ATTEMPTS=2, SMS_OUTBOX_RETRY_BASE_SECONDS=0)
+    def test_retryable_failures_back_off_until_the_attempt_limit(self, send_sms):
+        send_sms.return_value = TIMED_OUT
+        self._queue()
+
+        [log] = SmsOutbox.claim(10)
+        SmsOutbox.deliver(log)
+        log.refresh_from_db()
+        self.assertEqual((log.status, log.attempts), ('pending', 1))
+        self.assertIsNotNone(log.next_attempt_at)
+
+        [log] = SmsOutbox.claim(10)
+        SmsOutbox.deliver(log)
+        log.refresh_from_db()
+        self.assertEqual((log.status, log.attempts, log.next_attempt_at), ('failed', 2, None))
+        self.assertFalse(TaskActivity.objects.filter(type='sms_sent').exists())
+
+    @override_settings(SMS_OUTBOX_MAX_ATTEMPTS=2, SMS_OUTBOX_LEASE_SECONDS=0)
+    def test_crashing_sends_stop_at_the_attempt_limit(self, send_sms):
+        send_sms.side_effect = RuntimeError('boom')
+        log = self._queue()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(SmsOutbox.process_batch(executor, 10), 1)
+            self.assertEqual(SmsOutbox.process_batch(executor, 10), 1)
+            self.assertEqual(SmsOutbox.process_batch(executor, 10), 0)
+
+        log.refresh_from_db()
+        self.assertEqual((log.status, log.attempts, log.next_attempt_at), ('failed', 2, None))
+        self.assertEqual(send_sms.call_count, 2)
+
+    def test_permanent_failure_is_not_retried(self, send_sms):
+        send_sms.return_value = REJECTED
+        log = self._queue()
+
+        SmsOutbox.deliver(log)
+        log.refresh_from_db()
+        self.assertEqual(log.status, 'failed')
+
+    @override_settings(SMS_OUTBOX_ENABLED=False)
+    def test_disabled_outbox_sends_in_the_request(self, send_sms):
+        send_sms.return_value = SENT
+
+        log = self._queue()
+
+        send_sms.assert_called_once()
+        self.assertEqual(log.status, 'sent')
+        self.assertEqual(SmsOutbox.claim(10), [])
+
+
+@mock.patch('messaging.campaigns.briq_client.send_sms')
+class SmsCampaignTests(TestCase):
+    def setUp(self):
+        self.task, self.user = create_task()
+        self.task.customer.name = 'Asha'
+        self.task.customer.save()
+        self.other_task = Task.objects.create(
+            title='A1-002', created_by=self.user, customer=self.task.customer,
+            current_location=self.task.current_location,
+        )
+        self.third_task = Task.objects.create(
+            title='A1-003', created_by=self.user, customer=Customer.objects.create(name='Juma'),
+            current_location=self.task.current_location,
+        )
+        self.recipients = [
+            {'task_id': str(self.task.id), 'phone': '0712000001'},
+            {'task_id': str(self.other_task.id), 'phone': '0712000002'},
+            {'task_id': str(self.third_task.id), 'phone': '0712000003'},
+            {'task_id': '999999', 'phone': '0712000004'},
+        ]
+
+    def _run(self):
+        campaign = SmsCampaignRunner.create(self.user, self.recipients, 'Habari {customer}')
+        self.assertEqual(SmsCampaignRunner.claim(), campaign)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return SmsCampaignRunner.run(campaign, executor)
+
+    def test_identical_messages_share_a_gateway_call(self, send_sms):
+        send_sms.return_value = SENT
+
+        campaign = self._run()
+
+        calls = sorted((c.args[0], sorted(c.args[1])) for c in send_sms.call_args_list)
+        self.assertEqual(calls, [
+            ('Habari Asha', ['0712000001', '0712000002']),
+            ('Habari Juma', ['0712000003']),
+        ])
+        self.assertEqual(
+            (campaign.status, campaign.sent, campaign.failed, campaign.api_calls),
+            ('completed', 3, 1, 2),
+        )
+        self.assertEqual(campaign.errors, ['Task 999999 not found'])
+        self.assertEqual(MessageLog.objects.filter(campaign=campaign, status='sent').count(), 3)
+        self.assertEqual(TaskActivity.objects.filter(type='sms_sent', message='Bulk SMS sent').count(), 3)
+
+    def test_failed_call_fails_all_of_its_recipients(self, send_sms):
+        send_sms.side_effect = lambda content, recipients: REJECTED if content == 'Habari Asha' else SENT
+
+        campaign = self._run()
+
+        self.assertEqual((campaign.sent, campaign.failed), (1, 3))
+        self.assertEqual(
+            set(MessageLog.objects.filter(status='failed').values_list('task_id', flat=True)),
+            {self.task.id, self.other_task.id},
+        )
+
+    @override_settings(SMS_CAMPAIGN_MAX_ATTEMPTS=2, SMS_OUTBOX_LEASE_SECONDS=0)
+    @mock.patch('notifications.utils.send_to_user_group')
+    def test_campaign_that_keeps_raising_is_marked_failed(self, send_to_user_group, send_sms):
+        campaign = SmsCampaignRunner.create(self.user, self.recipients, 'Habari {customer}')
+
+        with mock.patch.object(SmsCampaignRunner, '_prepare', side_effect=RuntimeError('boom')):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                self.assertTrue(SmsCampaignRunner.process_next(executor))
+                campaign.refresh_from_db()
+                self.assertEqual((campaign.status, campaign.attempts), ('running', 1))
+
+                self.assertTrue(SmsCampaignRunner.process_next(executor))
+
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.status, campaign.attempts), ('failed', 2))
+        self.assertEqual(campaign.errors, ['Stopped after 2 attempts: boom'])
+        self.assertTrue(send_to_user_group.call_args.args[2]['done'])
+        send_sms.assert_not_called()
+
+    def test_bulk_send_returns_a_job_to_poll(self, send_sms):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post('/api/messaging/bulk-send/', {
+            'recipients': self.recipients, 'message': 'Habari {customer}',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        send_sms.assert_not_called()
+        status = client.get(f"/api/messaging/bulk-send/{response.data['job_id']}/")
+        self.assertEqual((status.data['status'], status.data['total']), ('queued', 4))
+
+        client.force_authenticate(User.objects.create_user(
+            username='other', password='testpassword', email='other@gmail.com', role='Front Desk'
+        ))
+        status = client.get(f"/api/messaging/bulk-send/{response.data['job_id']}/")
+        self.assertEqual(status.status_code, 404)
+
+
+class ReminderJobTests(TestCase):
+    def setUp(self):
+        self.task, self.user = create_task()
+        PhoneNumber.objects.create(customer=self.task.customer, phone_number='+255712345678')
+        self.settings = SystemSettings.get_settings()
+        self.settings.auto_pickup_reminders_enabled = True
+        self.settings.auto_debt_reminders_enabled = True
+        self.settings.save()
+        self.now = timezone.now()
+
+    def _task(self, title, **fields):
+        return Task.objects.create(
+            title=title, created_by=self.user, customer=self.task.customer,
+            current_location=self.task.current_location, **fields,
+        )
+
+    def test_status_changes_schedule_and_clear_reminders(self):
+        task = self._task('A1-002', status=Task.Status.READY_FOR_PICKUP, approved_at=self.now)
+        self.assertEqual(task.next_pickup_reminder_at, self.now + timedelta(hours=24))
+
+        task.status = Task.Status.PICKED_UP
+        task.save(update_fields=['status'])
+        task.is_debt = True
+        task.save(update_fields=['is_debt'])
+        task.refresh_from_db()
+        self.assertIsNone(task.next_pickup_reminder_at)
+        self.assertIsNotNone(task.next_debt_reminder_at)
+
+        self.settings.debt_reminder_hours = 24
+        self.settings.save()
+        debt_due = task.next_debt_reminder_at
+        task.refresh_from_db()
+        self.assertEqual(task.next_debt_reminder_at, debt_due - timedelta(hours=48))
+
+    @mock.patch('messaging.jobs.send_pickup_reminder_sms', return_value={'success': True})
+    def test_pickup_job_reminds_due_tasks_once_per_interval(self, send_reminder):
+        due = [
+            self._task(f'A1-1{i:02d}', status=Task.Status.READY_FOR_PICKUP, approved_at=self.now - timedelta(hours=30))
+            for i in range(3)
+        ]
+        self._task('A1-200', status=Task.Status.READY_FOR_PICKUP, approved_at=self.now)
+
+        with mock.patch('messaging.jobs.REMINDER_CHUNK_SIZE', 2):
+            jobs.send_pickup_reminders()
+
+        self.assertEqual(sorted(c.args[0].pk for c in send_reminder.call_args_list), [task.pk for task in due])
+        self.assertFalse(MessageLog.objects.exists())
+        for task in due:
+            task.refresh_from_db()
+            self.assertGreater(task.next_pickup_reminder_at, self.now + timedelta(hours=23))
+
+        jobs.send_pickup_reminders()
+        self.assertEqual(send_reminder.call_count, 3)
+
+    @mock.patch('messaging.jobs.send_debt_reminder_sms', return_value={'success': True})
+    def test_debt_job_stops_after_the_reminder_window(self, send_reminder):
+        recent = self._task('A1-300', status=Task.Status.PICKED_UP, is_debt=True, latest_pickup_at=self.now)
+        old = self._task('A1-301', status=Task.Status.PICKED_UP, is_debt=True, latest_pickup_at=self.now)
+        Task.objects.filter(pk=old.pk).update(latest_pickup_at=self.now - timedelta(days=60))
+        Task.objects.update(next_debt_reminder_at=self.now - timedelta(minutes=1))
+
+        jobs.send_debt_reminders()
+
+        send_reminder.assert_called_once()
+        self.assertEqual(send_reminder.call_args.args[0], recent)
+        old.refresh_from_db()
+        self.assertIsNone(old.next_debt_reminder_at)
+
+    def test_scheduled_run_records_runtime_and_counts(self):
+        self._task('A1-400', status=Task.Status.READY_FOR_PICKUP, approved_at=self.now - timedelta(hours=30))
+        metrics.registry.reset()
+
+        # The worker's connection housekeeping would end the test transaction
+        with mock.patch('messaging.scheduler.close_old_connections'), \
+                mock.patch('messaging.jobs.send_pickup_reminder_sms', return_value={'success': True}):
+            counts = run_job('send_pickup_reminders')
+
+        self.assertEqual(counts, {'tasks_found': 1, 'messages_sent': 1, 'messages_failed': 0})
+        self.assertIsNotNone(SchedulerNotification.objects.get(job_type='pickup_reminder').duration_seconds)
+        output = metrics.render()
+        self.assertIn('scheduler_job_duration_seconds_count{job="send_pickup_reminders",result="ok"} 1', output)
+        self.assertIn('scheduler_job_items_total{job="send_pickup_reminders",kind="messages_sent"} 1', output)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Requires concurrent database connections')
+class SmsOutboxConcurrencyTests(TransactionTestCase):
+    def test_concurrent_workers_claim_disjoint_rows(self):
+        task, user = create_task()
+        MessageLog.objects.bulk_create([
+            MessageLog(task=task, recipient_phone='+255712345678', message_content=f'Message {i}',
+                       status='pending', sent_by=user, next_attempt_at=timezone.now() - timedelta(seconds=1))
+            for i in range(40)
+        ])
+        workers = 8
+        barrier = threading.Barrier(workers)
+        claimed = []
+
+        def claim():
+            try:
+                barrier.wait()
+                claimed.extend(row.pk for row in SmsOutbox.claim(10))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=claim) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(claimed), 40)
+        self.assertEqual(len(set(claimed)), 40)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Requires PostgreSQL advisory locks')
+class LeaderLockTests(TransactionTestCase):
+    def _acquire_in_other_session(self, lock):
+        results = []
+
+        def acquire():
+            try:
+                results.append(lock.acquire())
+            finally:
+                connection.close()  # Ending the session releases the lock
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        thread.join()
+        return results[0]
+
+    def test_only_one_session_holds_the_lock(self):
+        leader = LeaderLock(key=424242)
+        self.assertTrue(leader.acquire())
+        self.assertTrue(leader.held())
+
+        self.assertFalse(self._acquire_in_other_session(LeaderLock(key=424242)))
+
+        leader.release()
+        self.assertFalse(leader.held())
+        self.assertTrue(self._acquire_in_other_session(LeaderLock(key=424242)))
+
+
+class StubBriqHandler(BaseHTTPRequestHandler):
+    """Answers each send with the next status in server.statuses (default 200) and counts TCP connections."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        body = json.dumps({'success': status == 200, 'data': {}, 'message': 'stub'}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.requests += 1
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(BRIQ_RETRY_BACKOFF=0)
+class BriqClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubBriqHandler)
+        self.server.connections = self.server.requests = 0
+        self.server.statuses = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = BriqClient(api_key='test', base_url=f'http://127.0.0.1:{self.server.server_port}')
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_are_reused_across_sends(self):
+        for _ in range(1000):
+            self.assertTrue(self.client.send_sms('Habari', ['0712345678'])['success'])
+
+        self.assertEqual(self.server.requests, 1000)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_rejected_requests_are_retried_but_server_errors_are_not(self):
+        self.server.statuses = [503, 429]
+        self.assertTrue(self.client.send_sms('Habari', ['0712345678'])['success'])
+        self.assertEqual(self.server.requests, 3)
+
+        self.server.statuses = [500]
+        result = self.client.send_sms('Habari', ['0712345678'])
+        self.assertEqual((result['success'], result['retryable']), (False, True))
+        self.assertEqual(self.server.requests, 4)
@@ -13,6 +13,7 @@ urlpatterns = [
     path('tasks/<int:task_id>/send-debt-reminder/', views.send_debt_reminder, name='send-debt-reminder'),
     path('tasks/<int:task_id>/preview-message/', views.preview_template_message, name='preview-template-message'),
     path('bulk-send/', views.bulk_send_sms, name='bulk-send-sms'),
+    path('bulk-send/<int:pk>/', views.bulk_send_status, name='bulk-send-status'),
     path('scheduler-notifications/', views.get_scheduler_notifications, name='scheduler-notifications'),
     path('scheduler-notifications/<int:pk>/acknowledge/', views.acknowledge_scheduler_notification, name='acknowledge-scheduler-notification'),
 ]
@@ -4,9 +4,12 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 
-from Eapp.models import Task, TaskActivity
-from .models import MessageLog
-from .services import briq_client, send_debt_reminder_sms, build_template_message
+from Eapp.models import Task
+from .models import MessageLog, SmsCampaign
+from .campaigns import SmsCampaignRunner
+from .outbox import SmsOutbox
+from .reminders import DEBT, ReminderSchedule
+from .services import send_debt_reminder_sms, build_template_message
 from .serializers import SendSMSSerializer
 
 
@@ -36,53 +39,29 @@ def send_customer_sms(request, task_id):
     phone_number = serializer.validated_data['phone_number']
     message = serializer.validated_data['message']
     
-    # Create message log entry (pending)
-    message_log = MessageLog.objects.create(
-        task=task,
-        recipient_phone=phone_number,
-        message_content=message,
-        status='pending',
-        sent_by=request.user
+    # Queue for the outbox worker; the gateway is not called in the request
+    message_log = SmsOutbox.enqueue(
+        task, phone_number, message, request.user,
+        activity_message=f"SMS sent to {phone_number}"
     )
     
-    # Send SMS via Briq
-    result = briq_client.send_sms(
-        content=message,
-        recipients=[phone_number]
-    )
-    
-    # Update message log with result
-    if result.get('success'):
-        message_log.status = 'sent'
-        message_log.response_data = result.get('data')
-        message_log.save()
-        
-        # Log activity on the task
-        TaskActivity.objects.create(
-            task=task,
-            user=request.user,
-            type='sms_sent',
-            message=f"SMS sent to {phone_number}"
-        )
-        
-        return Response({
-            'success': True,
-            'message': 'SMS sent successfully',
-            'data': {
-                'recipient': phone_number,
-                'message_log_id': message_log.id
-            }
-        }, status=status.HTTP_200_OK)
-    else:
-        message_log.status = 'failed'
-        message_log.response_data = result
-        message_log.save()
-        
+    if message_log.status == 'failed':
         return Response({
             'success': False,
-            'error': result.get('error', 'Failed to send SMS'),
-            'details': result
+            'error': message_log.response_data.get('error', 'Failed to send SMS'),
+            'details': message_log.response_data
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    queued = message_log.status == 'pending'
+    return Response({
+        'success': True,
+        'message': 'SMS queued for sending' if queued else 'SMS sent successfully',
+        'data': {
+            'recipient': phone_number,
+            'message_log_id': message_log.id,
+            'queued': queued
+        }
+    }, status=status.HTTP_202_ACCEPTED if queued else status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -125,9 +104,11 @@ def send_debt_reminder(request, task_id):
     result = send_debt_reminder_sms(task, phone_number, request.user)
     
     if result.get('success'):
+        # Counts as this interval's reminder for the automated job
+        ReminderSchedule.postpone(DEBT, [task.pk])
         return Response({
             'success': True,
-            'message': 'Debt reminder sent successfully',
+            'message': 'Debt reminder queued for sending' if result.get('queued') else 'Debt reminder sent successfully',
             'data': {
                 'recipient': result.get('phone'),
                 'sms_content': result.get('message')
@@ -197,7 +178,7 @@ def preview_template_message(request, task_id):
 
 from rest_framework import viewsets
 from .models import MessageTemplate
-from .serializers import MessageTemplateSerializer, BulkSendSMSSerializer, MessageLogSerializer
+from .serializers import MessageTemplateSerializer, BulkSendSMSSerializer, MessageLogSerializer, SmsCampaignSerializer
 
 class MessageTemplateViewSet(viewsets.ModelViewSet):
     """
@@ -242,6 +223,7 @@ class MessageLogViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = MessageLogSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
+    keyset_ordering = ('-sent_at', '-id')
     filterset_class = MessageLogFilter
 
 
@@ -254,75 +236,52 @@ from common.encryption import decrypt_value
 def bulk_send_sms(request):
     """
     Send SMS to multiple tasks/customers.
+
+    The messages are sent in the background as an SmsCampaign; progress is
+    pushed over the notifications WebSocket and can be polled at
+    bulk-send/<job_id>/.
     """
     serializer = BulkSendSMSSerializer(data=request.data)
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
-    recipients_data = serializer.validated_data['recipients'] # List of {task_id, phone}
-    task_ids = [int(r['task_id']) for r in recipients_data]
-    
+
     message_content, error_response = _resolve_bulk_message_content(serializer.validated_data)
     if error_response:
         return error_response
-    
-    # Get company info for placeholders
-    from settings.models import SystemSettings
-    system_settings = SystemSettings.get_settings()
-    company_name = system_settings.company_name or 'A PLUS EXPRESS TECHNOLOGIES LTD'
-    company_phones = system_settings.company_phone_numbers or []
-    
-    # Build contact info string
-    contact_info_str = ''
-    if company_phones:
-        phones_str = ', '.join(company_phones)
-        contact_info_str = f" Wasiliana nasi: {phones_str}."
-    
-    # Fetch tasks
-    tasks = Task.objects.filter(id__in=task_ids).select_related('customer')
-    task_map = {task.id: task for task in tasks}
-    
-    success_count = 0
-    failed_count = 0
-    errors = []
-    
-    for recipient in recipients_data:
-        task_id = int(recipient['task_id'])
-        phone_number = recipient.get('phone')
-        
-        task = task_map.get(task_id)
-        if not task:
-            failed_count += 1
-            errors.append(f"Task {task_id} not found")
-            continue
-
-        if not phone_number:
-            failed_count += 1
-            errors.append(f"Task {task_id}: No phone number provided")
-            continue
-
-        final_message = _format_bulk_message(
-            task, message_content, template_key, 
-            system_settings, company_name, contact_info_str
-        )
-        
-        is_success, error_msg = _send_single_bulk_sms(task, phone_number, final_message, request.user)
-        
-        if is_success:
-            success_count += 1
-        else:
-            failed_count += 1
-            errors.append(f"Task {task.id}: {error_msg}")
+
+    recipients_data = serializer.validated_data['recipients'] # List of {task_id, phone}
+    campaign = SmsCampaignRunner.create(
+        request.user, recipients_data, message_content,
+        template_key=serializer.validated_data.get('template_key'),
+    )
 
     return Response({
         'success': True,
+        'job_id': campaign.id,
         'summary': {
-            'total_attempted': len(tasks),
-            'sent': success_count,
-            'failed': failed_count,
+            'total_attempted': campaign.total,
+            'queued': campaign.total,
+            'sent': 0,
+            'failed': 0,
         },
-        'errors': errors
-    })
+        'errors': []
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bulk_send_status(request, pk):
+    """
+    Progress of a bulk send started by bulk_send_sms.
+
+    Only the campaign's creator and managers can see it.
+    """
+    campaigns = SmsCampaign.objects.all()
+    if not (request.user.is_superuser or request.user.role == 'Manager'):
+        campaigns = campaigns.filter(created_by=request.user)
+    campaign = get_object_or_404(campaigns, pk=pk)
+    return Response(SmsCampaignSerializer(campaign).data)
+
 
 def _resolve_bulk_message_content(validated_data):
     manual_message = validated_data.get('message')
@@ -343,85 +302,6 @@ def _resolve_bulk_message_content(validated_data):
     message_content = message_content.replace('\n', ' ').replace('\r', '').strip()
     return message_content, None
 
-def _format_bulk_message(task, base_message, template_key, system_settings, company_name, contact_info_str):
-    final_message = base_message
-    
-    if template_key == 'ready_for_pickup':
-        from messaging.services import TEMPLATE_READY_SOLVED, TEMPLATE_READY_NOT_SOLVED
-        if task.workshop_status == 'Solved':
-            final_message = TEMPLATE_READY_SOLVED
-        elif task.workshop_status == 'Not Solved':
-            final_message = TEMPLATE_READY_NOT_SOLVED
-            
-    final_message = final_message.replace('{customer}', task.customer.name)
-    final_message = final_message.replace('{device}', f"{task.brand or ''} {task.laptop_model or ''}".strip() or "Device")
-    final_message = final_message.replace('{taskId}', task.title)
-    
-    description = task.description or "Unknown Issue"
-    final_message = final_message.replace('{DESCRIPTION}', description.upper())
-    final_message = final_message.replace('{description}', description)
-    final_message = final_message.replace('{notes}', task.device_notes or '')
-    
-    status_map = {
-        'Pending': 'Imepokelewa',
-        'In Progress': 'Inashughulikiwa',
-        'Ready for Pickup': 'Ipo Tayari',
-        'Picked Up': 'Imeshachukuliwa',
-        'Completed': 'Imekamilika',
-    }
-    final_message = final_message.replace('{status}', status_map.get(task.status, task.status))
-    
-    amount_val = str(task.total_cost)
-    if hasattr(task, 'total_cost') and task.total_cost:
-        amount_val = "{:,.0f}".format(task.total_cost)
-    final_message = final_message.replace('{amount}', amount_val)
-    
-    outstanding = task.total_cost - task.paid_amount
-    outstanding_str = "{:,.0f}".format(outstanding) if outstanding > 0 else "0"
-    final_message = final_message.replace('{outstanding_balance}', outstanding_str)
-    
-    final_message = final_message.replace('{company_name}', company_name)
-    final_message = final_message.replace('{contact_info}', contact_info_str)
-    final_message = final_message.replace('{storage_fee}', f'{system_settings.storage_fee_per_day:,}')
-    final_message = final_message.replace('{pickup_deadline_days}', str(system_settings.pickup_deadline_days))
-    
-    return final_message
-
-def _send_single_bulk_sms(task, phone_number, final_message, request_user):
-    from .models import MessageLog
-    from Eapp.models import TaskActivity
-    from .services import briq_client
-    
-    log = MessageLog.objects.create(
-        task=task,
-        recipient_phone=phone_number,
-        message_content=final_message,
-        status='pending',
-        sent_by=request_user
-    )
-    
-    result = briq_client.send_sms(content=final_message, recipients=[phone_number])
-    
-    if result.get('success'):
-        log.status = 'sent'
-        log.response_data = result.get('data')
-        TaskActivity.objects.create(
-            task=task,
-            user=request_user,
-            type='sms_sent',
-            message="Bulk SMS sent"
-        )
-        is_success = True
-        error_msg = None
-    else:
-        log.status = 'failed'
-        log.response_data = result
-        is_success = False
-        error_msg = result.get('error')
-    
-    log.save()
-    return is_success, error_msg
-
 
 # --- Scheduler Notification Endpoints ---
 from .models import SchedulerNotification
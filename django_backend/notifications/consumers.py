@@ -117,3 +117,10 @@ class NotificationConsumer(AsyncJsonWebsocketConsumer):
         Called when channel_layer.group_send is used with type='data.update'
         """
         await self.send_json(event['data'])
+
+    async def sms_campaign_progress(self, event):
+        """
+        Handler for bulk SMS progress messages.
+        Called when channel_layer.group_send is used with type='sms.campaign.progress'
+        """
+        await self.send_json(event['data'])
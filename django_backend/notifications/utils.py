@@ -8,6 +8,7 @@ import uuid
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
+
 logger = logging.getLogger(__name__)
 
 # Centralized role-to-group mapping.
@@ -179,6 +180,24 @@ def broadcast_task_status_update(task_id: str, new_status: str, updated_fields:
     _send_to_groups(groups, 'task.status.update', data)
 
 
+def broadcast_tasks_bulk_update(task_ids: list, operation: str, updated_fields: list = None):
+    """
+    Broadcast one coalesced update for a bulk task operation.
+    Replaces a task_status_update per task so clients refresh once.
+    
+    Args:
+        task_ids: Titles/IDs of the tasks that changed
+        operation: Bulk operation name (e.g. 'assign', 'transition', 'relocate')
+        updated_fields: List of field names that were changed
+    """
+    broadcast_data_update(ALL_ROLES, {
+        'type': 'tasks_bulk_update',
+        'operation': operation,
+        'task_ids': task_ids,
+        'updated_fields': updated_fields or [],
+    })
+
+
 def send_toast_to_user(user, toast_type: str, data: dict = None):
     """
     Send a toast notification to a specific user via WebSocket.
@@ -3,6 +3,7 @@
 from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta, datetime, time
+from Eapp.utils.execution_hours import execution_hours
 
 
 class ReportGeneratorBase:
@@ -101,30 +102,6 @@ class ReportGeneratorBase:
         filter_kwargs = {f'{field}__gte': start_datetime, f'{field}__lte': datetime.combine(end_date, time.max)}
         return Q(**filter_kwargs), actual_range, duration_days, duration_description, start_date, end_date
 
-    @staticmethod
-    def _calculate_period_hours(periods, completed_at, start_field, end_field):
-        total_hours = 0
-        if not periods:
-            return total_hours
-            
-        for period in periods:
-            if not period.get(start_field):
-                continue
-                
-            start_time = datetime.fromisoformat(period[start_field])
-            start_time = ReportGeneratorBase._make_datetime_aware(start_time)
-            
-            if period.get(end_field):
-                end_time = datetime.fromisoformat(period[end_field])
-                end_time = ReportGeneratorBase._make_datetime_aware(end_time)
-            else:
-                end_time = completed_at
-                
-            duration = end_time - start_time
-            total_hours += duration.total_seconds() / 3600
-            
-        return total_hours
-
     @staticmethod
     def calculate_net_execution_hours(task):
         """
@@ -132,26 +109,15 @@ class ReportGeneratorBase:
         
         Net execution time = (completed_at - first_assigned_at) - return_periods - workshop_periods
         
+        Uses the stored net_execution_hours column when it is set.
+        
         Args:
             task: Task object with first_assigned_at, completed_at, return_periods, workshop_periods
             
         Returns:
             float: Net execution hours (0 if task not completed or not assigned)
         """
-        if not task.first_assigned_at or not task.completed_at:
-            return 0
-        
-        # Calculate gross hours
-        gross_duration = task.completed_at - task.first_assigned_at
-        gross_hours = gross_duration.total_seconds() / 3600
-        
-        # Calculate return and workshop hours
-        total_return_hours = ReportGeneratorBase._calculate_period_hours(
-            task.return_periods, task.completed_at, 'returned_at', 'reassigned_at'
-        )
-        total_workshop_hours = ReportGeneratorBase._calculate_period_hours(
-            task.workshop_periods, task.completed_at, 'sent_at', 'returned_at'
-        )
-        
-        # Return net hours (never negative)
-        return max(0, gross_hours - total_return_hours - total_workshop_hours)
+        if task.net_execution_hours is not None:
+            return task.net_execution_hours
+        net_hours, _, _ = execution_hours(task)
+        return net_hours or 0
@@ -6,7 +6,7 @@ from django.core.paginator import Paginator
 from datetime import timedelta
 from Eapp.models import Task
 from financials.models import Payment
-from common.encryption import decrypt_value
+from customers.services import CustomerHandler
 from .base import ReportGeneratorBase
 
 
@@ -37,7 +37,7 @@ class FinancialReportGenerator(ReportGeneratorBase):
         outstanding_tasks_qs = (
             Task.objects.filter(base_query)
             .select_related("customer")
-            .prefetch_related("payments", "customer__phone_numbers", "cost_breakdowns")
+            .prefetch_related(CustomerHandler.phone_numbers_prefetch("customer__phone_numbers"))
             .with_outstanding_balance()
             .filter(outstanding_balance__gt=0)
             .order_by('-outstanding_balance')
@@ -45,20 +45,17 @@ class FinancialReportGenerator(ReportGeneratorBase):
 
         if pdf_export:
             # For PDF, we want Top 20 (Highest Balance) and "Last 20" (Lowest Balance)
-            top_20_qs = outstanding_tasks_qs[:20]
-            bottom_20_qs = outstanding_tasks_qs.reverse()[:20]
+            top_20 = list(outstanding_tasks_qs[:20])
+            bottom_20 = list(outstanding_tasks_qs.reverse()[:20])
+            phones = CustomerHandler.primary_phones(t.customer for t in top_20 + bottom_20)
             
             def serialize_task(t):
                 days_overdue = ((timezone.now().date() - t.date_in).days if t.date_in else 0)
-                customer_phone = "Not provided"
-                if hasattr(t.customer, "phone_numbers") and t.customer.phone_numbers.exists():
-                    encrypted_phone = t.customer.phone_numbers.first().phone_number
-                    customer_phone = decrypt_value(encrypted_phone) or encrypted_phone
                 
                 return {
                     "task_id": t.title,
                     "customer_name": t.customer.name,
-                    "customer_phone": customer_phone,
+                    "customer_phone": phones.get(t.customer_id, "Not provided"),
                     "total_cost": float(t.total_cost or 0),
                     "paid_amount": float(t.paid_amount or 0),
                     "outstanding_balance": float(t.outstanding_balance),
@@ -69,8 +66,8 @@ class FinancialReportGenerator(ReportGeneratorBase):
                 }
 
             pdf_data = {
-                "top_20": [serialize_task(t) for t in top_20_qs],
-                "bottom_20": [serialize_task(t) for t in bottom_20_qs]
+                "top_20": [serialize_task(t) for t in top_20],
+                "bottom_20": [serialize_task(t) for t in bottom_20]
             }
             
             total_outstanding = outstanding_tasks_qs.aggregate(total=Sum('outstanding_balance'))['total'] or 0
@@ -94,6 +91,8 @@ class FinancialReportGenerator(ReportGeneratorBase):
 
         paginator = Paginator(outstanding_tasks_qs, page_size)
         paginated_tasks = paginator.get_page(page)
+        # Decrypt the whole page's phone numbers in one batch
+        phones = CustomerHandler.primary_phones(task.customer for task in paginated_tasks)
 
         tasks_data = []
         for task in paginated_tasks:
@@ -101,19 +100,10 @@ class FinancialReportGenerator(ReportGeneratorBase):
                 (timezone.now().date() - task.date_in).days if task.date_in else 0
             )
 
-            customer_phone = "Not provided"
-            if (
-                hasattr(task.customer, "phone_numbers")
-                and task.customer.phone_numbers.exists()
-            ):
-                # Decrypt phone number before displaying
-                encrypted_phone = task.customer.phone_numbers.first().phone_number
-                customer_phone = decrypt_value(encrypted_phone) or encrypted_phone
-
             tasks_data.append({
                 "task_id": task.title,
                 "customer_name": task.customer.name,
-                "customer_phone": customer_phone,
+                "customer_phone": phones.get(task.customer_id, "Not provided"),
                 "total_cost": float(task.total_cost or 0),
                 "paid_amount": float(task.paid_amount or 0),
                 "outstanding_balance": float(task.outstanding_balance),
@@ -1,12 +1,14 @@
 # reports/generators/operational.py
 """Operational report generators for task status and execution."""
-from django.db.models import Count, Q, F
+from django.db.models import Avg, Count, DateTimeField, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Trunc
 from django.utils import timezone
 from django.core.paginator import Paginator
-from datetime import datetime, timedelta
+from datetime import timedelta
 import pytz
 from Eapp.models import Task
-from common.encryption import decrypt_value
+from reports.models import DailyTaskRollup
+from customers.services import CustomerHandler
 from .base import ReportGeneratorBase
 
 
@@ -21,14 +23,22 @@ class OperationalReportGenerator(ReportGeneratorBase):
             ReportGeneratorBase.get_date_filter(date_range, start_date, end_date, field='date_in')
         )
         
-        # Filter tasks by date range
-        filtered_tasks = Task.objects.filter(date_filter)
-        
-        status_counts = (
-            filtered_tasks.values("status").annotate(count=Count("id")).order_by("-count")
-        )
+        # Ranges longer than a day read the daily rollup instead of scanning tasks
+        if start_date and end_date and start_date < end_date:
+            counted = DailyTaskRollup.objects.filter(day__gte=start_date, day__lte=end_date)
+            task_count = Sum('count')
+            model_field = 'model'
+        else:
+            counted = Task.objects.filter(date_filter)
+            task_count = Count('id')
+            model_field = 'laptop_model'
+
+        def grouped(field):
+            return counted.values(field).annotate(count=task_count).filter(count__gt=0).order_by('-count')
 
-        total_tasks = filtered_tasks.count()
+        status_counts = grouped('status')
+
+        total_tasks = counted.aggregate(total=task_count)['total'] or 0
 
         # Calculate percentages
         status_data = []
@@ -41,45 +51,40 @@ class OperationalReportGenerator(ReportGeneratorBase):
             })
 
         # Urgency distribution
-        urgency_counts = filtered_tasks.values("urgency").annotate(count=Count("id"))
-
-        # Most popular brand and model
-        popular_brand = filtered_tasks.values('brand__name').annotate(brand_count=Count('brand')).order_by('-brand_count').first()
-        popular_model = filtered_tasks.values('laptop_model__name').annotate(model_count=Count('laptop_model')).order_by('-model_count').first()
+        urgency_counts = grouped('urgency')
 
-        # Top 5 brands and models
-        top_brands = list(filtered_tasks.values('brand__name').annotate(count=Count('brand')).order_by('-count').filter(brand__name__isnull=False)[:5])
-        top_models_query = list(filtered_tasks.values('laptop_model__name').annotate(count=Count('laptop_model')).order_by('-count').filter(laptop_model__name__isnull=False)[:5])
-        top_models = [{'laptop_model': item['laptop_model__name'], 'count': item['count']} for item in top_models_query]
+        # Top 5 brands and models; the most popular is the first of each
+        top_brands = list(grouped('brand__name').filter(brand__name__isnull=False)[:5])
+        top_models_query = list(grouped(f'{model_field}__name').filter(**{f'{model_field}__name__isnull': False})[:5])
+        top_models = [{'laptop_model': item[f'{model_field}__name'], 'count': item['count']} for item in top_models_query]
 
         # Calculate overdue pickup count
         overdue_threshold = timezone.now() - timedelta(days=7)
         overdue_tasks_query = Task.objects.filter(
             status='Ready for Pickup',
             ready_for_pickup_at__lte=overdue_threshold
-        ).select_related('customer').order_by('ready_for_pickup_at')[:10]
+        ).select_related('customer').prefetch_related(
+            CustomerHandler.phone_numbers_prefetch('customer__phone_numbers')
+        ).order_by('ready_for_pickup_at')[:10]
         
         overdue_pickup_count = Task.objects.filter(
             status='Ready for Pickup',
             ready_for_pickup_at__lte=overdue_threshold
         ).count()
 
+        overdue_tasks_query = list(overdue_tasks_query)
+        phones = CustomerHandler.primary_phones(t.customer for t in overdue_tasks_query)
+
         overdue_tasks_list = []
         for t in overdue_tasks_query:
             total_days_ready = (timezone.now() - t.ready_for_pickup_at).days if t.ready_for_pickup_at else 0
             days_overdue = max(0, total_days_ready - 7)
-            
-            # Decrypt phone if needed
-            customer_phone = "N/A"
-            if t.customer and hasattr(t.customer, "phone_numbers") and t.customer.phone_numbers.exists():
-                encrypted_phone = t.customer.phone_numbers.first().phone_number
-                customer_phone = decrypt_value(encrypted_phone) or encrypted_phone
 
             overdue_tasks_list.append({
                 "id": t.id,
                 "title": t.title,
                 "customer_name": t.customer.name if t.customer else "N/A",
-                "customer_phone": customer_phone,
+                "customer_phone": phones.get(t.customer_id, "N/A"),
                 "ready_since": t.ready_for_pickup_at.isoformat() if t.ready_for_pickup_at else None,
                 "days_overdue": days_overdue
             })
@@ -90,8 +95,8 @@ class OperationalReportGenerator(ReportGeneratorBase):
             "total_tasks": total_tasks,
             "overdue_pickup_count": overdue_pickup_count,
             "overdue_tasks": overdue_tasks_list,
-            "popular_brand": popular_brand['brand__name'] if popular_brand and popular_brand['brand__name'] else "N/A",
-            "popular_model": popular_model['laptop_model__name'] if popular_model and popular_model['laptop_model__name'] else "N/A",
+            "popular_brand": top_brands[0]['brand__name'] if top_brands else "N/A",
+            "popular_model": top_models[0]['laptop_model'] if top_models else "N/A",
             "top_brands": top_brands,
             "top_models": top_models,
             "generated_at": timezone.now(),
@@ -112,18 +117,21 @@ class OperationalReportGenerator(ReportGeneratorBase):
             ReportGeneratorBase.get_date_filter(date_range, start_date, end_date, field='completed_at')
         )
         
-        # Query tasks with both assignment and completion times
-        tasks = (
-            Task.objects.filter(
-                date_filter,
-                first_assigned_at__isnull=False,
-                completed_at__isnull=False,
-            )
-            .select_related('customer')
-            .order_by('-completed_at')
+        # Tasks with stored execution hours (set once both assigned and completed)
+        tasks = Task.objects.filter(date_filter, net_execution_hours__isnull=False)
+        in_workshop = Q(workshop_hours__gt=0)
+        summary = tasks.aggregate(
+            overall_avg=Avg('net_execution_hours'),
+            fastest=Min('net_execution_hours'),
+            slowest=Max('net_execution_hours'),
+            overall_avg_workshop=Avg('workshop_hours', filter=in_workshop),
+            total_tasks_workshop=Count('id', filter=in_workshop),
+            total_tasks=Count('id'),
+            total_returns=Sum('return_count'),
+            tasks_with_returns=Count('id', filter=Q(return_count__gt=0)),
         )
         
-        if not tasks.exists():
+        if not summary['total_tasks']:
             return {
                 "periods": [],
                 "task_details": [],
@@ -154,79 +162,43 @@ class OperationalReportGenerator(ReportGeneratorBase):
             else:
                 period_type = 'quarterly'
 
-        grouped_data = {}
-        task_details = []
-        all_execution_hours = []
-        all_workshop_hours = []
         utc_plus_3 = pytz.timezone('Etc/GMT-3')
         
-        for task in tasks:
-            # Calculate execution time in hours (Net Execution Time)
-            gross_duration = task.completed_at - task.first_assigned_at
-            gross_hours = gross_duration.total_seconds() / 3600
-            
-            total_return_hours = 0
-            if task.return_periods:
-                for period in task.return_periods:
-                    if period.get('returned_at'):
-                        returned_at = datetime.fromisoformat(period['returned_at'])
-                        if timezone.is_naive(returned_at):
-                            returned_at = timezone.make_aware(returned_at)
-                            
-                        if period.get('reassigned_at'):
-                            reassigned_at = datetime.fromisoformat(period['reassigned_at'])
-                            if timezone.is_naive(reassigned_at):
-                                reassigned_at = timezone.make_aware(reassigned_at)
-                        else:
-                            reassigned_at = task.completed_at
-                            
-                        return_duration =reassigned_at - returned_at
-                        total_return_hours += return_duration.total_seconds() / 3600
-
-            # Subtract workshop periods
-            total_workshop_hours = 0
-            if task.workshop_periods:
-                for period in task.workshop_periods:
-                    if period.get('sent_at'):
-                        sent_at = datetime.fromisoformat(period['sent_at'])
-                        if timezone.is_naive(sent_at):
-                            sent_at = timezone.make_aware(sent_at)
-                            
-                        if period.get('returned_at'):
-                            returned_at = datetime.fromisoformat(period['returned_at'])
-                            if timezone.is_naive(returned_at):
-                                returned_at = timezone.make_aware(returned_at)
-                        else:
-                            returned_at = task.completed_at
-                            
-                        workshop_duration = returned_at - sent_at
-                        total_workshop_hours += workshop_duration.total_seconds() / 3600
-            
-            net_hours = max(0, gross_hours - total_return_hours - total_workshop_hours)
-            
-            # Group by period
-            local_completion = task.completed_at.astimezone(utc_plus_3)
-            
-            if period_type == "daily":
-                period_key = local_completion.strftime("%Y-%m-%d")
-            elif period_type == "weekly":
-                period_key = local_completion.strftime("%Y-W%U")
-            elif period_type == "monthly":
-                period_key = local_completion.strftime("%Y-%m")
-            elif period_type == "quarterly":
-                quarter = (local_completion.month - 1) // 3 + 1
-                period_key = f"{local_completion.year}-Q{quarter}"
-            else:
-                period_key = "overall"
-            
-            if period_key not in grouped_data:
-                grouped_data[period_key] = {'execution': [], 'workshop': []}
-            grouped_data[period_key]['execution'].append(net_hours)
-            grouped_data[period_key]['workshop'].append(total_workshop_hours)
-            
-            all_execution_hours.append(net_hours)
-            all_workshop_hours.append(total_workshop_hours)
-            
+        # Period statistics, bucketed by local completion date in SQL
+        trunc_kinds = {'daily': 'day', 'weekly': 'week', 'monthly': 'month', 'quarterly': 'quarter'}
+        if period_type in trunc_kinds:
+            period_rows = tasks.annotate(
+                period_start=Trunc('completed_at', trunc_kinds[period_type], tzinfo=utc_plus_3)
+            ).values('period_start')
+        else:
+            period_rows = tasks.annotate(period_start=Value(None, output_field=DateTimeField())).values('period_start')
+        period_rows = period_rows.annotate(
+            average_execution_hours=Avg('net_execution_hours'),
+            average_workshop_hours=Avg('workshop_hours', filter=in_workshop),
+            workshop_count=Count('id', filter=in_workshop),
+            tasks_completed=Count('id'),
+        ).order_by('period_start')
+        
+        periods_data = []
+        for row in period_rows:
+            periods_data.append({
+                "period": OperationalReportGenerator._format_execution_period(row['period_start'], period_type),
+                "average_execution_hours": round(row['average_execution_hours'], 1),
+                "average_workshop_hours": round(row['average_workshop_hours'] or 0, 1),
+                "workshop_count": row['workshop_count'],
+                "tasks_completed": row['tasks_completed'],
+            })
+        
+        # Task details, slowest first, paginated in SQL
+        detail_tasks = tasks.select_related('customer').only(
+            'title', 'customer__name', 'first_assigned_at', 'completed_at', 'execution_technicians',
+            'net_execution_hours', 'workshop_hours', 'return_count', 'estimated_cost',
+        )
+        slowest_first = detail_tasks.order_by('-net_execution_hours', '-completed_at')
+        paginator = Paginator(slowest_first, page_size)
+        paginated_tasks = paginator.get_page(page)
+        
+        def task_detail(task):
             # Format technicians list
             technicians_str = "Unassigned"
             if task.execution_technicians:
@@ -237,77 +209,17 @@ class OperationalReportGenerator(ReportGeneratorBase):
             local_start = task.first_assigned_at.astimezone(utc_plus_3)
             local_end = task.completed_at.astimezone(utc_plus_3)
             
-            # Build task detail
-            task_details.append({
+            return {
                 "task_title": task.title,
                 "customer_name": task.customer.name if task.customer else "N/A",
                 "execution_start": local_start.strftime("%b %d, %Y %I:%M %p"),
                 "execution_end": local_end.strftime("%b %d, %Y %I:%M %p"),
                 "technicians": technicians_str,
                 "technician_count": len(task.execution_technicians),
-                "execution_hours": round(net_hours, 1),
-                "workshop_hours": round(total_workshop_hours, 1),
+                "execution_hours": round(task.net_execution_hours, 1),
+                "workshop_hours": round(task.workshop_hours or 0, 1),
                 "return_count": task.return_count,
-            })
-        
-        # Calculate period statistics
-        periods_data = []
-        
-        for period, metrics in grouped_data.items():
-            exec_hours = metrics['execution']
-            workshop_hours = metrics['workshop']
-            
-            avg_exec = sum(exec_hours) / len(exec_hours) if exec_hours else 0
-            
-            # Calculate workshop metrics for period
-            workshop_tasks = [h for h in workshop_hours if h > 0]
-            avg_workshop = sum(workshop_tasks) / len(workshop_tasks) if workshop_tasks else 0
-            
-            periods_data.append({
-                "period": period,
-                "average_execution_hours": round(avg_exec, 1),
-                "average_workshop_hours": round(avg_workshop, 1),
-                "workshop_count": len(workshop_tasks),
-                "tasks_completed": len(exec_hours),
-            })
-        
-        periods_data.sort(key=lambda x: x["period"])
-
-        # Reformat periods for display (Human Readable)
-        if period_type == 'daily':
-            for p in periods_data:
-                try:
-                    p['period'] = datetime.strptime(p['period'], "%Y-%m-%d").strftime("%b %d, %Y")
-                except Exception: pass
-        elif period_type == 'monthly':
-            for p in periods_data:
-                try:
-                    p['period'] = datetime.strptime(p['period'], "%Y-%m").strftime("%b %Y")
-                except Exception: pass
-        elif period_type == 'weekly':
-            for p in periods_data:
-                try:
-                    year, week = p['period'].split('-W')
-                    p['period'] = f"Week {week}, {year}"
-                except Exception: pass
-        
-        # Sort by execution time (slowest first)
-        task_details.sort(key=lambda x: x["execution_hours"], reverse=True)
-        
-        # Paginate
-        paginator = Paginator(task_details, page_size)
-        paginated_tasks = paginator.get_page(page)
-        
-        # Calculate summary
-        overall_avg = sum(all_execution_hours) / len(all_execution_hours) if all_execution_hours else 0
-        
-        # Workshop summary
-        tasks_with_workshop = [h for h in all_workshop_hours if h > 0]
-        overall_avg_workshop = sum(tasks_with_workshop) / len(tasks_with_workshop) if tasks_with_workshop else 0
-        total_tasks_workshop = len(tasks_with_workshop)
-        
-        total_returns = sum(t["return_count"] for t in task_details)
-        tasks_with_returns = sum(1 for t in task_details if t["return_count"] > 0)
+            }
         
         # Calculate best period (fastest average execution)
         best_period = None
@@ -317,19 +229,22 @@ class OperationalReportGenerator(ReportGeneratorBase):
 
         return {
             "periods": periods_data,
-            "task_details": list(paginated_tasks),
+            "task_details": [task_detail(task) for task in paginated_tasks],
             "summary": {
-                "overall_average_hours": round(overall_avg, 1),
-                "overall_average_workshop_hours": round(overall_avg_workshop, 1),
-                "total_tasks_workshop": total_tasks_workshop,
-                "fastest_task_hours": round(min(all_execution_hours), 1) if all_execution_hours else 0,
-                "slowest_task_hours": round(max(all_execution_hours), 1) if all_execution_hours else 0,
-                "top_5_fastest": task_details[-5:][::-1] if len(task_details) > 0 else [],
-                "top_5_slowest": task_details[:5] if len(task_details) > 0 else [],
+                "overall_average_hours": round(summary['overall_avg'], 1),
+                "overall_average_workshop_hours": round(summary['overall_avg_workshop'] or 0, 1),
+                "total_tasks_workshop": summary['total_tasks_workshop'],
+                "fastest_task_hours": round(summary['fastest'], 1),
+                "slowest_task_hours": round(summary['slowest'], 1),
+                "top_5_fastest": [
+                    task_detail(task)
+                    for task in detail_tasks.order_by('net_execution_hours', 'completed_at')[:5]
+                ],
+                "top_5_slowest": [task_detail(task) for task in slowest_first[:5]],
                 "best_period": best_period,
-                "total_tasks_analyzed": len(task_details),
-                "total_returns": total_returns,
-                "tasks_with_returns": tasks_with_returns,
+                "total_tasks_analyzed": summary['total_tasks'],
+                "total_returns": summary['total_returns'] or 0,
+                "tasks_with_returns": summary['tasks_with_returns'],
             },
             "date_range": actual_date_range,
             "duration_info": {
@@ -347,3 +262,18 @@ class OperationalReportGenerator(ReportGeneratorBase):
                 "has_previous": paginated_tasks.has_previous(),
             }
         }
+    
+    @staticmethod
+    def _format_execution_period(period_start, period_type):
+        """Human readable label for a task execution period bucket."""
+        if period_start is None:
+            return "overall"
+        if period_type == 'daily':
+            return period_start.strftime("%b %d, %Y")
+        if period_type == 'weekly':
+            year, week, _ = period_start.isocalendar()
+            return f"Week {week:02d}, {year}"
+        if period_type == 'monthly':
+            return period_start.strftime("%b %Y")
+        quarter = (period_start.month - 1) // 3 + 1
+        return f"{period_start.year}-Q{quarter}"
@@ -1,8 +1,8 @@
 # reports/generators/technician.py
 """Technician-related report generators."""
-from django.db.models import Count, Q
-from django.utils import timezone
-from Eapp.models import Task, User, TaskActivity
+from django.db.models import Count, Exists, FloatField, Func, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from Eapp.models import Task, User, TaskAssignment
 from .base import ReportGeneratorBase
 
 _PICKED_UP = "Picked Up"
@@ -15,12 +15,38 @@ class TechnicianReportGenerator(ReportGeneratorBase):
     @staticmethod
     def generate_performance(date_range='last_7_days', start_date=None, end_date=None):
         """Generate comprehensive technician performance report with task status grouping."""
-        date_filter_q, actual_date_range, duration_days, duration_description, start_date, end_date = (
-            ReportGeneratorBase.get_date_filter(date_range, field="timestamp", start_date=start_date, end_date=end_date)
+        def in_range(field):
+            return ReportGeneratorBase.get_date_filter(date_range, field=field, start_date=start_date, end_date=end_date)
+
+        updated_in_range = in_range("updated_at")[0]
+        assignment_completed_in_range = in_range("task__completed_at")[0]
+        completed_in_range, actual_date_range, duration_days, duration_description, start_date, end_date = (
+            in_range("completed_at")
+        )
+        completion_statuses = ["Completed", "Ready for Pickup", _PICKED_UP]
+        # Tasks in the period: completed within the date range, or currently in progress
+        period_completed = Q(status__in=completion_statuses) & completed_in_range
+        # Per-technician completions also count tasks without completed_at by their last update
+        tech_completed = Q(status__in=completion_statuses) & (
+            completed_in_range | (Q(completed_at__isnull=True) & updated_in_range)
         )
+        in_progress = Q(status=_IN_PROGRESS)
 
-        technicians = User.objects.filter(role="Technician", is_active=True)
-        if not technicians.exists():
+        # Average net execution hours over the distinct tasks completed in the period
+        # that each technician worked on, including ones since reassigned
+        timed_tasks = Task.objects.filter(
+            completed_in_range,
+            Exists(TaskAssignment.objects.filter(task=OuterRef('pk'), user=OuterRef(OuterRef('pk')))),
+            first_assigned_at__isnull=False,
+            assigned_to__role="Technician",
+            assigned_to__is_active=True,
+        ).order_by().annotate(
+            avg_hours=Func(Coalesce('net_execution_hours', Value(0.0)), function='AVG', output_field=FloatField())
+        ).values('avg_hours')[:1]
+        technicians = list(
+            User.objects.filter(role="Technician", is_active=True).annotate(avg_completion_hours=Subquery(timed_tasks))
+        )
+        if not technicians:
             return {
                 "technician_performance": [],
                 "date_range": actual_date_range,
@@ -29,131 +55,70 @@ class TechnicianReportGenerator(ReportGeneratorBase):
             }
 
         technician_ids = [t.id for t in technicians]
-        
-        # Bulk fetch tasks and activities
-        tasks = Task.objects.filter(assigned_to_id__in=technician_ids).select_related('customer', 'laptop_model')
-        activities = TaskActivity.objects.filter(
-            user_id__in=technician_ids,
-            timestamp__gte=date_filter_q.children[0][1],
-            timestamp__lte=date_filter_q.children[1][1] if len(date_filter_q.children) > 1 else timezone.now()
-        )
+        tasks = Task.objects.filter(assigned_to_id__in=technician_ids).order_by()
+
+        # Per-technician counts in one grouped query
+        counts_by_tech = {
+            row['assigned_to_id']: row
+            for row in tasks.values('assigned_to_id').annotate(
+                completed=Count('id', filter=tech_completed),
+                solved=Count('id', filter=tech_completed & Q(workshop_status="Solved")),
+                not_solved=Count('id', filter=tech_completed & Q(workshop_status="Not Solved")),
+                in_progress=Count('id', filter=in_progress & ~Q(workshop_status="In Workshop")),
+                in_workshop=Count('id', filter=in_progress & Q(workshop_status="In Workshop")),
+                sent_to_workshop=Count('id', filter=~Q(workshop_periods=[])),
+                total=Count('id'),
+            )
+        }
 
-        # Group data in memory
-        tasks_by_tech = {tech_id: [] for tech_id in technician_ids}
-        for task in tasks:
-            tasks_by_tech[task.assigned_to_id].append(task)
+        status_counts_by_tech = {tech_id: {} for tech_id in technician_ids}
+        for tech_id, status, count in tasks.values('assigned_to_id', 'status').annotate(count=Count('id')).values_list(
+            'assigned_to_id', 'status', 'count'
+        ):
+            status_counts_by_tech[tech_id][status] = count
 
-        activities_by_tech = {tech_id: [] for tech_id in technician_ids}
-        for activity in activities:
-            activities_by_tech[activity.user_id].append(activity)
+        # Unique counts for the summary (avoid double-counting when tasks are reassigned/collaborated)
+        summary = tasks.aggregate(
+            completed=Count('id', filter=period_completed),
+            current=Count('id', filter=in_progress),
+        )
+        total_tasks_in_period = summary['completed'] + summary['current']
 
-        # Calculate unique counts for summary (avoid double-counting when tasks are reassigned/collaborated)
-        # Must be computed before the loop since it's used for percentage calculations
-        unique_completed_task_ids = set()
-        unique_current_task_ids = set()
-        completion_statuses_for_unique = ["Completed", "Ready for Pickup", _PICKED_UP]
-        
-        for task in tasks:
-            # Check if task was completed in date range
-            if task.status in completion_statuses_for_unique and task.completed_at:
-                task_date = task.completed_at.date() if hasattr(task.completed_at, 'date') else task.completed_at
-                s_date = start_date.date() if hasattr(start_date, 'date') else start_date
-                e_date = end_date.date() if hasattr(end_date, 'date') else end_date
-                if s_date <= task_date <= e_date:
-                    unique_completed_task_ids.add(task.id)
-            elif task.status == _IN_PROGRESS:
-                unique_current_task_ids.add(task.id)
+        # Technician involvement in the period's tasks from TaskAssignment, filtered through the join
+        involved_counts = dict(
+            TaskAssignment.objects.filter(
+                (Q(task__status__in=completion_statuses) & assignment_completed_in_range) | Q(task__status=_IN_PROGRESS),
+                user_id__in=technician_ids,
+                task__assigned_to_id__in=technician_ids,
+            )
+            .values('user_id')
+            .annotate(task_count=Count('task_id', distinct=True))
+            .values_list('user_id', 'task_count')
+        )
 
         final_report = []
         for tech in technicians:
-            tech_tasks = tasks_by_tech[tech.id]
-            
-            # Completed tasks breakdown (includes Completed, Ready for Pickup, and Picked Up)
-            completion_statuses = ["Completed", "Ready for Pickup", _PICKED_UP]
-            
-            # Filter by date range if completed_at is set
-            completed_tasks = []
-            for t in tech_tasks:
-                if t.status in completion_statuses:
-                    # If date range filtering is active and task has completion date
-                    if t.completed_at:
-                        task_date = t.completed_at.date() if hasattr(t.completed_at, 'date') else t.completed_at
-                        # Convert start/end to date if they are datetime
-                        s_date = start_date.date() if hasattr(start_date, 'date') else start_date
-                        e_date = end_date.date() if hasattr(end_date, 'date') else end_date
-                        
-                        if s_date and e_date:
-                            if s_date <= task_date <= e_date:
-                                completed_tasks.append(t)
-                        else:
-                            # No date range, include all
-                            completed_tasks.append(t)
-                    else:
-                        # Fallback for tasks without completed_at (should utilize updated_at or similar if needed)
-                        # For now, exclude to be safe or include if you want loose counting
-                        # Using updated_at as fallback
-                        task_date = t.updated_at.date()
-                        s_date = start_date.date() if hasattr(start_date, 'date') else start_date
-                        e_date = end_date.date() if hasattr(end_date, 'date') else end_date
-                         
-                        if s_date and e_date:
-                            if s_date <= task_date <= e_date:
-                                completed_tasks.append(t)
+            counts = counts_by_tech.get(tech.id, {})
+            total_completed = counts.get('completed', 0)
+            solved_count = counts.get('solved', 0)
+            not_solved_count = counts.get('not_solved', 0)
 
-            total_completed = len(completed_tasks)
-            
-            # Solved/Not Solved breakdown
-            solved_count = sum(1 for t in completed_tasks if t.workshop_status == "Solved")
-            not_solved_count = sum(1 for t in completed_tasks if t.workshop_status == "Not Solved")
-            
-            # In Progress tasks and In Workshop subset
             # Note: in_progress_count excludes tasks that are In Workshop (they're counted separately)
-            in_progress_tasks = [t for t in tech_tasks if t.status == _IN_PROGRESS]
-            in_workshop_count = sum(1 for t in in_progress_tasks if t.workshop_status == "In Workshop")
-            in_progress_count = sum(1 for t in in_progress_tasks if t.workshop_status != "In Workshop")
-            
-            # Current tasks (only In Progress)
-            current_task_count = len(in_progress_tasks)
-            
-            # OPTIMIZED: Workshop rate using workshop_periods field instead of TaskActivity queries
-            tasks_sent_to_workshop = sum(1 for t in tech_tasks if t.workshop_periods)
-            total_tasks = len(tech_tasks)
-            workshop_rate = (tasks_sent_to_workshop / total_tasks * 100) if total_tasks > 0 else 0
-            
-            # OPTIMIZED: Task involvement using execution_technicians field
-            # Count tasks in period where this technician is in execution_technicians
-            tasks_involved_count = sum(
-                1 for t in tech_tasks 
-                if t.execution_technicians and any(
-                    tech_data.get('user_id') == tech.id 
-                    for tech_data in t.execution_technicians
-                )
-            )
-            total_tasks_in_period = len(unique_completed_task_ids) + len(unique_current_task_ids)
+            in_progress_count = counts.get('in_progress', 0)
+            in_workshop_count = counts.get('in_workshop', 0)
+            current_task_count = in_progress_count + in_workshop_count
+
+            # Workshop rate using the workshop_periods field instead of TaskActivity queries
+            total_tasks = counts.get('total', 0)
+            workshop_rate = (counts.get('sent_to_workshop', 0) / total_tasks * 100) if total_tasks > 0 else 0
+
+            # Tasks in period this technician worked on, including ones since reassigned
+            tasks_involved_count = involved_counts.get(tech.id, 0)
             percentage_of_tasks_involved = (tasks_involved_count / total_tasks_in_period * 100) if total_tasks_in_period > 0 else 0
-            
-            # FULL ATTRIBUTION: Calculate average completion hours for tasks this technician was involved in
-            # Each technician gets credit for the full net execution time of tasks they worked on
-            completed_tasks_with_times = [
-                t for t in tech_tasks 
-                if t.first_assigned_at 
-                and t.completed_at
-                and t.execution_technicians
-                and any(tech_data.get('user_id') == tech.id for tech_data in t.execution_technicians)
-            ]
-            
-            total_hours = 0
-            for task in completed_tasks_with_times:
-                net_hours = ReportGeneratorBase.calculate_net_execution_hours(task)
-                total_hours += net_hours
-            
-            avg_completion_hours = (total_hours / len(completed_tasks_with_times)) if completed_tasks_with_times else 0
-            
-            # Calculate status counts (lightweight - just counts, not full task objects)
-            status_counts = {}
-            for task in tech_tasks:
-                status = task.status
-                status_counts[status] = status_counts.get(status, 0) + 1
+
+            # FULL ATTRIBUTION: each technician gets credit for the full net execution time of tasks they worked on
+            avg_completion_hours = tech.avg_completion_hours or 0
+            status_counts = status_counts_by_tech[tech.id]
 
             # Calculate solve rate
             solve_rate = (solved_count / total_completed * 100) if total_completed > 0 else 0
@@ -231,8 +196,8 @@ class TechnicianReportGenerator(ReportGeneratorBase):
             'end_date': end_date.isoformat() if end_date else None,
             "total_technicians": len(final_report),
             "summary": {
-                "total_completed_tasks": len(unique_completed_task_ids),
-                "total_current_tasks": len(unique_current_task_ids),
+                "total_completed_tasks": summary['completed'],
+                "total_current_tasks": summary['current'],
                 "total_tasks_in_period": total_tasks_in_period,
             },
         }
@@ -240,9 +205,9 @@ class TechnicianReportGenerator(ReportGeneratorBase):
     @staticmethod
     def generate_workload(date_range='last_7_days', start_date=None, end_date=None):
         """Generate technician workload report with date range support."""
-        # Apply date filter to tasks based on date_in field
+        # Apply date filter to the technicians' tasks based on their date_in field
         date_filter, actual_date_range, duration_days, duration_description, start_date, end_date = (
-            ReportGeneratorBase.get_date_filter(date_range, start_date, end_date, field='date_in')
+            ReportGeneratorBase.get_date_filter(date_range, start_date, end_date, field='tasks__date_in')
         )
         
         workload_data = (
@@ -0,0 +1,245 @@
+import json
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from Eapp.models import Task
+from reports.generators.financial import FinancialReportGenerator
+from reports.generators.front_desk import FrontDeskReportGenerator
+from reports.generators.operational import OperationalReportGenerator
+from reports.generators.technician import TechnicianReportGenerator
+
+# Report name -> generator called with the date range name (None for reports without a range)
+REPORTS = {
+    'task_status': OperationalReportGenerator.generate_task_status,
+    'task_execution': OperationalReportGenerator.generate_task_execution,
+    'technician_performance': TechnicianReportGenerator.generate_performance,
+    'technician_workload': TechnicianReportGenerator.generate_workload,
+    'front_desk_performance': FrontDeskReportGenerator.generate_performance,
+    'outstanding_payments': FinancialReportGenerator.generate_outstanding_payments,
+    'payment_methods': FinancialReportGenerator.generate_payment_methods,
+    'revenue_overview': None,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the report generators across dataset sizes and date ranges, recording wall time, '
+        'peak memory and query count, and compares the results with a baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='10000,100000,1000000',
+            help='Comma-separated task counts to benchmark; the data is seeded up to each size in turn '
+                 '(default: 10000,100000,1000000)',
+        )
+        parser.add_argument(
+            '--ranges',
+            default='last_7_days,last_30_days,last_year',
+            help='Comma-separated report date ranges (default: last_7_days,last_30_days,last_year)',
+        )
+        parser.add_argument(
+            '--reports',
+            default=','.join(REPORTS),
+            help='Comma-separated reports to run (default: all)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Timed runs per report; the median is recorded (default: 3)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Seeded intake dates are spread over this many days (default: 365)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the seeded data (default: 42)',
+        )
+        parser.add_argument(
+            '--existing',
+            action='store_true',
+            help='Benchmark the data already in the database instead of seeding; --sizes is ignored',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON results of an earlier run to compare against',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=20.0,
+            help='Percent increase in wall time or peak memory reported as a regression (default: 20)',
+        )
+        parser.add_argument(
+            '--min-delta-ms',
+            type=float,
+            default=5.0,
+            help='Wall time increases smaller than this are treated as noise (default: 5)',
+        )
+        parser.add_argument(
+            '--noinput', '--no-input',
+            action='store_false',
+            dest='interactive',
+            help='Do not ask for confirmation before deleting existing tasks',
+        )
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['reports'].split(',') if name.strip()]
+        unknown = set(names) - set(REPORTS)
+        if unknown:
+            raise CommandError(f"Unknown reports: {', '.join(sorted(unknown))}")
+        ranges = [name.strip() for name in options['ranges'].split(',') if name.strip()]
+        try:
+            sizes = sorted({int(size) for size in options['sizes'].split(',') if size.strip()})
+        except ValueError as e:
+            raise CommandError(f"Invalid size: {e}")
+        baseline = self._load_baseline(options['baseline']) if options['baseline'] else None
+
+        results = []
+        if options['existing']:
+            results.extend(self._run_size(Task.objects.count(), names, ranges, options['repeat']))
+        else:
+            from Eapp.seeders import clear_tasks
+
+            self._confirm_clear(options['interactive'])
+            clear_tasks()
+            for size in sizes:
+                self._seed_to(size, options)
+                results.extend(self._run_size(size, names, ranges, options['repeat']))
+
+        payload = {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(payload, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = self._compare(results, baseline, options['threshold'], options['min_delta_ms'])
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against the baseline:\n" + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+    def _confirm_clear(self, interactive):
+        existing = Task.objects.count()
+        if not existing or not interactive:
+            return
+        answer = input(
+            f"This deletes all {existing} tasks in the '{connection.settings_dict['NAME']}' database "
+            f"and replaces them with seeded data. Type 'yes' to continue: "
+        )
+        if answer != 'yes':
+            raise CommandError("Benchmark cancelled.")
+
+    def _seed_to(self, size, options):
+        """Grow the seeded dataset to ``size`` tasks."""
+        from Eapp.seeders import seed_tasks
+
+        current = Task.objects.count()
+        if size > current:
+            self.stdout.write(f"Seeding {size - current} tasks (dataset size {size})...")
+            seed_tasks(
+                tasks=size - current, days=options['days'], seed=options['seed'] + size,
+                log=lambda message: None,
+            )
+
+    def _measure(self, generator, date_range, repeat):
+        call = (lambda: generator(date_range=date_range)) if date_range else generator
+
+        # Memory and queries come from an untimed run, since tracing slows the generator down
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            try:
+                call()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        timings = []
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return {
+            'wall_ms': round(statistics.median(timings), 2),
+            'wall_ms_min': round(min(timings), 2),
+            'peak_kb': round(peak / 1024, 1),
+            'queries': len(queries),
+        }
+
+    def _run_size(self, size, names, ranges, repeat):
+        self.stdout.write(f"Dataset size {size}:")
+        results = []
+        for name in names:
+            generator = REPORTS[name]
+            if generator is None:
+                generator = FinancialReportGenerator.generate_revenue_overview
+                report_ranges = [None]
+            else:
+                report_ranges = ranges
+            for date_range in report_ranges:
+                result = {'report': name, 'size': size, 'range': date_range or 'none'}
+                result.update(self._measure(generator, date_range, repeat))
+                results.append(result)
+                self.stdout.write(
+                    f"  {name:<24} {result['range']:<14} {result['wall_ms']:10.1f}ms  "
+                    f"peak {result['peak_kb']:10.1f}KB  queries {result['queries']:>4}"
+                )
+        return results
+
+    def _load_baseline(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read baseline {path}: {e}")
+
+    @staticmethod
+    def _compare(results, baseline, threshold, min_delta_ms):
+        """
+        Compare results with a baseline run.
+
+        Wall time and peak memory regress when they grow by more than
+        ``threshold`` percent (and, for wall time, by at least
+        ``min_delta_ms``); query counts regress on any increase.
+
+        Returns:
+            list: Human readable description of each regression
+        """
+        previous = {(row['report'], row['size'], row['range']): row for row in baseline.get('results', [])}
+        factor = 1 + threshold / 100
+        regressions = []
+        for row in results:
+            before = previous.get((row['report'], row['size'], row['range']))
+            if before is None:
+                continue
+            label = f"{row['report']} size={row['size']} range={row['range']}"
+            if row['wall_ms'] > before['wall_ms'] * factor and row['wall_ms'] - before['wall_ms'] >= min_delta_ms:
+                regressions.append(f"  {label}: wall time {before['wall_ms']}ms -> {row['wall_ms']}ms")
+            if row['peak_kb'] > before['peak_kb'] * factor:
+                regressions.append(f"  {label}: peak memory {before['peak_kb']}KB -> {row['peak_kb']}KB")
+            if row['queries'] > before['queries']:
+                regressions.append(f"  {label}: queries {before['queries']} -> {row['queries']}")
+        return regressions
@@ -0,0 +1,30 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.rollup import TaskRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily task rollup used by the task status report from Task rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            help='First intake day to rebuild (YYYY-MM-DD, default: all)',
+        )
+        parser.add_argument(
+            '--end',
+            help='Last intake day to rebuild (YYYY-MM-DD, default: all)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+
+        self.stdout.write("Rebuilding daily task rollup...")
+        written = TaskRollup.rebuild(start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(f"Rollup rebuilt with {written} rows."))
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_rollup(apps, schema_editor):
+    Task = apps.get_model('Eapp', 'Task')
+    DailyTaskRollup = apps.get_model('reports', 'DailyTaskRollup')
+    grouped = (
+        Task.objects.values('date_in', 'current_location_id', 'status', 'urgency', 'brand_id', 'laptop_model_id')
+        .annotate(task_count=Count('id'))
+        .order_by()
+    )
+    DailyTaskRollup.objects.bulk_create(
+        [
+            DailyTaskRollup(
+                day=group['date_in'],
+                location_id=group['current_location_id'],
+                status=group['status'],
+                urgency=group['urgency'],
+                brand_id=group['brand_id'],
+                model_id=group['laptop_model_id'],
+                count=group['task_count'],
+            )
+            for group in grouped.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('common', '0005_enable_pg_trgm'),
+        ('Eapp', '0023_task_execution_hours'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTaskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Task intake date (Task.date_in)')),
+                ('status', models.CharField(max_length=20)),
+                ('urgency', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('brand', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='common.brand')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='common.location')),
+                ('model', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='common.model')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'status', 'urgency', 'location', 'brand', 'model'], name='idx_rollup_day_key')],
+            },
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,30 @@
 from django.db import models
 
-# Create your models here.
+
+class DailyTaskRollup(models.Model):
+    """
+    Number of tasks per intake day and (location, status, urgency, brand, model).
+
+    Maintained incrementally by reports.rollup.TaskRollup as tasks are created
+    and change, and rebuilt with the rebuild_task_rollup command. Readers must
+    Sum() the count column: concurrent first writes to a key can leave more
+    than one row for it, and a moved task can leave a row at zero.
+    """
+    day = models.DateField(help_text='Task intake date (Task.date_in)')
+    location = models.ForeignKey('common.Location', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20)
+    urgency = models.CharField(max_length=20)
+    brand = models.ForeignKey('common.Brand', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    model = models.ForeignKey('common.Model', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.day} {self.status}: {self.count}'
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['day', 'status', 'urgency', 'location', 'brand', 'model'],
+                name='idx_rollup_day_key'
+            ),
+        ]
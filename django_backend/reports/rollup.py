@@ -0,0 +1,148 @@
+"""
+Daily task rollup maintenance.
+
+Keeps DailyTaskRollup in step with Task: every task counts once under the
+key built from its intake day, location, status, urgency, brand and model.
+Task saves and deletes move that count between keys (see reports.signals);
+set-based Task updates must call TaskRollup.record_update() themselves.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, Subquery
+
+from .models import DailyTaskRollup
+
+# Rollup column -> Task attribute
+KEY_FIELDS = {
+    'day': 'date_in',
+    'location_id': 'current_location_id',
+    'status': 'status',
+    'urgency': 'urgency',
+    'brand_id': 'brand_id',
+    'model_id': 'laptop_model_id',
+}
+
+# Task fields whose change moves a task to another rollup key
+TASK_FIELDS = {'date_in', 'current_location', 'status', 'urgency', 'brand', 'laptop_model'}
+
+
+class TaskRollup:
+    """Incremental maintenance and rebuilds of DailyTaskRollup."""
+
+    @staticmethod
+    def key(task, **changes):
+        """
+        Rollup key of a task as a tuple in KEY_FIELDS order.
+
+        Only loaded values are read, so deferred fields never trigger a query.
+
+        Args:
+            task: Task instance
+            **changes: Task attribute overrides, e.g. status='Completed'
+
+        Returns:
+            tuple: The key, or None if a key field is not loaded
+        """
+        values = task.__dict__
+        key = []
+        for attname in KEY_FIELDS.values():
+            if attname in changes:
+                key.append(changes[attname])
+            elif attname in values:
+                key.append(values[attname])
+            else:
+                return None
+        return tuple(key)
+
+    @staticmethod
+    def apply(deltas):
+        """
+        Add count deltas to their rollup rows, creating missing rows.
+
+        Args:
+            deltas: Mapping of rollup key -> count change
+        """
+        for key, delta in deltas.items():
+            if not delta or key is None:
+                continue
+            lookup = dict(zip(KEY_FIELDS, key))
+            rows = DailyTaskRollup.objects.filter(**lookup)
+            # Update a single row so duplicates from racing inserts are not double-counted
+            updated = DailyTaskRollup.objects.filter(
+                pk=Subquery(rows.order_by('pk').values('pk')[:1])
+            ).update(count=F('count') + delta)
+            if not updated:
+                DailyTaskRollup.objects.create(count=delta, **lookup)
+
+    @staticmethod
+    def record_change(old_key, new_key):
+        """Move one task from old_key to new_key (either may be None for create/delete)."""
+        if old_key == new_key:
+            return
+        TaskRollup.apply({old_key: -1, new_key: 1})
+
+    @staticmethod
+    def record_update(tasks, updates):
+        """
+        Account for a queryset .update() of Task fields on already loaded tasks.
+
+        Args:
+            tasks: Task instances as they were before the update
+            updates (dict): Field values passed to .update(); model instances allowed
+        """
+        changes = {}
+        for field, value in updates.items():
+            if field not in TASK_FIELDS:
+                continue
+            attname = field if field in ('date_in', 'status', 'urgency') else f'{field}_id'
+            changes[attname] = getattr(value, 'pk', value)
+        if not changes:
+            return
+
+        deltas = Counter()
+        for task in tasks:
+            old_key = getattr(task, '_rollup_key', None) or TaskRollup.key(task)
+            new_key = TaskRollup.key(task, **changes)
+            if old_key != new_key:
+                deltas[old_key] -= 1
+                deltas[new_key] += 1
+        TaskRollup.apply(deltas)
+
+    @staticmethod
+    def rebuild(start=None, end=None):
+        """
+        Recompute the rollup from Task rows, optionally for an intake-day range.
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        from Eapp.models import Task
+
+        tasks = Task.objects.all()
+        rows = DailyTaskRollup.objects.all()
+        if start:
+            tasks = tasks.filter(date_in__gte=start)
+            rows = rows.filter(day__gte=start)
+        if end:
+            tasks = tasks.filter(date_in__lte=end)
+            rows = rows.filter(day__lte=end)
+
+        grouped = (
+            tasks.values(*KEY_FIELDS.values())
+            .annotate(task_count=Count('id'))
+            .order_by()
+        )
+        with transaction.atomic():
+            rows.delete()
+            created = DailyTaskRollup.objects.bulk_create(
+                (
+                    DailyTaskRollup(
+                        count=group['task_count'],
+                        **{column: group[attname] for column, attname in KEY_FIELDS.items()}
+                    )
+                    for group in grouped.iterator()
+                ),
+                batch_size=1000,
+            )
+        return len(created)
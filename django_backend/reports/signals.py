@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from Eapp.models import Task
+from .rollup import TASK_FIELDS, TaskRollup
+
+
+@receiver(post_init, sender=Task)
+def remember_rollup_key(sender, instance, **kwargs):
+    """Remember the rollup key a task was loaded with, to move its count on save."""
+    instance._rollup_key = TaskRollup.key(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Task)
+def update_rollup_on_task_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and not TASK_FIELDS.intersection(update_fields):
+        return
+
+    new_key = TaskRollup.key(instance)
+    if new_key is None:
+        return
+    old_key = None if created else instance._rollup_key
+    if created or old_key is not None:
+        TaskRollup.record_change(old_key, new_key)
+    instance._rollup_key = new_key
+
+
+@receiver(post_delete, sender=Task)
+def update_rollup_on_task_delete(sender, instance, **kwargs):
+    TaskRollup.record_change(getattr(instance, '_rollup_key', None) or TaskRollup.key(instance), None)
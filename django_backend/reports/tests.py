@@ -1,3 +1,257 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import CommandError, call_command
 from django.test import TestCase
+from django.db.models import Sum
+from django.utils import timezone
+
+from common.encryption import ENGINE_AESGCM, encrypt_value
+from common.models import Brand, Location, Model
+from customers.models import Customer, PhoneNumber
+from Eapp.models import Task, TaskActivity
+from Eapp.services import ActivityLogger, BulkTaskService
+from Eapp.utils.execution_hours import execution_hours
+from users.models import User
+from reports.generators.financial import FinancialReportGenerator
+from reports.generators.operational import OperationalReportGenerator
+from reports.generators.technician import TechnicianReportGenerator
+from reports.models import DailyTaskRollup
+from reports.rollup import TaskRollup
+
+
+@mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_KEY': 'report-key', 'FIELD_ENCRYPTION_ENGINE': ENGINE_AESGCM})
+class OutstandingPaymentsReportTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='accountant', password='testpassword', email='acc@gmail.com', first_name='test', last_name='accountant', role='Accountant')
+        location = Location.objects.create(name='Main')
+        for i in range(30):
+            customer = Customer.objects.create(name=f'Customer {i}')
+            with mock.patch.dict(os.environ, {'FIELD_ENCRYPTION_KEY': 'report-key'}):
+                PhoneNumber.objects.create(customer=customer, phone_number=encrypt_value(f'+2557000000{i:02d}', engine=ENGINE_AESGCM))
+            Task.objects.create(title=f'A1-{i + 1:03d}', created_by=user, customer=customer, current_location=location, workshop_status='Solved')
+        Task.objects.update(total_cost=100, paid_amount=0)
+
+    def test_pdf_export_decrypts_phones_without_per_row_queries(self):
+        with self.assertNumQueries(6):
+            report = FinancialReportGenerator.generate_outstanding_payments(date_range='last_30_days', pdf_export=True)
+
+        rows = report['pdf_data']['top_20'] + report['pdf_data']['bottom_20']
+        self.assertEqual(len(rows), 40)
+        self.assertTrue(all(row['customer_phone'].startswith('+2557') for row in rows))
+
+
+class TechnicianPerformanceReportTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        self.first = User.objects.create_user(username='tech1', password='testpassword', email='tech1@gmail.com', first_name='first', last_name='tech', role='Technician')
+        self.second = User.objects.create_user(username='tech2', password='testpassword', email='tech2@gmail.com', first_name='second', last_name='tech', role='Technician')
+        customer = Customer.objects.create(name='Customer')
+        location = Location.objects.create(name='Main')
+        self.task = Task.objects.create(title='A1-001', created_by=self.manager, customer=customer, current_location=location, status='In Progress')
+
+    def test_reassigned_task_counts_for_every_technician_involved(self):
+        ActivityLogger.log_assignment(self.task, self.manager, None, self.first)
+        ActivityLogger.log_assignment(self.task, self.manager, self.first, self.second)
+        Task.objects.filter(pk=self.task.pk).update(assigned_to=self.second)
+
+        report = TechnicianReportGenerator.generate_performance(date_range='last_7_days')
+
+        involvement = {row['technician_id']: row['percentage_of_tasks_involved'] for row in report['technician_performance']}
+        self.assertEqual(involvement, {self.first.id: 100.0, self.second.id: 100.0})
+
+    def test_only_tasks_completed_in_the_period_count(self):
+        now = timezone.now()
+        old = Task.objects.create(title='A1-002', created_by=self.manager, customer=self.task.customer, current_location=self.task.current_location)
+        recent = Task.objects.create(title='A1-003', created_by=self.manager, customer=self.task.customer, current_location=self.task.current_location)
+        for task, completed_at, hours in ((old, now - timedelta(days=30), 10.0), (recent, now, 4.0)):
+            ActivityLogger.log_assignment(task, self.manager, None, self.first)
+            Task.objects.filter(pk=task.pk).update(
+                assigned_to=self.first, status='Completed', workshop_status='Solved',
+                first_assigned_at=completed_at - timedelta(hours=hours), completed_at=completed_at, net_execution_hours=hours,
+            )
+
+        with self.assertNumQueries(5):
+            report = TechnicianReportGenerator.generate_performance(date_range='last_7_days')
+
+        row = next(row for row in report['technician_performance'] if row['technician_id'] == self.first.id)
+        self.assertEqual(row['completed_tasks_count'], 1)
+        self.assertEqual(row['solved_count'], 1)
+        self.assertEqual(row['avg_completion_hours'], 4.0)
+        self.assertEqual(row['status_counts'], {'Completed': 2})
+        self.assertEqual(report['summary']['total_completed_tasks'], 1)
+
+
+class TaskExecutionReportTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        self.technician = User.objects.create_user(username='tech', password='testpassword', email='tech@gmail.com', first_name='test', last_name='tech', role='Technician')
+        self.customer = Customer.objects.create(name='Customer')
+        self.location = Location.objects.create(name='Main')
+
+    def _completed_task(self, title, hours, workshop_hours=0):
+        now = timezone.now()
+        task = Task.objects.create(title=title, created_by=self.manager, customer=self.customer, current_location=self.location)
+        Task.objects.filter(pk=task.pk).update(
+            first_assigned_at=now - timedelta(hours=hours + workshop_hours),
+            completed_at=now,
+            workshop_periods=[{
+                'sent_at': (now - timedelta(hours=workshop_hours)).isoformat(),
+                'returned_at': now.isoformat(),
+            }] if workshop_hours else [],
+        )
+        return task
+
+    def test_completion_stores_hours_and_reopening_keeps_them_current(self):
+        task = Task.objects.create(title='A1-001', created_by=self.manager, customer=self.customer, current_location=self.location)
+        ActivityLogger.log_assignment(task, self.manager, None, self.technician)
+        task.refresh_from_db()
+        self.assertIsNone(task.net_execution_hours)
+
+        ActivityLogger.log_status_change(task, self.manager, 'Completed')
+        task.refresh_from_db()
+        self.assertIsNotNone(task.net_execution_hours)
+        self.assertEqual(task.workshop_hours, 0)
+
+        # Reopened, sent to the workshop and completed again
+        workshop = Location.objects.create(name='Workshop', is_workshop=True)
+        ActivityLogger.log_workshop_send(task, self.manager, workshop)
+        ActivityLogger.log_workshop_return(task, self.manager, 'Solved')
+        ActivityLogger.log_status_change(task, self.manager, 'Completed')
+        task.refresh_from_db()
+        self.assertGreater(task.workshop_hours, 0)
+
+    def test_returned_task_hours_are_cleared_until_completed_again(self):
+        task = Task.objects.create(title='A1-001', created_by=self.manager, customer=self.customer, current_location=self.location)
+        ActivityLogger.log_assignment(task, self.manager, None, self.technician)
+        ActivityLogger.log_status_change(task, self.manager, 'Completed')
+        TaskActivity.objects.create(task=task, user=self.manager, type=TaskActivity.ActivityType.RETURNED, message='Still broken')
+        task.refresh_from_db()
+        self.assertIsNone(task.net_execution_hours)
+        self.assertIsNone(task.return_hours)
+
+        ActivityLogger.log_assignment(task, self.manager, self.technician, self.manager)
+        ActivityLogger.log_status_change(task, self.manager, 'Completed')
+        task.refresh_from_db()
+        self.assertGreaterEqual(task.return_hours, 0)
+        self.assertGreaterEqual(task.net_execution_hours, 0)
+
+    def test_periods_after_completion_count_as_zero(self):
+        now = timezone.now()
+        task = Task(
+            first_assigned_at=now - timedelta(hours=10),
+            completed_at=now - timedelta(hours=5),
+            return_periods=[{'returned_at': now.isoformat(), 'reassigned_at': None}],
+        )
+        self.assertEqual(execution_hours(task), (5.0, 0, 0))
+
+    def test_report_aggregates_stored_hours(self):
+        self._completed_task('A1-001', 2)
+        self._completed_task('A1-002', 6, workshop_hours=3)
+        self._completed_task('A1-003', 10)
+        call_command('backfill_execution_hours', stdout=StringIO())
+
+        with self.assertNumQueries(6):
+            report = OperationalReportGenerator.generate_task_execution(date_range='last_7_days', page_size=2)
+
+        summary = report['summary']
+        self.assertEqual(summary['overall_average_hours'], 6.0)
+        self.assertEqual(summary['fastest_task_hours'], 2.0)
+        self.assertEqual(summary['slowest_task_hours'], 10.0)
+        self.assertEqual(summary['overall_average_workshop_hours'], 3.0)
+        self.assertEqual(summary['total_tasks_workshop'], 1)
+        self.assertEqual([t['task_title'] for t in report['task_details']], ['A1-003', 'A1-002'])
+        self.assertEqual(summary['top_5_fastest'][0]['task_title'], 'A1-001')
+        self.assertEqual(sum(p['tasks_completed'] for p in report['periods']), 3)
+        self.assertEqual(report['pagination']['total_pages'], 2)
+
+
+class DailyTaskRollupTests(TestCase):
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager', password='testpassword', email='mgr@gmail.com', first_name='test', last_name='manager', role='Manager')
+        customer = Customer.objects.create(name='Customer')
+        self.location = Location.objects.create(name='Main')
+        brand = Brand.objects.create(name='Dell')
+        model = Model.objects.create(name='XPS', brand=brand)
+        today = timezone.now().date()
+        for i in range(6):
+            Task.objects.create(
+                title=f'A1-{i + 1:03d}', created_by=self.manager, customer=customer, current_location=self.location,
+                brand=brand if i < 4 else None, laptop_model=model if i < 2 else None,
+                date_in=today - timedelta(days=i),
+            )
+
+    def _rollup(self):
+        return sorted(
+            (row['day'], row['location'], row['status'], row['urgency'], row['brand'], row['model'], row['total'])
+            for row in DailyTaskRollup.objects.values('day', 'location', 'status', 'urgency', 'brand', 'model')
+            .annotate(total=Sum('count')).filter(total__gt=0)
+        )
+
+    def test_incremental_updates_match_a_rebuild(self):
+        task = Task.objects.get(title='A1-001')
+        task.status = 'In Progress'
+        task.save()
+        Task.objects.get(title='A1-002').delete()
+        shelf = Location.objects.create(name='Shelf')
+        BulkTaskService.apply(self.manager, ['A1-003', 'A1-004'], BulkTaskService.RELOCATE, location=shelf)
+
+        incremental = self._rollup()
+        TaskRollup.rebuild()
+        self.assertEqual(incremental, self._rollup())
+
+    def test_model_merges_keep_the_rollup_in_step(self):
+        duplicate = Model.objects.create(name='Dell XPS', brand=Brand.objects.get(name='Dell'))
+        Task.objects.filter(title='A1-003').update(laptop_model=duplicate)
+        TaskRollup.rebuild()
+
+        call_command('reconcile_models', stdout=StringIO())
+
+        merged = self._rollup()
+        TaskRollup.rebuild()
+        self.assertEqual(merged, self._rollup())
+        self.assertEqual(Task.objects.filter(laptop_model__name='XPS').count(), 3)
+
+    def test_multi_day_report_reads_the_rollup(self):
+        # Rows the rollup does not know about are invisible to multi-day ranges
+        Task.objects.filter(title='A1-001').update(status='Completed')
+
+        report = OperationalReportGenerator.generate_task_status(date_range='last_7_days')
+
+        self.assertEqual(report['total_tasks'], 6)
+        self.assertEqual(report['status_distribution'], [{'status': 'Pending', 'count': 6, 'percentage': 100.0}])
+        self.assertEqual(report['top_brands'], [{'brand__name': 'Dell', 'count': 4}])
+        self.assertEqual(report['popular_model'], 'XPS')
+
+        today = timezone.now().date().isoformat()
+        single_day = OperationalReportGenerator.generate_task_status(start_date=today, end_date=today)
+        self.assertEqual(single_day['status_distribution'][0]['status'], 'Completed')
+
+
+class BenchmarkReportsCommandTests(TestCase):
+    def test_results_are_written_and_compared_with_the_baseline(self):
+        options = {'reports': 'task_status,revenue_overview', 'ranges': 'last_7_days', 'repeat': 1, 'stdout': StringIO()}
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'results.json')
+            call_command('benchmark_reports', sizes='30', output=output, interactive=False, **options)
+            with open(output) as f:
+                results = json.load(f)['results']
+            self.assertEqual(
+                [(row['report'], row['size'], row['range']) for row in results],
+                [('task_status', 30, 'last_7_days'), ('revenue_overview', 30, 'none')],
+            )
+            self.assertTrue(all(row['queries'] > 0 and row['peak_kb'] > 0 for row in results))
+
+            # Same data: only a query count increase can be reported
+            call_command('benchmark_reports', existing=True, baseline=output, threshold=1000, **options)
 
-# Create your tests here.
+            for row in results:
+                row['queries'] -= 1
+            with open(output, 'w') as f:
+                json.dump({'results': results}, f)
+            with self.assertRaisesMessage(CommandError, '2 regression(s)'):
+                call_command('benchmark_reports', existing=True, baseline=output, threshold=1000, **options)
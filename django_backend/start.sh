@@ -19,5 +19,21 @@ python manage.py cleanup_approved_debts
 # Create superuser if configured
 python manage.py create_superuser_from_env
 
+# Keep a background worker running: restart it whenever it exits
+supervise() {
+    while true; do
+        "$@" || echo "[supervise] '$*' exited with status $?" >&2
+        sleep 5
+        echo "[supervise] restarting '$*'" >&2
+    done
+}
+
+# Start the SMS outbox worker. Queued SMS are only sent while it runs, so it is
+# restarted if it dies (set SMS_OUTBOX_ENABLED=False to send in the request instead)
+supervise python manage.py process_sms_outbox &
+
+# Start the reminder scheduler (only the instance holding the leader lock runs jobs)
+supervise python manage.py run_scheduler &
+
 # Start the ASGI server
 daphne -b 0.0.0.0 -p $PORT A_express.asgi:application
@@ -150,6 +150,10 @@ class AuditLog(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination on (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='idx_auditlog_created_keyset'),
+        ]
 
     def __str__(self):
         return f"[{self.created_at}] {self.action} by {self.user}"
\ No newline at end of file
@@ -347,6 +347,14 @@ class AuthViewSet(viewsets.ViewSet):
         except Exception:
             pass
 
+        # Opt-in keyset pagination: ?cursor= (empty for the first page)
+        if 'cursor' in request.query_params:
+            from Eapp.pagination import KeysetPagination
+            paginator = KeysetPagination(ordering=('-created_at', '-id'), page_size=50, max_page_size=200)
+            page = paginator.paginate_queryset(qs, request, view=self)
+            serializer = AuditLogSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
         qs = qs.order_by('-created_at')[:1000]
         serializer = AuditLogSerializer(qs, many=True)
         return Response(serializer.data)
@@ -570,6 +578,26 @@ def get_current_user(request):
 
 from rest_framework.views import APIView
 from Eapp.models import Task
+from common.stats import StatsContext, StatsDashboard
+
+technician_dashboard_stats = StatsDashboard('technician', per_user=True, sources={
+    'tasks': lambda ctx: Task.objects.filter(assigned_to=ctx.user),
+})
+
+# 1. Assigned Tasks (Pending)
+technician_dashboard_stats.add_tile('assigned_count', 'tasks', Count('id', filter=Q(status="Pending")))
+# 2. In Progress Tasks
+technician_dashboard_stats.add_tile('in_progress_count', 'tasks', Count('id', filter=Q(status="In Progress")))
+# 3. Completed Today
+technician_dashboard_stats.add_tile(
+    'completed_today_count', 'tasks',
+    lambda ctx: Count('id', filter=Q(status="Completed", updated_at__gte=ctx.day_start, updated_at__lt=ctx.day_end))
+)
+# 4. Urgent Tasks (Active + Yupo/Ina Haraka)
+technician_dashboard_stats.add_tile(
+    'urgent_count', 'tasks',
+    Count('id', filter=Q(urgency__in=["Yupo", "Ina Haraka"]) & ~Q(status__in=["Completed", "Picked Up", "Terminated", "Ready for Pickup"]))
+)
 
 
 class TechnicianDashboardStats(APIView):
@@ -577,31 +605,10 @@ class TechnicianDashboardStats(APIView):
 
     def get(self, request):
         user = request.user
-        today = timezone.now().date()
-        
-        # 1. Assigned Tasks (Pending)
-        assigned_count = Task.objects.filter(assigned_to=user, status="Pending").count()
-        
-        # 2. In Progress Tasks
-        in_progress_count = Task.objects.filter(assigned_to=user, status="In Progress").count()
-        
-        # 3. Completed Today
-        completed_today_count = Task.objects.filter(
-            assigned_to=user,
-            status="Completed",
-            updated_at__date=today
-        ).count()
-        
-        # 4. Urgent Tasks (Active + Yupo/Ina Haraka)
-        urgent_count = Task.objects.filter(
-            assigned_to=user,
-            urgency__in=["Yupo", "Ina Haraka"]
-        ).exclude(
-             status__in=["Completed", "Picked Up", "Terminated", "Ready for Pickup"]
-        ).count()
+        data = dict(technician_dashboard_stats.compute_cached(StatsContext(user=user)))
 
         # 5. Recent Activity (Last 5 updated tasks for this user)
-        recent_tasks_qs = Task.objects.filter(assigned_to=user).order_by('-updated_at')[:5]
+        recent_tasks_qs = Task.objects.filter(assigned_to=user).select_related('laptop_model').order_by('-updated_at')[:5]
         recent_tasks_data = []
         for t in recent_tasks_qs:
              recent_tasks_data.append({
@@ -611,11 +618,5 @@ class TechnicianDashboardStats(APIView):
                  "status": t.status
              })
 
-        data = {
-            "assigned_count": assigned_count,
-            "in_progress_count": in_progress_count,
-            "completed_today_count": completed_today_count,
-            "urgent_count": urgent_count,
-            "recent_tasks": recent_tasks_data
-        }
+        data["recent_tasks"] = recent_tasks_data
         return Response(data)
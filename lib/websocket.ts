@@ -29,6 +29,8 @@ export interface ToastNotificationMessage {
     toast_type: string;
     data: {
         task_title?: string;
+        task_titles?: string[];
+        count?: number;
         customer_name?: string;
         amount?: string;
         sms_sent?: boolean;
@@ -56,6 +58,14 @@ export interface TaskStatusUpdateMessage {
     updated_fields: string[];
 }
 
+// One coalesced update for a bulk task operation (assign, transition, relocate)
+export interface TasksBulkUpdateMessage {
+    type: 'tasks_bulk_update';
+    operation: 'assign' | 'transition' | 'relocate';
+    task_ids: string[];
+    updated_fields: string[];
+}
+
 export interface DataUpdateMessage {
     type: 'payment_update' | 'customer_update' | 'account_update' | 'transaction_update' | 'payment_method_update';
     task_id?: string;
@@ -95,7 +105,18 @@ export interface TransactionRequestResolvedMessage {
     request_id: number;
 }
 
-export type WebSocketMessage = SchedulerNotificationMessage | ConnectionMessage | PongMessage | ToastNotificationMessage | TaskStatusUpdateMessage | DataUpdateMessage | TransactionRequestMessage | DebtRequestMessage | DebtRequestResolvedMessage | TransactionRequestResolvedMessage;
+// Bulk SMS progress (sent to the user who started the send)
+export interface SmsCampaignProgressMessage {
+    type: 'sms_campaign_progress';
+    job_id: number;
+    status: 'queued' | 'running' | 'completed' | 'failed';
+    total: number;
+    sent: number;
+    failed: number;
+    done: boolean;
+}
+
+export type WebSocketMessage = SchedulerNotificationMessage | ConnectionMessage | PongMessage | ToastNotificationMessage | TaskStatusUpdateMessage | TasksBulkUpdateMessage | DataUpdateMessage | TransactionRequestMessage | DebtRequestMessage | DebtRequestResolvedMessage | TransactionRequestResolvedMessage | SmsCampaignProgressMessage;
 
 export type MessageHandler = (message: WebSocketMessage) => void;
 export type ConnectionStatusHandler = (isConnected: boolean) => void;